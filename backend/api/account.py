@@ -8,7 +8,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from backend.database import get_db
+from backend.database import get_db, run_db
 from backend.database.models import Account
 from backend.schemas import (
     AccountCreate, AccountUpdate, AccountResponse, AccountDetailResponse,
@@ -45,7 +45,7 @@ playwright_mgr.set_ws_callback(ws_notification)
 
 
 @router.get("", response_model=List[AccountResponse])
-async def get_accounts(
+def get_accounts(
     platform: str = Query(None, description="平台筛选"),
     status: int = Query(None, description="状态筛选"),
     db: Session = Depends(get_db)
@@ -67,7 +67,7 @@ async def get_accounts(
 
 
 @router.get("/{account_id}", response_model=AccountDetailResponse)
-async def get_account(account_id: int, db: Session = Depends(get_db)):
+def get_account(account_id: int, db: Session = Depends(get_db)):
     """获取账号详情"""
     account = db.query(Account).filter(Account.id == account_id).first()
     if not account:
@@ -92,7 +92,7 @@ async def get_account(account_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("", response_model=AccountResponse, status_code=201)
-async def create_account(account_data: AccountCreate, db: Session = Depends(get_db)):
+def create_account(account_data: AccountCreate, db: Session = Depends(get_db)):
     """
     创建账号
 
@@ -118,7 +118,7 @@ async def create_account(account_data: AccountCreate, db: Session = Depends(get_
 
 
 @router.put("/{account_id}", response_model=AccountResponse)
-async def update_account(
+def update_account(
     account_id: int,
     account_data: AccountUpdate,
     db: Session = Depends(get_db)
@@ -144,7 +144,7 @@ async def update_account(
 
 
 @router.delete("/{account_id}", response_model=ApiResponse)
-async def delete_account(account_id: int, db: Session = Depends(get_db)):
+def delete_account(account_id: int, db: Session = Depends(get_db)):
     """
     删除账号
 
@@ -178,7 +178,7 @@ async def start_auth(auth_data: AuthStartRequest, db: Session = Depends(get_db))
 
     # 如果是更新授权，检查账号是否存在
     if auth_data.account_id:
-        account = db.query(Account).filter(Account.id == auth_data.account_id).first()
+        account = await run_db(lambda: db.query(Account).filter(Account.id == auth_data.account_id).first())
         if not account:
             raise HTTPException(status_code=404, detail="账号不存在")
         if account.platform != platform:
@@ -247,16 +247,21 @@ async def save_auth(task_id: str, account_id: int, db: Session = Depends(get_db)
     if task.status != "success":
         raise HTTPException(status_code=400, detail="授权尚未成功")
 
-    account = db.query(Account).filter(Account.id == account_id).first()
-    if not account:
-        raise HTTPException(status_code=404, detail="账号不存在")
+    def save():
+        account = db.query(Account).filter(Account.id == account_id).first()
+        if not account:
+            return False
 
-    # 保存授权信息
-    account.cookies = encrypt_cookies(task.cookies)
-    account.storage_state = encrypt_storage_state(task.storage_state)
-    account.status = 1  # 激活账号
-    account.last_auth_time = task.created_at
-    db.commit()
+        # 保存授权信息
+        account.cookies = encrypt_cookies(task.cookies)
+        account.storage_state = encrypt_storage_state(task.storage_state)
+        account.status = 1  # 激活账号
+        account.last_auth_time = task.created_at
+        db.commit()
+        return True
+
+    if not await run_db(save):
+        raise HTTPException(status_code=404, detail="账号不存在")
 
     # 清理任务
     await playwright_mgr.close_auth_task(task_id)
@@ -265,6 +270,37 @@ async def save_auth(task_id: str, account_id: int, db: Session = Depends(get_db)
     return ApiResponse(success=True, message="授权信息已保存")
 
 
+def _save_confirmed_account(db: Session, task, cookies: list, storage_state: dict):
+    """把授权结果写入账号：更新已有账号或创建新账号（同步，在数据库线程池中执行）"""
+    if task.account_id:
+        # 更新现有账号
+        account = db.query(Account).filter(Account.id == task.account_id).first()
+        if account:
+            account.cookies = encrypt_cookies(cookies)
+            account.storage_state = encrypt_storage_state(storage_state)
+            account.status = 1
+            account.last_auth_time = task.created_at
+            db.commit()
+            task.account_id = account.id
+            logger.info(f"账号授权已更新: {account.id}")
+    else:
+        # 创建新账号
+        account_name = task.account_name or f"{PLATFORMS[task.platform]['name']}账号"
+        account = Account(
+            platform=task.platform,
+            account_name=account_name,
+            cookies=encrypt_cookies(cookies),
+            storage_state=encrypt_storage_state(storage_state),
+            status=1,
+            last_auth_time=task.created_at
+        )
+        db.add(account)
+        db.commit()
+        db.refresh(account)
+        task.created_account_id = account.id
+        logger.info(f"新账号已创建: {account.id}, 名称: {account_name}")
+
+
 @router.post("/auth/confirm/{task_id}", response_model=ApiResponse)
 async def confirm_auth(task_id: str, db: Session = Depends(get_db)):
     """
@@ -302,37 +338,9 @@ async def confirm_auth(task_id: str, db: Session = Depends(get_db)):
             message="未检测到登录信息，请先在平台完成登录后再点击授权完成"
         )
 
-    # 保存到数据库
+    # 保存到数据库（数据库线程池中执行）
     try:
-        from backend.database.models import Account
-
-        if task.account_id:
-            # 更新现有账号
-            account = db.query(Account).filter(Account.id == task.account_id).first()
-            if account:
-                account.cookies = encrypt_cookies(cookies)
-                account.storage_state = encrypt_storage_state(storage_state)
-                account.status = 1
-                account.last_auth_time = task.created_at
-                db.commit()
-                task.account_id = account.id
-                logger.info(f"账号授权已更新: {account.id}")
-        else:
-            # 创建新账号
-            account_name = task.account_name or f"{PLATFORMS[task.platform]['name']}账号"
-            account = Account(
-                platform=task.platform,
-                account_name=account_name,
-                cookies=encrypt_cookies(cookies),
-                storage_state=encrypt_storage_state(storage_state),
-                status=1,
-                last_auth_time=task.created_at
-            )
-            db.add(account)
-            db.commit()
-            db.refresh(account)
-            task.created_account_id = account.id
-            logger.info(f"新账号已创建: {account.id}, 名称: {account_name}")
+        await run_db(_save_confirmed_account, db, task, cookies, storage_state)
 
         # 更新任务状态
         task.status = "success"
@@ -363,7 +371,7 @@ async def confirm_auth(task_id: str, db: Session = Depends(get_db)):
 
     except Exception as e:
         logger.error(f"授权确认失败: {e}")
-        db.rollback()
+        await run_db(db.rollback)
         return ApiResponse(success=False, message=f"保存失败: {str(e)}")
 
 
@@ -19,7 +19,7 @@ router = APIRouter(prefix="/api/articles", tags=["文章管理"])
 
 
 @router.get("", response_model=ArticleListResponse)
-async def get_articles(
+def get_articles(
     page: int = Query(1, ge=1, description="页码"),
     limit: int = Query(20, ge=1, le=100, description="每页数量"),
     status: Optional[int] = Query(None, description="状态筛选"),
@@ -52,7 +52,7 @@ async def get_articles(
 
 
 @router.get("/{article_id}", response_model=ArticleResponse)
-async def get_article(article_id: int, db: Session = Depends(get_db)):
+def get_article(article_id: int, db: Session = Depends(get_db)):
     """获取文章详情"""
     article = db.query(Article).filter(Article.id == article_id).first()
     if not article:
@@ -66,7 +66,7 @@ async def get_article(article_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("", response_model=ArticleResponse, status_code=201)
-async def create_article(article_data: ArticleCreate, db: Session = Depends(get_db)):
+def create_article(article_data: ArticleCreate, db: Session = Depends(get_db)):
     """
     创建文章
 
@@ -89,7 +89,7 @@ async def create_article(article_data: ArticleCreate, db: Session = Depends(get_
 
 
 @router.put("/{article_id}", response_model=ArticleResponse)
-async def update_article(
+def update_article(
     article_id: int,
     article_data: ArticleUpdate,
     db: Session = Depends(get_db)
@@ -123,7 +123,7 @@ async def update_article(
 
 
 @router.delete("/{article_id}", response_model=ApiResponse)
-async def delete_article(article_id: int, db: Session = Depends(get_db)):
+def delete_article(article_id: int, db: Session = Depends(get_db)):
     """
     删除文章
 
@@ -141,7 +141,7 @@ async def delete_article(article_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/{article_id}/publish", response_model=ApiResponse)
-async def mark_published(article_id: int, db: Session = Depends(get_db)):
+def mark_published(article_id: int, db: Session = Depends(get_db)):
     """标记文章为已发布"""
     article = db.query(Article).filter(Article.id == article_id).first()
     if not article:
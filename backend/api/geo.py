@@ -4,16 +4,24 @@ GEO文章管理 API - 工业加固版
 处理文章生成、质检、列表、收录检测触发等
 """
 
-from typing import List, Optional, Any
+import hashlib
+import json
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
-from pydantic import BaseModel, ConfigDict
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Header, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 
-from backend.database import get_db, SessionLocal
-from backend.services.geo_article_service import GeoArticleService
-from backend.database.models import GeoArticle, Project
+from backend.config import GENERATE_BULK_CONCURRENCY, GENERATE_BULK_MAX
+from backend.database import get_db, run_db, SessionLocal
+from backend.database.pagination import encode_cursor, decode_cursor
+from backend.services.geo_article_service import GeoArticleService, new_placeholder, generate_bulk
+from backend.services.websocket_manager import ws_manager
+from backend.database.models import GeoArticle, Project, Keyword
 from backend.schemas import ApiResponse
 from loguru import logger
 
@@ -30,14 +38,23 @@ class GenerateArticleRequest(BaseModel):
     publish_time: Optional[datetime] = None
 
 
-class ArticleResponse(BaseModel):
+class BulkGenerateRequest(BaseModel):
+    """批量生成请求：按项目（取全部关键词）或指定关键词列表"""
+    project_id: Optional[int] = None
+    keyword_ids: Optional[List[int]] = None
+    company_name: Optional[str] = None  # 不填则使用关键词所属项目的公司名
+    platform: str = "zhihu"
+    publish_time: Optional[datetime] = None
+    concurrency: Optional[int] = Field(None, ge=1, le=GENERATE_BULK_CONCURRENCY)
+
+
+class ArticleSummaryResponse(BaseModel):
     """
-    🌟 核心模型：解决前端列表显示的所有字段需求
+    列表摘要视图：不含正文、发布日志、收录详情等大字段
     """
     id: int
     keyword_id: int
     title: Optional[str] = None
-    content: Optional[str] = None
 
     # 状态字段
     quality_status: Optional[str] = "pending"
@@ -53,9 +70,7 @@ class ArticleResponse(BaseModel):
     # 记录与日志
     retry_count: Optional[int] = 0
     error_msg: Optional[str] = None
-    publish_logs: Optional[str] = None
     platform_url: Optional[str] = None  # 🌟 发布成功后的真实链接
-    index_details: Optional[str] = None
 
     # 时间戳
     publish_time: Optional[datetime] = None
@@ -66,6 +81,15 @@ class ArticleResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ArticleResponse(ArticleSummaryResponse):
+    """
+    🌟 核心模型：解决前端列表显示的所有字段需求（完整视图）
+    """
+    content: Optional[str] = None
+    publish_logs: Optional[str] = None
+    index_details: Optional[str] = None
+
+
 class ProjectResponse(BaseModel):
     id: int
     name: str
@@ -87,10 +111,72 @@ async def run_generate_task(keyword_id: int, company_name: str, platform: str, p
         db.close()
 
 
+# 批量生成任务进度（内存存储，只保留最近的任务）
+_bulk_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_BULK_JOBS_KEEP = 50
+
+
+def _create_placeholders(db: Session, request: BulkGenerateRequest) -> List[Dict[str, Any]]:
+    """
+    解析关键词并在一个事务里插入全部占位文章（同步，在数据库线程池中执行）
+
+    Returns:
+        [{"article_id", "keyword", "company_name"}]
+
+    Raises:
+        HTTPException(400): 关键词超过 GENERATE_BULK_MAX，或指定的关键词有不存在的（不静默截断 / 丢弃）
+    """
+    query = db.query(Keyword.id, Keyword.keyword, Project.company_name).join(
+        Project, Keyword.project_id == Project.id)
+    if request.keyword_ids:
+        query = query.filter(Keyword.id.in_(request.keyword_ids))
+    else:
+        query = query.filter(Keyword.project_id == request.project_id)
+    rows = query.order_by(Keyword.id).limit(GENERATE_BULK_MAX + 1).all()
+
+    if len(rows) > GENERATE_BULK_MAX:
+        raise HTTPException(status_code=400, detail=f"单次最多生成 {GENERATE_BULK_MAX} 篇，请分批提交")
+    if request.keyword_ids:
+        missing = sorted(set(request.keyword_ids) - {kw_id for kw_id, _, _ in rows})
+        if missing:
+            raise HTTPException(status_code=400, detail=f"关键词不存在: {missing}")
+
+    articles = [new_placeholder(kw_id, request.platform, request.publish_time) for kw_id, _, _ in rows]
+    try:
+        db.add_all(articles)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return [
+        {"article_id": article.id, "keyword": kw_text, "company_name": request.company_name or company}
+        for article, (_, kw_text, company) in zip(articles, rows)
+    ]
+
+
+async def run_bulk_generate_task(task_id: str, items: List[Dict[str, Any]], request: BulkGenerateRequest):
+    """后台执行批量生成，并通过 WebSocket 推送汇总进度（主题 generate:<任务ID>）"""
+    job = _bulk_jobs[task_id]
+
+    async def on_progress(progress: Dict[str, Any]):
+        job.update({k: progress[k] for k in ("completed", "succeeded", "failed")})
+        await ws_manager.broadcast({"type": "generate_progress", "task_id": task_id, "data": progress})
+
+    try:
+        await generate_bulk(items, request.platform, request.publish_time,
+                            request.concurrency or GENERATE_BULK_CONCURRENCY, on_progress)
+    except Exception as e:
+        logger.error(f"❌ 批量生成任务失败: {task_id}, {e}")
+    finally:
+        job["status"] = "finished"
+        await ws_manager.broadcast({"type": "generate_complete", "task_id": task_id, "data": dict(job)})
+
+
 # ==================== 接口实现 ====================
 
 @router.get("/projects", response_model=List[ProjectResponse])
-async def list_projects(db: Session = Depends(get_db)):
+def list_projects(db: Session = Depends(get_db)):
     """获取所有活跃项目列表"""
     return db.query(Project).filter(Project.status == 1).all()
 
@@ -111,11 +197,108 @@ async def generate_article(request: GenerateArticleRequest, background_tasks: Ba
     return ApiResponse(success=True, message="生成任务已提交，请在列表查看进度")
 
 
+@router.post("/generate/bulk", response_model=ApiResponse)
+async def generate_bulk_articles(request: BulkGenerateRequest, background_tasks: BackgroundTasks,
+                                 db: Session = Depends(get_db)):
+    """
+    批量提交文章生成任务
+    一次事务插入全部占位文章，后台按有界并发调用 n8n，进度通过 WebSocket 推送
+    """
+    if not request.project_id and not request.keyword_ids:
+        raise HTTPException(status_code=400, detail="请指定项目或关键词列表")
+
+    items = await run_db(_create_placeholders, db, request)
+    if not items:
+        return ApiResponse(success=False, message="没有可生成的关键词")
+
+    task_id = str(uuid.uuid4())
+    _bulk_jobs[task_id] = {"task_id": task_id, "status": "running", "total": len(items),
+                           "completed": 0, "succeeded": 0, "failed": 0,
+                           "article_ids": [item["article_id"] for item in items]}
+    while len(_bulk_jobs) > _BULK_JOBS_KEEP:
+        _bulk_jobs.popitem(last=False)
+
+    background_tasks.add_task(run_bulk_generate_task, task_id, items, request)
+    return ApiResponse(success=True, message=f"已提交 {len(items)} 篇生成任务", data=_bulk_jobs[task_id])
+
+
+@router.get("/generate/bulk/{task_id}", response_model=ApiResponse)
+async def get_bulk_progress(task_id: str):
+    """查询批量生成进度"""
+    job = _bulk_jobs.get(task_id)
+    if not job:
+        return ApiResponse(success=False, message="任务不存在或已过期")
+    return ApiResponse(success=True, data=job)
+
+
+def _etag(payload: Any) -> str:
+    """响应内容的弱 ETag"""
+    digest = hashlib.sha1(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
 @router.get("/articles", response_model=List[ArticleResponse])
-async def list_articles(limit: int = Query(100), db: Session = Depends(get_db)):
-    """获取文章列表（按创建时间倒序）"""
-    articles = db.query(GeoArticle).order_by(desc(GeoArticle.created_at)).limit(limit).all()
-    return articles
+def list_articles(
+    limit: int = Query(100, ge=1, le=500),
+    view: str = Query("full", pattern="^(full|summary)$", description="summary 不返回正文/日志/收录详情"),
+    status: Optional[str] = Query(None, description="发布状态"),
+    platform: Optional[str] = Query(None, description="发布平台"),
+    keyword_id: Optional[int] = Query(None, description="关键词ID"),
+    cursor: Optional[str] = Query(None, description="分页游标，取上一页响应头 X-Next-Cursor"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    获取文章列表（按创建时间倒序）
+
+    按 (created_at, id) 键集分页，还有下一页时响应头带 X-Next-Cursor；
+    ETag 由本页各文章的 (id, updated_at) 推出，客户端带 If-None-Match 且未变时直接返回 304，
+    不加载正文、不序列化列表。
+    """
+    before = None
+    if cursor:
+        try:
+            before = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+
+    service = GeoArticleService(db)
+    filters = dict(publish_status=status, platform=platform, keyword_id=keyword_id, before=before)
+    # 先用窄列查询推出本页的 ETag（多取一条用来判断是否还有下一页），命中时不再加载和序列化整页
+    versions = service.get_article_versions(limit=limit + 1, **filters)
+
+    headers = {"Cache-Control": "no-cache"}
+    if len(versions) > limit:
+        versions = versions[:limit]
+        next_cursor = encode_cursor(versions[-1].created_at, versions[-1].id)
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+
+    headers["ETag"] = _etag([view, [[v.id, str(v.updated_at)] for v in versions], headers.get("X-Next-Cursor")])
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    summary = view == "summary"
+    articles = service.get_articles(limit=limit, summary=summary, **filters)
+    schema = ArticleSummaryResponse if summary else ArticleResponse
+    payload = jsonable_encoder([schema.model_validate(a) for a in articles])
+    return JSONResponse(content=payload, headers=headers)
+
+
+@router.get("/articles/{article_id}", response_model=ArticleResponse)
+def get_article_detail(article_id: int, db: Session = Depends(get_db)):
+    """获取单篇文章完整内容（列表使用摘要视图时，预览从这里取正文）"""
+    article = GeoArticleService(db).get_article(article_id)
+    if not article:
+        raise HTTPException(status_code=404, detail="文章不存在")
+    return article
 
 
 @router.post("/articles/{article_id}/check-quality", response_model=ApiResponse)
@@ -149,7 +332,7 @@ async def manual_check_index(article_id: int, db: Session = Depends(get_db)):
 
 
 @router.delete("/articles/{article_id}", response_model=ApiResponse)
-async def delete_article(article_id: int, db: Session = Depends(get_db)):
+def delete_article(article_id: int, db: Session = Depends(get_db)):
     """删除文章记录"""
     article = db.query(GeoArticle).filter(GeoArticle.id == article_id).first()
     if not article:
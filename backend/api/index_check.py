@@ -28,7 +28,7 @@ class RecordResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 @router.post("/check", response_model=ApiResponse)
-async def check_index(request: CheckRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+def check_index(request: CheckRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     keyword = db.query(Keyword).filter(Keyword.id == request.keyword_id).first()
     if not keyword:
         raise HTTPException(status_code=404, detail="关键词不存在")
@@ -42,6 +42,6 @@ async def check_index(request: CheckRequest, background_tasks: BackgroundTasks,
     return ApiResponse(success=True, message="监测任务已下发至后台执行")
 
 @router.get("/records", response_model=List[RecordResponse])
-async def get_records(keyword_id: Optional[int] = Query(None), limit: int = Query(50), db: Session = Depends(get_db)):
+def get_records(keyword_id: Optional[int] = Query(None), limit: int = Query(50), db: Session = Depends(get_db)):
     service = IndexCheckService(db)
     return service.get_check_records(keyword_id=keyword_id, limit=limit)
\ No newline at end of file
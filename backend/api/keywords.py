@@ -10,7 +10,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from backend.database import get_db
+from backend.database import get_db, run_db
 from backend.database.models import Project, Keyword, QuestionVariant
 from backend.services.keyword_service import KeywordService
 from backend.schemas import ApiResponse
@@ -84,25 +84,27 @@ class DistillRequest(BaseModel):
     industry: Optional[str] = None
     description: Optional[str] = None
     count: int = 10
+    refresh: bool = False  # 开启 N8N_CACHE_GENERATION 时跳过 n8n 响应缓存，强制重新蒸馏
 
 
 class GenerateQuestionsRequest(BaseModel):
     """生成问题变体请求"""
     keyword_id: int
     count: int = 3
+    refresh: bool = False  # 开启 N8N_CACHE_GENERATION 时跳过 n8n 响应缓存，强制重新生成
 
 
 # ==================== 项目API ====================
 
 @router.get("/projects", response_model=List[ProjectResponse])
-async def list_projects(db: Session = Depends(get_db)):
+def list_projects(db: Session = Depends(get_db)):
     """获取活跃项目列表"""
     projects = db.query(Project).filter(Project.status != 0).order_by(Project.created_at.desc()).all()
     return projects
 
 
 @router.post("/projects", response_model=ProjectResponse, status_code=201)
-async def create_project(project_data: ProjectCreate, db: Session = Depends(get_db)):
+def create_project(project_data: ProjectCreate, db: Session = Depends(get_db)):
     """创建项目"""
     project = Project(
         name=project_data.name,
@@ -120,7 +122,7 @@ async def create_project(project_data: ProjectCreate, db: Session = Depends(get_
 
 
 @router.get("/projects/{project_id}/keywords", response_model=List[KeywordResponse])
-async def get_project_keywords(project_id: int, db: Session = Depends(get_db)):
+def get_project_keywords(project_id: int, db: Session = Depends(get_db)):
     """
     🌟 [修复核心] 获取项目的所有关键词
     移除了严格的 status == "active" 过滤，确保所有导入的词都能显示
@@ -138,7 +140,7 @@ async def get_project_keywords(project_id: int, db: Session = Depends(get_db)):
 @router.post("/distill", response_model=ApiResponse)
 async def distill_keywords(request: DistillRequest, db: Session = Depends(get_db)):
     """蒸馏关键词"""
-    project = db.query(Project).filter(Project.id == request.project_id).first()
+    project = await run_db(lambda: db.query(Project).filter(Project.id == request.project_id).first())
     if not project:
         raise HTTPException(status_code=404, detail="项目不存在")
 
@@ -147,21 +149,27 @@ async def distill_keywords(request: DistillRequest, db: Session = Depends(get_db
         company_name=request.company_name,
         industry=request.industry or "",
         description=request.description or "",
-        count=request.count
+        count=request.count,
+        use_cache=not request.refresh
     )
 
     if result.get("status") == "error":
         return ApiResponse(success=False, message=result.get("message", "蒸馏失败"))
 
     keywords_data = result.get("keywords", [])
-    saved_keywords = []
-    for kw_data in keywords_data:
-        keyword = service.add_keyword(
-            project_id=request.project_id,
-            keyword=kw_data.get("keyword", ""),
-            difficulty_score=kw_data.get("difficulty_score")
-        )
-        saved_keywords.append({"id": keyword.id, "keyword": keyword.keyword})
+
+    def save_keywords():
+        saved = []
+        for kw_data in keywords_data:
+            keyword = service.add_keyword(
+                project_id=request.project_id,
+                keyword=kw_data.get("keyword", ""),
+                difficulty_score=kw_data.get("difficulty_score")
+            )
+            saved.append({"id": keyword.id, "keyword": keyword.keyword})
+        return saved
+
+    saved_keywords = await run_db(save_keywords)
 
     return ApiResponse(success=True, message=f"成功蒸馏{len(saved_keywords)}个词", data={"keywords": saved_keywords})
 
@@ -169,23 +177,28 @@ async def distill_keywords(request: DistillRequest, db: Session = Depends(get_db
 @router.post("/generate-questions", response_model=ApiResponse)
 async def generate_questions(request: GenerateQuestionsRequest, db: Session = Depends(get_db)):
     """生成问题变体"""
-    keyword = db.query(Keyword).filter(Keyword.id == request.keyword_id).first()
+    keyword = await run_db(lambda: db.query(Keyword).filter(Keyword.id == request.keyword_id).first())
     if not keyword:
         raise HTTPException(status_code=404, detail="关键词不存在")
 
     service = KeywordService(db)
-    questions = await service.generate_questions(keyword=keyword.keyword, count=request.count)
+    questions = await service.generate_questions(keyword=keyword.keyword, count=request.count,
+                                                 use_cache=not request.refresh)
+
+    def save_questions():
+        saved = []
+        for question in questions:
+            qv = service.add_question_variant(keyword_id=request.keyword_id, question=question)
+            saved.append({"id": qv.id, "question": qv.question})
+        return saved
 
-    saved_questions = []
-    for question in questions:
-        qv = service.add_question_variant(keyword_id=request.keyword_id, question=question)
-        saved_questions.append({"id": qv.id, "question": qv.question})
+    saved_questions = await run_db(save_questions)
 
     return ApiResponse(success=True, message="生成完成", data={"questions": saved_questions})
 
 
 @router.post("/projects/{project_id}/keywords", response_model=KeywordResponse, status_code=201)
-async def create_keyword(project_id: int, keyword_data: KeywordCreate, db: Session = Depends(get_db)):
+def create_keyword(project_id: int, keyword_data: KeywordCreate, db: Session = Depends(get_db)):
     """手动创建关键词"""
     keyword = Keyword(
         project_id=project_id,
@@ -200,7 +213,7 @@ async def create_keyword(project_id: int, keyword_data: KeywordCreate, db: Sessi
 
 
 @router.delete("/keywords/{keyword_id}", response_model=ApiResponse)
-async def delete_keyword(keyword_id: int, db: Session = Depends(get_db)):
+def delete_keyword(keyword_id: int, db: Session = Depends(get_db)):
     """删除关键词"""
     keyword = db.query(Keyword).filter(Keyword.id == keyword_id).first()
     if not keyword:
@@ -7,9 +7,11 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
 from backend.database import get_db
+from backend.database.fts import search_knowledge_fts
 from backend.database.models import KnowledgeCategory, Knowledge
 from backend.schemas import ApiResponse
 from loguru import logger
@@ -78,10 +80,16 @@ class KnowledgeResponse(BaseModel):
     updated_at: str
 
 
+class KnowledgeSearchResponse(KnowledgeResponse):
+    """知识搜索结果：附带命中片段（<mark> 高亮）与相关度，分数越小越相关"""
+    snippet: Optional[str] = None
+    rank: Optional[float] = None
+
+
 # ==================== 知识库分类API ====================
 
 @router.get("/categories", response_model=List[KnowledgeCategoryResponse])
-async def get_categories(
+def get_categories(
     search: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
@@ -138,7 +146,7 @@ async def get_categories(
 
 
 @router.post("/categories", response_model=ApiResponse)
-async def create_category(
+def create_category(
     data: KnowledgeCategoryCreate,
     db: Session = Depends(get_db)
 ):
@@ -172,7 +180,7 @@ async def create_category(
 
 
 @router.put("/categories/{category_id}", response_model=ApiResponse)
-async def update_category(
+def update_category(
     category_id: int,
     data: KnowledgeCategoryUpdate,
     db: Session = Depends(get_db)
@@ -218,7 +226,7 @@ async def update_category(
 
 
 @router.delete("/categories/{category_id}", response_model=ApiResponse)
-async def delete_category(
+def delete_category(
     category_id: int,
     db: Session = Depends(get_db)
 ):
@@ -256,7 +264,7 @@ async def delete_category(
 # ==================== 知识条目API ====================
 
 @router.get("/categories/{category_id}/knowledge", response_model=List[KnowledgeResponse])
-async def get_knowledge_list(
+def get_knowledge_list(
     category_id: int,
     search: Optional[str] = None,
     db: Session = Depends(get_db)
@@ -300,7 +308,7 @@ async def get_knowledge_list(
 
 
 @router.post("/knowledge", response_model=ApiResponse)
-async def create_knowledge(
+def create_knowledge(
     data: KnowledgeCreate,
     db: Session = Depends(get_db)
 ):
@@ -342,7 +350,7 @@ async def create_knowledge(
 
 
 @router.put("/knowledge/{knowledge_id}", response_model=ApiResponse)
-async def update_knowledge(
+def update_knowledge(
     knowledge_id: int,
     data: KnowledgeUpdate,
     db: Session = Depends(get_db)
@@ -384,7 +392,7 @@ async def update_knowledge(
 
 
 @router.delete("/knowledge/{knowledge_id}", response_model=ApiResponse)
-async def delete_knowledge(
+def delete_knowledge(
     knowledge_id: int,
     db: Session = Depends(get_db)
 ):
@@ -418,36 +426,64 @@ async def delete_knowledge(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/knowledge/search", response_model=List[KnowledgeResponse])
-async def search_knowledge(
+def _to_response(item: Knowledge, **extra) -> dict:
+    return dict(
+        id=item.id,
+        category_id=item.category_id,
+        title=item.title,
+        content=item.content,
+        type=item.type,
+        created_at=item.created_at.isoformat() if item.created_at else "",
+        updated_at=item.updated_at.isoformat() if item.updated_at else "",
+        **extra,
+    )
+
+
+@router.get("/knowledge/search", response_model=List[KnowledgeSearchResponse])
+def search_knowledge(
     keyword: str = Query(..., min_length=1),
+    category_id: Optional[int] = Query(None, description="限定分类（可选）"),
+    limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db)
 ):
     """
     全局搜索知识
 
+    走 knowledge_fts 全文索引，按 bm25 相关度排序并返回命中片段；
+    查询词不足 3 个字（trigram 无法匹配）或索引不可用时退回 LIKE。
+
     Args:
-        keyword: 搜索关键词
+        keyword: 搜索关键词，空格分隔的多个词按 AND 匹配
+        category_id: 分类ID（可选）
+        limit: 返回数量
         db: 数据库会话
 
     Returns:
         知识条目列表
     """
-    items = db.query(Knowledge).filter(
-        Knowledge.status == 1,
-        (Knowledge.title.like(f"%{keyword}%")) |
-        (Knowledge.content.like(f"%{keyword}%"))
-    ).order_by(Knowledge.updated_at.desc()).limit(50).all()
-
-    return [
-        KnowledgeResponse(
-            id=item.id,
-            category_id=item.category_id,
-            title=item.title,
-            content=item.content,
-            type=item.type,
-            created_at=item.created_at.isoformat() if item.created_at else "",
-            updated_at=item.updated_at.isoformat() if item.updated_at else "",
+    try:
+        hits = search_knowledge_fts(db, keyword, limit=limit, category_id=category_id)
+    except OperationalError as e:
+        logger.warning(f"知识库全文索引不可用，退回 LIKE: {e}")
+        hits = None
+
+    if hits is not None:
+        items = {item.id: item for item in db.query(Knowledge).filter(
+            Knowledge.id.in_([h["id"] for h in hits])
+        )}
+        return [
+            KnowledgeSearchResponse(**_to_response(items[h["id"]], snippet=h["snippet"], rank=h["rank"]))
+            for h in hits if h["id"] in items
+        ]
+
+    query = db.query(Knowledge).filter(Knowledge.status == 1)
+    if category_id is not None:
+        query = query.filter(Knowledge.category_id == category_id)
+    for term in keyword.split() or [keyword]:
+        query = query.filter(
+            (Knowledge.title.like(f"%{term}%")) |
+            (Knowledge.content.like(f"%{term}%"))
         )
-        for item in items
-    ]
+    items = query.order_by(Knowledge.updated_at.desc()).limit(limit).all()
+
+    return [KnowledgeSearchResponse(**_to_response(item)) for item in items]
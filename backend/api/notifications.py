@@ -91,7 +91,7 @@ async def check_alerts(
 
 
 @router.get("/summary", response_model=AlertSummaryResponse)
-async def get_alert_summary(
+def get_alert_summary(
     project_id: Optional[int] = Query(None, description="项目ID"),
     db: Session = Depends(get_db)
 ):
@@ -6,12 +6,14 @@
 
 import asyncio
 import uuid
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session, joinedload, load_only
 from loguru import logger
 
-from backend.database import get_db
+from backend.database import get_db, run_db
+from backend.database.pagination import encode_cursor, decode_cursor, keyset_before
+from backend.database.writer import get_db_writer
 from backend.database.models import PublishRecord, Account, Article
 from backend.schemas import (
     ApiResponse,
@@ -131,16 +133,8 @@ async def get_supported_platforms():
     return ApiResponse(data={"platforms": platforms})
 
 
-@router.post("/create", response_model=ApiResponse)
-async def create_publish_task(
-    request: PublishTaskCreate,
-    db: Session = Depends(get_db),
-):
-    """
-    创建发布任务
-
-    用这个接口来启动批量发布！
-    """
+def _create_publish_records(db: Session, request: PublishTaskCreate):
+    """校验文章/账号并创建待发布记录（同步，在数据库线程池中执行）"""
     # 1. 验证文章和账号是否存在
     articles = db.query(Article).filter(Article.id.in_(request.article_ids)).all()
     if len(articles) != len(request.article_ids):
@@ -165,25 +159,36 @@ async def create_publish_task(
     # 3. 创建批量发布任务
     task_id = publish_task_manager.create_task(request.article_ids, request.account_ids)
 
-    # 4. 创建发布记录（待发布状态）
-    for article_id in request.article_ids:
-        for account_id in request.account_ids:
-            # 检查是否已有发布记录
-            existing = db.query(PublishRecord).filter(
-                PublishRecord.article_id == article_id,
-                PublishRecord.account_id == account_id
-            ).first()
-
-            if not existing:
-                record = PublishRecord(
-                    article_id=article_id,
-                    account_id=account_id,
-                    publish_status=0,  # 待发布
-                )
-                db.add(record)
-
+    # 4. 创建发布记录（待发布状态），已有记录的组合一次查出来跳过
+    existing = set(db.query(PublishRecord.article_id, PublishRecord.account_id).filter(
+        PublishRecord.article_id.in_(request.article_ids),
+        PublishRecord.account_id.in_(request.account_ids),
+    ).all())
+
+    db.add_all([
+        PublishRecord(article_id=article_id, account_id=account_id, publish_status=0)  # 待发布
+        for article_id in request.article_ids
+        for account_id in request.account_ids
+        if (article_id, account_id) not in existing
+    ])
     db.commit()
 
+    return articles, accounts, task_id
+
+
+@router.post("/create", response_model=ApiResponse)
+async def create_publish_task(
+    request: PublishTaskCreate,
+    db: Session = Depends(get_db),
+):
+    """
+    创建发布任务
+
+    用这个接口来启动批量发布！
+    """
+    # 1~4. 校验并写入发布记录（数据库线程池中执行）
+    articles, accounts, task_id = await run_db(_create_publish_records, db, request)
+
     # 5. 后台执行发布任务
     # 注意：用asyncio.create_task而不是BackgroundTasks，因为要运行async函数！
     asyncio.create_task(execute_publish_task(task_id, articles, accounts))
@@ -197,6 +202,52 @@ async def create_publish_task(
     })
 
 
+def _save_publish_progress(db: Session, article_id: int, account_id: int, status: int,
+                           platform_url: Optional[str], error_msg: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    写回单个子任务的发布结果（单写者队列中执行，由队列统一提交）
+
+    Returns:
+        推送给前端的文章/账号信息，记录不存在时返回 None
+    """
+    from datetime import datetime
+    from backend.config import PLATFORMS
+
+    record = db.query(PublishRecord).filter(
+        PublishRecord.article_id == article_id,
+        PublishRecord.account_id == account_id
+    ).first()
+
+    if record:
+        record.publish_status = status
+        record.platform_url = platform_url
+        record.error_msg = error_msg
+        if status == PublishStatus.SUCCESS:
+            record.published_at = datetime.now()
+
+        # 更新文章发布时间（首次发布）
+        if status == PublishStatus.SUCCESS:
+            article = db.query(Article).filter(Article.id == article_id).first()
+            if article and not article.published_at:
+                article.published_at = datetime.now()
+            if article and article.status == 0:
+                article.status = 1
+
+    # 获取账号和文章信息用于推送
+    account_obj = db.query(Account).filter(Account.id == account_id).first()
+    article_obj = db.query(Article).filter(Article.id == article_id).first()
+    if not account_obj or not article_obj:
+        return None
+
+    platform_config = PLATFORMS.get(account_obj.platform, {})
+    return {
+        "article_title": article_obj.title,
+        "account_name": account_obj.account_name,
+        "platform": account_obj.platform,
+        "platform_name": platform_config.get("name", account_obj.platform),
+    }
+
+
 async def execute_publish_task(task_id: str, articles: List[Article],
                                accounts: List[Account]):
     """
@@ -239,67 +290,29 @@ async def execute_publish_task(task_id: str, articles: List[Article],
             task_id, article_id, account_id, status, platform_url, error_msg
         )
 
-        # 更新数据库记录
-        from backend.database import SessionLocal
-        db = SessionLocal()
+        # 更新数据库记录（单写者队列合并提交）
         try:
-            record = db.query(PublishRecord).filter(
-                PublishRecord.article_id == article_id,
-                PublishRecord.account_id == account_id
-            ).first()
-
-            if record:
-                record.publish_status = status
-                record.platform_url = platform_url
-                record.error_msg = error_msg
-                if status == PublishStatus.SUCCESS:
-                    from datetime import datetime
-                    record.published_at = datetime.now()
-
-                db.commit()
-
-                # 更新文章发布时间（首次发布）
-                if status == PublishStatus.SUCCESS:
-                    article = db.query(Article).filter(Article.id == article_id).first()
-                    if article and not article.published_at:
-                        from datetime import datetime
-                        article.published_at = datetime.now()
-                    if article and article.status == 0:
-                        article.status = 1
-                    db.commit()
-
-            # 获取账号和文章信息用于推送
-            account_obj = db.query(Account).filter(Account.id == account_id).first()
-            article_obj = db.query(Article).filter(Article.id == article_id).first()
-
-            if account_obj and article_obj:
-                from backend.config import PLATFORMS
-                platform_config = PLATFORMS.get(account_obj.platform, {})
-
-                # 推送WebSocket进度更新
-                ws_mgr = get_ws_manager()
-                if ws_mgr:
-                    await ws_mgr.broadcast({
-                        "type": "publish_progress",
-                        "task_id": task_id,
-                        "data": {
-                            "article_id": article_id,
-                            "article_title": article_obj.title,
-                            "account_id": account_id,
-                            "account_name": account_obj.account_name,
-                            "platform": account_obj.platform,
-                            "platform_name": platform_config.get("name", account_obj.platform),
-                            "status": status,
-                            "platform_url": platform_url,
-                            "error_msg": error_msg,
-                        }
-                    })
-
+            info = await get_db_writer().write(
+                _save_publish_progress, article_id, account_id, status, platform_url, error_msg)
         except Exception as e:
             logger.error(f"更新发布记录失败: {e}")
-            db.rollback()
-        finally:
-            db.close()
+            info = None
+
+        # 推送WebSocket进度更新
+        ws_mgr = get_ws_manager()
+        if info and ws_mgr:
+            await ws_mgr.broadcast({
+                "type": "publish_progress",
+                "task_id": task_id,
+                "data": {
+                    "article_id": article_id,
+                    "account_id": account_id,
+                    **info,
+                    "status": status,
+                    "platform_url": platform_url,
+                    "error_msg": error_msg,
+                }
+            })
 
     # 批量执行
     try:
@@ -310,7 +323,7 @@ async def execute_publish_task(task_id: str, articles: List[Article],
 
 
 @router.get("/progress/{task_id}", response_model=ApiResponse)
-async def get_publish_progress(task_id: str, db: Session = Depends(get_db)):
+def get_publish_progress(task_id: str, db: Session = Depends(get_db)):
     """
     获取发布进度
 
@@ -319,11 +332,6 @@ async def get_publish_progress(task_id: str, db: Session = Depends(get_db)):
     task_info = publish_task_manager.get_task(task_id)
 
     if not task_info:
-        # 尝试从数据库获取历史记录
-        records = db.query(PublishRecord).order_by(
-            PublishRecord.created_at.desc()
-        ).limit(100).all()
-
         # 如果找不到任务，返回空
         return ApiResponse(
             success=False,
@@ -331,11 +339,21 @@ async def get_publish_progress(task_id: str, db: Session = Depends(get_db)):
             data={"task_id": task_id, "total": 0, "completed": 0, "failed": 0, "items": []}
         )
 
-    # 获取详细信息
+    # 获取详细信息：文章、账号各一次 IN 查询，只取展示需要的列
+    sub_tasks = task_info["sub_tasks"]
+    article_ids = {t["article_id"] for t in sub_tasks}
+    account_ids = {t["account_id"] for t in sub_tasks}
+    articles = {a.id: a for a in db.query(Article).options(
+        load_only(Article.id, Article.title, Article.created_at)
+    ).filter(Article.id.in_(article_ids))}
+    accounts = {a.id: a for a in db.query(Account).options(
+        load_only(Account.id, Account.account_name, Account.platform)
+    ).filter(Account.id.in_(account_ids))}
+
     items = []
-    for sub_task in task_info["sub_tasks"]:
-        article = db.query(Article).filter(Article.id == sub_task["article_id"]).first()
-        account = db.query(Account).filter(Account.id == sub_task["account_id"]).first()
+    for sub_task in sub_tasks:
+        article = articles.get(sub_task["article_id"])
+        account = accounts.get(sub_task["account_id"])
 
         if not article or not account:
             continue
@@ -366,31 +384,53 @@ async def get_publish_progress(task_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/records", response_model=List[dict])
-async def get_publish_records(
+def get_publish_records(
+    response: Response,
     article_id: Optional[int] = Query(None, description="文章ID"),
     account_id: Optional[int] = Query(None, description="账号ID"),
     limit: int = Query(50, ge=1, le=200, description="返回数量"),
+    cursor: Optional[str] = Query(None, description="分页游标，取上一页响应头 X-Next-Cursor"),
     db: Session = Depends(get_db),
 ):
     """
     获取发布记录
 
     用这个接口来查看历史发布记录！
+    按 (created_at, id) 倒序做键集分页：还有下一页时响应头带 X-Next-Cursor，
+    文章标题和账号信息随记录一次 JOIN 查出。
     """
-    query = db.query(PublishRecord)
+    query = db.query(PublishRecord).options(
+        joinedload(PublishRecord.article).load_only(Article.id, Article.title),
+        joinedload(PublishRecord.account).load_only(Account.id, Account.account_name, Account.platform),
+    )
 
     if article_id is not None:
         query = query.filter(PublishRecord.article_id == article_id)
     if account_id is not None:
         query = query.filter(PublishRecord.account_id == account_id)
-
-    records = query.order_by(PublishRecord.created_at.desc()).limit(limit).all()
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        query = query.filter(keyset_before(PublishRecord.created_at, PublishRecord.id, position))
+
+    # 多取一条用来判断是否还有下一页
+    records = query.order_by(
+        PublishRecord.created_at.desc(), PublishRecord.id.desc()
+    ).limit(limit + 1).all()
+
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor(records[-1].created_at, records[-1].id)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
 
     # 转换为字典列表
     result = []
     for record in records:
-        article = db.query(Article).filter(Article.id == record.article_id).first()
-        account = db.query(Account).filter(Account.id == record.account_id).first()
+        article = record.article
+        account = record.account
 
         platform_name = ""
         if account:
@@ -416,16 +456,8 @@ async def get_publish_records(
     return result
 
 
-@router.post("/retry/{record_id}", response_model=ApiResponse)
-async def retry_publish(
-    record_id: int,
-    db: Session = Depends(get_db),
-):
-    """
-    重试发布
-
-    用这个接口来重新发布失败的任务！
-    """
+def _reset_publish_record(db: Session, record_id: int):
+    """校验并重置待重试的发布记录（同步，在数据库线程池中执行）"""
     # 1. 查找发布记录
     record = db.query(PublishRecord).filter(PublishRecord.id == record_id).first()
     if not record:
@@ -452,6 +484,25 @@ async def retry_publish(
     record.error_msg = None
     db.commit()
 
+    return record, article, account
+
+
+@router.post("/retry/{record_id}", response_model=ApiResponse)
+async def retry_publish(
+    record_id: int,
+    db: Session = Depends(get_db),
+):
+    """
+    重试发布
+
+    用这个接口来重新发布失败的任务！
+    """
+    # 1~5. 校验并重置发布记录（数据库线程池中执行）
+    result = await run_db(_reset_publish_record, db, record_id)
+    if isinstance(result, ApiResponse):
+        return result
+    record, article, account = result
+
     # 6. 创建重试任务
     task_id = publish_task_manager.create_task([article.id], [account.id])
 
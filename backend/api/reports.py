@@ -4,9 +4,9 @@ from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Integer
+from sqlalchemy import func
 from backend.database import get_db
-from backend.database.models import Project, Keyword, IndexCheckRecord, GeoArticle
+from backend.database.models import Project, IndexCheckDaily
 
 router = APIRouter(prefix="/api/reports", tags=["数据报表"])
 
@@ -18,28 +18,31 @@ class TrendDataPoint(BaseModel):
 
 
 @router.get("/overview")
-async def get_overview(db: Session = Depends(get_db)):
-    """获取顶部统计卡片"""
-    # 统计监测记录表
-    total_checks = db.query(IndexCheckRecord).count()
+def get_overview(db: Session = Depends(get_db)):
+    """获取顶部统计卡片（读取日汇总表）"""
+    total_projects = db.query(Project).filter(Project.status == 1).count()
+
+    totals = db.query(
+        func.coalesce(func.sum(IndexCheckDaily.checks), 0),
+        func.coalesce(func.sum(IndexCheckDaily.keyword_found), 0),
+        func.coalesce(func.sum(IndexCheckDaily.company_found), 0),
+    ).one()
+    total_checks, kw_hits, co_hits = (int(v) for v in totals)
 
     if total_checks == 0:
         return {
-            "total_projects": db.query(Project).filter(Project.status == 1).count(),
+            "total_projects": total_projects,
             "total_keywords": 0,
             "keyword_found": 0,
             "company_found": 0,
             "overall_hit_rate": 0
         }
 
-    kw_hits = db.query(IndexCheckRecord).filter(IndexCheckRecord.keyword_found == True).count()
-    co_hits = db.query(IndexCheckRecord).filter(IndexCheckRecord.company_found == True).count()
-
     # 命中率 = (公司命中的次数 / 总检测次数) * 100
     hit_rate = round((co_hits / total_checks) * 100, 2)
 
     return {
-        "total_projects": db.query(Project).filter(Project.status == 1).count(),
+        "total_projects": total_projects,
         "total_keywords": total_checks,
         "keyword_found": kw_hits,
         "company_found": co_hits,
@@ -48,26 +51,25 @@ async def get_overview(db: Session = Depends(get_db)):
 
 
 @router.get("/trends", response_model=List[TrendDataPoint])
-async def get_trends(days: int = Query(30), db: Session = Depends(get_db)):
-    """获取趋势图数据"""
-    start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+def get_trends(days: int = Query(30), db: Session = Depends(get_db)):
+    """获取趋势图数据（按天读取日汇总表）"""
+    start_day = (datetime.now() - timedelta(days=days)).date()
 
-    # 使用 substr 确保 SQLite 兼容 YYYY-MM-DD 分组
     stats = db.query(
-        func.substr(IndexCheckRecord.check_time, 1, 10).label("date_str"),
-        func.count(IndexCheckRecord.id).label("total"),
-        func.sum(cast(IndexCheckRecord.keyword_found, Integer)).label("kw_found")
-    ).filter(IndexCheckRecord.check_time >= start_date) \
-        .group_by("date_str") \
-        .order_by("date_str").all()
+        IndexCheckDaily.day,
+        func.sum(IndexCheckDaily.checks).label("total"),
+        func.sum(IndexCheckDaily.keyword_found).label("kw_found")
+    ).filter(IndexCheckDaily.day >= start_day) \
+        .group_by(IndexCheckDaily.day) \
+        .order_by(IndexCheckDaily.day).all()
 
     if not stats:
         return [TrendDataPoint(date=datetime.now().strftime("%Y-%m-%d"), keyword_found_count=0, total_checks=0)]
 
     return [
         TrendDataPoint(
-            date=s.date_str,
+            date=s.day.isoformat(),
             keyword_found_count=int(s.kw_found or 0),
             total_checks=int(s.total or 0)
         ) for s in stats
-    ]
\ No newline at end of file
+    ]
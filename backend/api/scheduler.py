@@ -32,13 +32,13 @@ class TaskResponse(BaseModel):
 # --- API ---
 
 @router.get("/jobs", response_model=List[TaskResponse])
-async def list_jobs(db: Session = Depends(get_db)):
+def list_jobs(db: Session = Depends(get_db)):
     """获取所有定时任务配置"""
     return db.query(ScheduledTask).all()
 
 
 @router.put("/jobs/{task_id}", response_model=ApiResponse)
-async def update_job(task_id: int, data: TaskUpdate, db: Session = Depends(get_db)):
+def update_job(task_id: int, data: TaskUpdate, db: Session = Depends(get_db)):
     """更新任务配置（Cron或开关）"""
     task = db.query(ScheduledTask).filter(ScheduledTask.id == task_id).first()
     if not task:
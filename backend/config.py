@@ -38,6 +38,15 @@ CORS_ORIGINS = [
 
 # ==================== 数据库配置 ====================
 DATABASE_URL = f"sqlite:///{DATABASE_DIR}/auto_geo_v3.db"
+# 数据库专用线程池大小：异步代码中的同步 ORM 调用放到这里执行，不阻塞事件循环
+DB_THREAD_POOL_SIZE = 4
+# SQLite 连接参数：锁等待时间、页缓存（KiB）、内存映射大小（字节）
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_CACHE_SIZE_KB = 64 * 1024
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+# 单写者队列：一个事务最多合并的写操作数，以及凑批等待时间（毫秒）
+DB_WRITE_BATCH_SIZE = 100
+DB_WRITE_BATCH_WINDOW_MS = 20
 
 # ==================== 加密配置 ====================
 # AES-256加密密钥（32字节）- 生产环境必须从环境变量读取
@@ -45,6 +54,8 @@ ENCRYPTION_KEY = os.getenv(
     "AUTO_GEO_ENCRYPTION_KEY",
     "auto-geo-default-key-32-bytes-length!!"  # 32字节密钥
 ).encode()[:32]  # 确保是32字节
+# 已解密 storage_state 的缓存条目数（按账号 + 密文哈希），发布时免去重复解密和 JSON 解析
+STORAGE_STATE_CACHE_SIZE = 256
 
 # ==================== Playwright配置 ====================
 # 浏览器类型
@@ -62,6 +73,23 @@ BROWSER_ARGS = [
 # 用户数据目录
 USER_DATA_DIR = DATA_DIR / "browser_context"
 
+# 选择器解析缓存：记录每个平台各元素上次命中的候选选择器，下次优先尝试
+SELECTOR_CACHE_FILE = DATA_DIR / "selector_cache.json"
+
+# ==================== 浏览器池配置 ====================
+# 常驻浏览器进程数上限
+BROWSER_POOL_SIZE = 2
+# 单个浏览器进程同时租出的上下文上限
+BROWSER_POOL_MAX_CONTEXTS = 4
+# 浏览器进程累计租用次数达到后回收重启（防止 Chromium 内存膨胀）
+BROWSER_POOL_MAX_USES = 50
+# 单个账号上下文复用次数上限，超过后关闭重建
+BROWSER_CONTEXT_MAX_USES = 10
+# 空闲上下文保留时长（秒），超时自动关闭
+BROWSER_CONTEXT_IDLE_TTL = 600
+# 发布用浏览器是否无头运行（调试阶段建议 False）
+PUBLISH_HEADLESS = False
+
 # 登录检测配置
 LOGIN_CHECK_INTERVAL = 1000  # 毫秒
 LOGIN_MAX_WAIT_TIME = 120000  # 2分钟
@@ -103,6 +131,68 @@ PLATFORMS = {
     },
 }
 
+# ==================== 资源拦截配置 ====================
+# 发布 / 收录检测上下文按平台拦截无关资源（图片、视频、字体、统计脚本），省带宽和 CPU
+# 授权登录的上下文不拦截（扫码要看二维码图片）
+RESOURCE_BLOCKING_ENABLED = True
+
+# 各平台都拦截的第三方统计 / 埋点
+RESOURCE_BLOCK_TRACKERS = [
+    r"google-analytics\.com", r"googletagmanager\.com", r"hm\.baidu\.com", r"hmma\.baidu\.com",
+    r"cnzz\.com", r"umeng\.com", r"growingio\.com", r"sentry\.io",
+    r"mcs\.snssdk\.com", r"mon\.zijieapi\.com", r"zhihu-web-analytics", r"datahub\.zhihu\.com",
+]
+
+# 每个平台一套规则：
+#   block_types  按 Playwright resource_type 拦截（image / media / font / stylesheet ...）
+#   block_urls   按地址正则拦截
+#   allow_urls   命中则一律放行，优先级最高（编辑器自身要用的图片 CDN 等）
+# 未配置的平台使用 default
+RESOURCE_BLOCK_PROFILES = {
+    "default": {
+        "block_types": ["media", "font"],
+        "block_urls": RESOURCE_BLOCK_TRACKERS,
+        "allow_urls": [],
+    },
+    # 发布平台：正文和封面上传后编辑器要回显图片，只放行平台自己的图床
+    "zhihu": {
+        "block_types": ["image", "media", "font"],
+        "block_urls": RESOURCE_BLOCK_TRACKERS,
+        "allow_urls": [r"zhimg\.com"],
+    },
+    "baijiahao": {
+        "block_types": ["image", "media", "font"],
+        "block_urls": RESOURCE_BLOCK_TRACKERS,
+        "allow_urls": [r"bdstatic\.com", r"bcebos\.com", r"baijiahao\.baidu\.com"],
+    },
+    "sohu": {
+        "block_types": ["image", "media", "font"],
+        "block_urls": RESOURCE_BLOCK_TRACKERS,
+        "allow_urls": [r"sohucs\.com", r"mp\.sohu\.com"],
+    },
+    "toutiao": {
+        "block_types": ["image", "media", "font"],
+        "block_urls": RESOURCE_BLOCK_TRACKERS,
+        "allow_urls": [r"byteimg\.com", r"pstatp\.com", r"mp\.toutiao\.com"],
+    },
+    # AI 平台：只读回答文本，图片视频字体全部拦截
+    "doubao": {
+        "block_types": ["image", "media", "font"],
+        "block_urls": RESOURCE_BLOCK_TRACKERS,
+        "allow_urls": [],
+    },
+    "qianwen": {
+        "block_types": ["image", "media", "font"],
+        "block_urls": RESOURCE_BLOCK_TRACKERS,
+        "allow_urls": [],
+    },
+    "deepseek": {
+        "block_types": ["image", "media", "font"],
+        "block_urls": RESOURCE_BLOCK_TRACKERS,
+        "allow_urls": [],
+    },
+}
+
 # ==================== 日志配置 ====================
 LOG_DIR = BASE_DIR / "logs"
 LOG_FILE = LOG_DIR / "auto_geo.log"
@@ -111,6 +201,14 @@ LOG_RETENTION = "30 days"
 
 LOG_DIR.mkdir(exist_ok=True)
 
+# WebSocket 实时日志：环形缓冲区容量、批量推送间隔（毫秒）
+WS_LOG_BUFFER_SIZE = 2000
+WS_LOG_FLUSH_INTERVAL_MS = 100
+# 每个客户端的发送队列长度：慢客户端积压超过它时丢弃最旧的消息
+WS_CLIENT_QUEUE_SIZE = 200
+# 单次发送超时（秒）：超时的客户端视为卡死并断开
+WS_SEND_TIMEOUT = 5
+
 # ==================== 任务配置 ====================
 # 发布任务超时时间（秒）
 PUBLISH_TIMEOUT = 300
@@ -118,12 +216,33 @@ PUBLISH_TIMEOUT = 300
 # 最大并发发布数
 MAX_CONCURRENT_PUBLISH = 3
 
+# 单平台并发发布数（未列出的平台使用 default）
+PUBLISH_PLATFORM_CONCURRENCY = {
+    "default": 1,
+}
+
+# 发布队列容量：排队中的文章超过该值时调度器暂停投递（背压）
+PUBLISH_QUEUE_SIZE = 50
+
 # 失败重试次数
 MAX_RETRY_COUNT = 2
 
+# 发布失败后的重试退避：第 n 次失败后等待 BASE × 2^(n-1) 分钟再允许领取，最长 MAX 分钟
+PUBLISH_RETRY_BASE_MINUTES = 5
+PUBLISH_RETRY_MAX_MINUTES = 60
+
+# 发布租约时长（秒）：覆盖随机延迟 + 发布超时，进程崩溃后租约过期可被重新领取
+PUBLISH_LEASE_SECONDS = PUBLISH_TIMEOUT + 60
+# 发布执行期间的续租间隔（秒）
+PUBLISH_LEASE_HEARTBEAT = 60
+
 # 重试间隔（秒）
 RETRY_INTERVAL = 5
 
+# 批量生成：同时在途的 n8n 生成请求数，以及单次最多提交的关键词数
+GENERATE_BULK_CONCURRENCY = 4
+GENERATE_BULK_MAX = 500
+
 # ==================== n8n配置 ====================
 # n8n webhook基础URL
 N8N_WEBHOOK_URL = os.getenv("N8N_WEBHOOK_URL", "http://localhost:5678/webhook")
@@ -159,3 +278,25 @@ AI_PLATFORMS = {
 # 收录检测定时任务配置
 INDEX_CHECK_HOUR = 2  # 每天凌晨2点执行
 INDEX_CHECK_MINUTE = 0
+
+# 同一关键词两次自动收录检测的最小间隔（分钟），关键词可单独覆盖
+INDEX_RECHECK_MIN_INTERVAL = 60
+
+# 未收录文章的复查退避：第 n 次连续未命中后等待 BASE × 2^(n-1) 分钟，最长 MAX 分钟，±JITTER 比例随机抖动
+# 检测按关键词进行，间隔短于关键词最小检测间隔没有意义，所以第一步就从关键词间隔起算（60/120/240… 分钟）
+INDEX_BACKOFF_BASE_MINUTES = INDEX_RECHECK_MIN_INTERVAL
+INDEX_BACKOFF_MAX_MINUTES = 24 * 60
+INDEX_BACKOFF_JITTER = 0.2
+
+# 收录检测浏览器是否无头运行
+INDEX_CHECK_HEADLESS = True
+
+# 单个AI平台同时进行的提问数（未列出的平台使用 default）
+INDEX_CHECK_PLATFORM_CONCURRENCY = {
+    "default": 2,
+}
+
+# 同一AI平台两次提问之间的最小间隔（秒），防止触发风控
+INDEX_CHECK_MIN_INTERVAL = {
+    "default": 3.0,
+}
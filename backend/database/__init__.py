@@ -4,14 +4,23 @@
 支持 WAL 模式，解决 SQLite 并发锁问题
 """
 
-from sqlalchemy import create_engine, event
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import Any, Callable, Generator, Optional, TypeVar
 from loguru import logger
 from sqlalchemy import inspect
 
-from backend.config import DATABASE_DIR, DATABASE_URL
+from backend.config import (
+    DATABASE_DIR, DATABASE_URL, DB_THREAD_POOL_SIZE,
+    SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE,
+)
+
+T = TypeVar("T")
 
 # 1. 确保数据库目录存在
 DATABASE_DIR.mkdir(exist_ok=True, parents=True)
@@ -35,6 +44,11 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
         cursor.execute("PRAGMA journal_mode=WAL")
         cursor.execute("PRAGMA synchronous=NORMAL")
         cursor.execute("PRAGMA foreign_keys=ON")  # 显式开启外键约束支持
+        # 写锁被占用时等待而不是立刻报 "database is locked"
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")  # 负数表示 KiB
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
         cursor.close()
     except Exception as e:
         logger.error(f"设置 SQLite Pragma 失败: {e}")
@@ -58,6 +72,172 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+# 6. 🌟 数据库专用线程池：事件循环同时驱动 Playwright、调度器和 WebSocket，
+# 同步 ORM 调用一律丢到这里执行，慢查询不再卡住浏览器自动化
+_db_executor = ThreadPoolExecutor(max_workers=DB_THREAD_POOL_SIZE, thread_name_prefix="db")
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """在数据库线程池中执行同步函数并等待结果"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, functools.partial(fn, *args, **kwargs))
+
+
+def snapshot(obj: Any) -> Optional[SimpleNamespace]:
+    """
+    把 ORM 实例的列值复制成普通对象（在数据库线程中调用）
+
+    run_db 取回的实例在会话 commit 后会过期，回到事件循环线程再读属性会在循环线程上同步查库；
+    需要跨 await 长时间使用的实例先取快照。
+    """
+    if obj is None:
+        return None
+    return SimpleNamespace(**{attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs})
+
+
+def shutdown_db_executor():
+    """应用退出时释放数据库线程池"""
+    _db_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _sql_default(column) -> str:
+    """把模型中的标量默认值转换为 DDL 字面量"""
+    default = column.default
+    if default is None or not default.is_scalar:
+        return ""
+    value = default.arg
+    if isinstance(value, bool):
+        return f" DEFAULT {int(value)}"
+    if isinstance(value, (int, float)):
+        return f" DEFAULT {value}"
+    return " DEFAULT '{}'".format(str(value).replace("'", "''"))
+
+
+def _add_missing_columns():
+    """
+    补齐旧库缺失的列
+    create_all 只建新表不改旧表，模型新增字段时在这里用 ALTER TABLE ADD COLUMN 补上
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}{_sql_default(column)}"
+                ))
+                logger.info(f"✨ 新列已补齐: {table.name}.{column.name}")
+
+
+# 检测记录的 check_time 统一用本地时间（检测服务一直显式写入 datetime.now()，模型默认值同样是本地时间），
+# 日汇总按 date(check_time) 归日，与增量累加的 _rollup_index_check 口径一致
+INDEX_CHECK_DAILY_REBUILD_SQL = [
+    "DELETE FROM index_check_daily",
+    """
+    INSERT INTO index_check_daily (day, keyword_id, platform, checks, keyword_found, company_found)
+    SELECT date(check_time), keyword_id, platform, COUNT(*),
+           SUM(CASE WHEN keyword_found THEN 1 ELSE 0 END),
+           SUM(CASE WHEN company_found THEN 1 ELSE 0 END)
+    FROM index_check_records
+    WHERE check_time IS NOT NULL
+    GROUP BY date(check_time), keyword_id, platform
+    """,
+]
+
+
+def rebuild_index_check_daily(bind=None):
+    """
+    从检测记录全量重建日汇总
+    日汇总只随 ORM 插入增量累加：批量 / Core 方式写入的记录、以及除删除关键词级联以外的删除都不会反映到汇总里，
+    做过这类操作后调用本函数重建
+    """
+    with (bind or engine).begin() as conn:
+        for sql in INDEX_CHECK_DAILY_REBUILD_SQL:
+            conn.execute(text(sql))
+    logger.info("✨ 收录检测日汇总已从检测记录重建")
+
+
+# ==================== 版本化迁移 ====================
+# create_all 不会修改已存在的表：索引、数据修正等变更按版本号追加到这里，每条只执行一次。
+# 新增列由 _add_missing_columns 自动补齐，无需写迁移。
+from backend.database.fts import (  # noqa: E402
+    KNOWLEDGE_FTS_SQL, KNOWLEDGE_FTS_VERSION, KNOWLEDGE_FTS_NAME, trigram_supported
+)
+
+MIGRATIONS = [
+    (1, "geo_articles 发布/收录扫描复合索引", [
+        "CREATE INDEX IF NOT EXISTS ix_geo_articles_publish_queue "
+        "ON geo_articles (publish_status, publish_time, retry_count)",
+        "CREATE INDEX IF NOT EXISTS ix_geo_articles_index_queue "
+        "ON geo_articles (publish_status, index_status, next_check_time)",
+    ]),
+    (2, "index_check_records 关键词+时间复合索引", [
+        "CREATE INDEX IF NOT EXISTS ix_index_check_records_keyword_time "
+        "ON index_check_records (keyword_id, check_time)",
+    ]),
+    (3, "publish_records 分页与去重复合索引", [
+        "CREATE INDEX IF NOT EXISTS ix_publish_records_created "
+        "ON publish_records (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_publish_records_article_account "
+        "ON publish_records (article_id, account_id)",
+    ]),
+    (4, "geo_articles 列表分页复合索引", [
+        "CREATE INDEX IF NOT EXISTS ix_geo_articles_created "
+        "ON geo_articles (created_at, id)",
+    ]),
+    (KNOWLEDGE_FTS_VERSION, KNOWLEDGE_FTS_NAME, KNOWLEDGE_FTS_SQL),
+    (6, "index_check_daily 按本地时间从检测记录重建", INDEX_CHECK_DAILY_REBUILD_SQL),
+]
+
+# 依赖数据库能力的迁移：{版本: (探测函数, 不满足时的说明)}
+# 不满足时跳过且不记录，启动照常进行；升级 SQLite 后下次启动自动补上
+MIGRATION_REQUIREMENTS = {
+    KNOWLEDGE_FTS_VERSION: (trigram_supported, "SQLite 低于 3.34 或未编译 FTS5，知识库检索退回 LIKE"),
+}
+
+
+_SCHEMA_MIGRATIONS_DDL = (
+    "CREATE TABLE IF NOT EXISTS schema_migrations ("
+    "version INTEGER PRIMARY KEY, name VARCHAR(200), applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+)
+
+
+def record_migration(conn, version: int, name: str):
+    """把迁移记为已应用（已记录时忽略）；迁移之外手工执行了同样变更时也用它登记"""
+    conn.execute(text(_SCHEMA_MIGRATIONS_DDL))
+    conn.execute(text("INSERT OR IGNORE INTO schema_migrations (version, name) VALUES (:v, :n)"),
+                 {"v": version, "n": name})
+
+
+def _run_migrations():
+    """执行尚未应用的迁移，并记录到 schema_migrations"""
+    with engine.begin() as conn:
+        conn.execute(text(_SCHEMA_MIGRATIONS_DDL))
+        applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+    for version, name, statements in MIGRATIONS:
+        if version in applied:
+            continue
+        requirement = MIGRATION_REQUIREMENTS.get(version)
+        if requirement:
+            with engine.connect() as conn:
+                supported = requirement[0](conn)
+            if not supported:
+                logger.warning(f"⚠️ 跳过数据库迁移 v{version} {name}: {requirement[1]}")
+                continue
+        # 每条迁移单独一个事务，失败时不会留下半截变更
+        with engine.begin() as conn:
+            for sql in statements:
+                conn.execute(text(sql))
+            record_migration(conn, version, name)
+        logger.info(f"✨ 数据库迁移已应用: v{version} {name}")
+
+
 def init_db():
     """
     初始化数据库表
@@ -67,7 +247,7 @@ def init_db():
     from backend.database.models import (
         Account, Article, PublishRecord,
         Project, Keyword, QuestionVariant,
-        IndexCheckRecord, GeoArticle,
+        IndexCheckRecord, IndexCheckDaily, GeoArticle,
         ScheduledTask, KnowledgeCategory, Knowledge  # 🌟 补齐了之前遗漏的表
     )
 
@@ -78,6 +258,10 @@ def init_db():
     try:
         # checkfirst=True 会自动处理“表已存在”的情况
         Base.metadata.create_all(bind=engine)
+        _add_missing_columns()
+        if "index_check_daily" not in existing_tables:
+            rebuild_index_check_daily()
+        _run_migrations()
 
         # 再次获取所有表名，对比输出日志
         all_tables = inspect(engine).get_table_names()
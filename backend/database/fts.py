@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+知识库全文索引 (SQLite FTS5)
+负责：knowledge_fts 虚拟表与同步触发器的建表语句、全量重建、检索
+
+knowledge_fts 是 knowledge_items 的外部内容表，只存倒排索引不存正文；
+使用 trigram 分词，中文不需要额外分词器，任意连续 3 个字符即可命中。
+不足 3 个字的查询 trigram 无法匹配，退回 LIKE。
+trigram 需要 SQLite 3.34+（且编译了 FTS5）；不支持时迁移跳过建索引，检索整体退回 LIKE。
+
+重建索引（首次迁移会自动执行，手工改过库或索引损坏时使用）：
+    python -m backend.database.fts
+"""
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+# trigram 分词器的最小可检索长度
+FTS_MIN_TERM_LENGTH = 3
+
+# 建索引的迁移（登记在 backend.database.MIGRATIONS），手工重建后同样记为已应用
+KNOWLEDGE_FTS_VERSION = 5
+KNOWLEDGE_FTS_NAME = "knowledge_items 全文索引 (FTS5 trigram)"
+
+KNOWLEDGE_FTS_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts USING fts5("
+    "title, content, content='knowledge_items', content_rowid='id', tokenize='trigram')",
+    # 增删改时同步索引；外部内容表删除旧行必须带上旧值
+    "CREATE TRIGGER IF NOT EXISTS knowledge_fts_ai AFTER INSERT ON knowledge_items BEGIN "
+    "INSERT INTO knowledge_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS knowledge_fts_ad AFTER DELETE ON knowledge_items BEGIN "
+    "INSERT INTO knowledge_fts(knowledge_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS knowledge_fts_au AFTER UPDATE OF title, content ON knowledge_items BEGIN "
+    "INSERT INTO knowledge_fts(knowledge_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO knowledge_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    # 回填已有数据
+    "INSERT INTO knowledge_fts(knowledge_fts) VALUES ('rebuild')",
+]
+
+
+def trigram_supported(connection) -> bool:
+    """当前 SQLite 能否创建 trigram 分词的 FTS5 表（用临时表探测，不留痕迹）"""
+    try:
+        connection.execute(text("CREATE VIRTUAL TABLE temp.fts_trigram_probe USING fts5(x, tokenize='trigram')"))
+        connection.execute(text("DROP TABLE temp.fts_trigram_probe"))
+        return True
+    except OperationalError:
+        return False
+
+
+# 标题命中的权重是正文的 10 倍
+_SEARCH_SQL = """
+SELECT k.id AS id,
+       bm25(knowledge_fts, 10.0, 1.0) AS rank,
+       snippet(knowledge_fts, 1, '<mark>', '</mark>', '…', 24) AS snippet
+FROM knowledge_fts
+JOIN knowledge_items AS k ON k.id = knowledge_fts.rowid
+WHERE knowledge_fts MATCH :query AND k.status = 1 {filters}
+ORDER BY rank
+LIMIT :limit
+"""
+
+
+def fts_query(keyword: str) -> Optional[str]:
+    """
+    把用户输入转成 FTS5 查询：按空白拆词，每个词作为短语（转义双引号）并按 AND 组合
+
+    Returns:
+        None 表示没有够长的词，应走 LIKE
+    """
+    terms = [t for t in keyword.split() if len(t) >= FTS_MIN_TERM_LENGTH]
+    if not terms:
+        return None
+    return " AND ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+def search_knowledge_fts(db, keyword: str, limit: int = 50,
+                         category_id: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    全文检索知识条目，按 bm25 相关度排序
+
+    Returns:
+        [{"id", "rank", "snippet"}]；没有够长的查询词时返回 None，由调用方退回 LIKE。
+        混在查询里的短词（不足 3 个字）不参与 MATCH，在命中结果上追加 LIKE 过滤。
+    """
+    query = fts_query(keyword)
+    if query is None:
+        return None
+    params: Dict[str, Any] = {"query": query, "limit": limit}
+    filters = []
+    if category_id is not None:
+        filters.append("AND k.category_id = :category_id")
+        params["category_id"] = category_id
+    for i, term in enumerate(t for t in keyword.split() if len(t) < FTS_MIN_TERM_LENGTH):
+        filters.append(f"AND (k.title LIKE :short{i} OR k.content LIKE :short{i})")
+        params[f"short{i}"] = f"%{term}%"
+    rows = db.execute(text(_SEARCH_SQL.format(filters=" ".join(filters))), params)
+    return [dict(row._mapping) for row in rows]
+
+
+def rebuild_knowledge_fts(connection) -> Optional[int]:
+    """
+    按 knowledge_items 全量重建索引，并把建索引的迁移记为已应用（启动时不再重复执行）
+
+    Returns:
+        条目数；SQLite 不满足迁移要求（不支持 trigram）时返回 None，不做任何改动
+    """
+    from backend.database import MIGRATION_REQUIREMENTS, record_migration
+
+    requirement = MIGRATION_REQUIREMENTS.get(KNOWLEDGE_FTS_VERSION)
+    if requirement and not requirement[0](connection):
+        return None
+    for sql in KNOWLEDGE_FTS_SQL[:-1]:
+        connection.execute(text(sql))
+    connection.execute(text("INSERT INTO knowledge_fts(knowledge_fts) VALUES ('rebuild')"))
+    record_migration(connection, KNOWLEDGE_FTS_VERSION, KNOWLEDGE_FTS_NAME)
+    return connection.execute(text("SELECT count(*) FROM knowledge_items")).scalar()
+
+
+if __name__ == "__main__":
+    from loguru import logger
+    from backend.database import engine, MIGRATION_REQUIREMENTS
+
+    with engine.begin() as conn:
+        count = rebuild_knowledge_fts(conn)
+    if count is None:
+        logger.warning(f"⚠️ 未重建知识库全文索引: {MIGRATION_REQUIREMENTS[KNOWLEDGE_FTS_VERSION][1]}")
+    else:
+        logger.success(f"✅ 知识库全文索引已重建: {count} 条")
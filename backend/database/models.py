@@ -4,7 +4,12 @@
 包含基础发布、GEO、监控及知识库所有表结构
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, func, ForeignKey
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    Column, Integer, String, Text, DateTime, Date, Boolean, func, ForeignKey, Index, UniqueConstraint, event
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import relationship
 from backend.database import Base
 
@@ -12,6 +17,11 @@ from backend.database import Base
 TABLE_ARGS = {"extend_existing": True}
 
 
+def _utcnow() -> datetime:
+    """与 func.now()（SQLite 中为 UTC）同一时间基准，但由 Python 生成、精确到微秒"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Account(Base):
     """账号表"""
     __tablename__ = "accounts"
@@ -35,6 +45,14 @@ class Account(Base):
     publish_records = relationship("PublishRecord", back_populates="account", cascade="all, delete-orphan")
 
 
+@event.listens_for(Account.storage_state, "set")
+def _invalidate_storage_state(target, value, oldvalue, initiator):
+    """重新授权写入新的 storage_state 时，清掉该账号已解密的缓存"""
+    if target.id is not None and value != oldvalue:
+        from backend.services.crypto import storage_state_cache
+        storage_state_cache.invalidate(target.id)
+
+
 class Article(Base):
     """普通文章表 (手动撰写)"""
     __tablename__ = "articles"
@@ -59,7 +77,13 @@ class Article(Base):
 class PublishRecord(Base):
     """发布记录表"""
     __tablename__ = "publish_records"
-    __table_args__ = TABLE_ARGS
+    __table_args__ = (
+        # 发布记录列表按 (created_at, id) 键集分页
+        Index("ix_publish_records_created", "created_at", "id"),
+        # 创建任务时按 文章 × 账号 批量查重
+        Index("ix_publish_records_article_account", "article_id", "account_id"),
+        TABLE_ARGS,
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     # 🌟 关键：ondelete="CASCADE" 确保数据库层面级联删除
@@ -109,6 +133,8 @@ class Keyword(Base):
     keyword = Column(String(200), nullable=False)
     difficulty_score = Column(Integer, nullable=True)
     status = Column(String(20), default="active")
+    last_check_time = Column(DateTime, nullable=True)  # 最近一次收录检测时间
+    check_interval_minutes = Column(Integer, nullable=True)  # 自动检测最小间隔，为空时使用全局配置
     created_at = Column(DateTime, default=func.now())
 
     # 关联关系
@@ -135,7 +161,11 @@ class QuestionVariant(Base):
 class IndexCheckRecord(Base):
     """收录检测记录表"""
     __tablename__ = "index_check_records"
-    __table_args__ = TABLE_ARGS
+    __table_args__ = (
+        # 预警 / 报表按关键词 + 时间窗口过滤
+        Index("ix_index_check_records_keyword_time", "keyword_id", "check_time"),
+        TABLE_ARGS,
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     keyword_id = Column(Integer, ForeignKey("keywords.id", ondelete="CASCADE"), nullable=False)
@@ -144,18 +174,74 @@ class IndexCheckRecord(Base):
     answer = Column(Text, nullable=True)
     keyword_found = Column(Boolean, nullable=True)
     company_found = Column(Boolean, nullable=True)
-    check_time = Column(DateTime, default=func.now())
+    # 与检测服务写入的时间同为本地时间，且在 flush 时就有值，日汇总按它归日（func.now() 在 SQLite 中是 UTC）
+    check_time = Column(DateTime, default=datetime.now)
 
     # 关联关系
     keyword = relationship("Keyword", back_populates="index_records")
 
 
+class IndexCheckDaily(Base):
+    """
+    收录检测日汇总表（按 天 × 关键词 × 平台 预聚合）
+    每插入一条 IndexCheckRecord 就增量累加，报表直接读这里，不再全表扫描检测记录
+
+    注意：只有经 ORM Session 插入的记录会触发累加；bulk / Core 插入、以及删除记录（删除关键词的级联除外，
+    汇总行随关键词一起删除）都不会同步，做过这类操作后用 rebuild_index_check_daily() 重建
+    """
+    __tablename__ = "index_check_daily"
+    __table_args__ = (
+        UniqueConstraint("day", "keyword_id", "platform", name="uq_index_check_daily"),
+        TABLE_ARGS,
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    day = Column(Date, nullable=False, index=True)
+    keyword_id = Column(Integer, ForeignKey("keywords.id", ondelete="CASCADE"), nullable=False)
+    platform = Column(String(50), nullable=False)
+    checks = Column(Integer, nullable=False, default=0)
+    keyword_found = Column(Integer, nullable=False, default=0)
+    company_found = Column(Integer, nullable=False, default=0)
+
+
+@event.listens_for(IndexCheckRecord, "after_insert")
+def _rollup_index_check(mapper, connection, target):
+    """检测记录写入时在同一事务内累加日汇总"""
+    # 直接读 __dict__，避免在 flush 过程中触发过期属性的加载
+    check_time = target.__dict__.get("check_time") or datetime.now()
+    day = check_time.date()
+    kw = 1 if target.keyword_found else 0
+    co = 1 if target.company_found else 0
+
+    table = IndexCheckDaily.__table__
+    stmt = sqlite_insert(table).values(
+        day=day, keyword_id=target.keyword_id, platform=target.platform,
+        checks=1, keyword_found=kw, company_found=co
+    ).on_conflict_do_update(
+        index_elements=["day", "keyword_id", "platform"],
+        set_={
+            "checks": table.c.checks + 1,
+            "keyword_found": table.c.keyword_found + kw,
+            "company_found": table.c.company_found + co,
+        }
+    )
+    connection.execute(stmt)
+
+
 class GeoArticle(Base):
     """
     GEO文章表 - 核心业务表
     """
     __tablename__ = "geo_articles"
-    __table_args__ = TABLE_ARGS
+    __table_args__ = (
+        # 发布扫描：状态 + 到期时间 + 重试次数
+        Index("ix_geo_articles_publish_queue", "publish_status", "publish_time", "retry_count"),
+        # 收录扫描：已发布 + 收录状态 + 下次检测时间
+        Index("ix_geo_articles_index_queue", "publish_status", "index_status", "next_check_time"),
+        # 文章列表：按 (created_at, id) 键集分页
+        Index("ix_geo_articles_created", "created_at", "id"),
+        TABLE_ARGS,
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     keyword_id = Column(Integer, ForeignKey("keywords.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -173,6 +259,10 @@ class GeoArticle(Base):
     publish_status = Column(String(20), default="draft")
     publish_time = Column(DateTime, nullable=True)
 
+    # 发布租约：调度器原子领取文章后写入，防止同一篇文章被重复投递
+    lease_owner = Column(String(64), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+
     # 强壮性与重试
     retry_count = Column(Integer, default=0)
     error_msg = Column(Text, nullable=True)
@@ -183,10 +273,13 @@ class GeoArticle(Base):
     index_status = Column(String(20), default="uncheck")
     last_check_time = Column(DateTime, nullable=True)
     index_details = Column(Text, nullable=True)
+    index_miss_count = Column(Integer, default=0)  # 连续未收录次数（退避依据）
+    next_check_time = Column(DateTime, nullable=True)  # 下次允许检测的时间，为空表示立即
 
     # 时间戳
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    # 文章列表的 ETag 由它推出：精确到微秒，同一秒内的多次修改也能区分
+    updated_at = Column(DateTime, default=_utcnow, onupdate=_utcnow)
 
     # 关联关系
     keyword = relationship("Keyword", back_populates="articles")
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+键集分页工具
+负责：按 (created_at, id) 倒序翻页的游标编解码与过滤条件，
+翻页成本与页码无关，不会像 OFFSET 那样越翻越慢
+"""
+
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> Optional[str]:
+    """游标 = 本页最后一条的 (created_at, id)，格式 "<ISO时间>_<id>"；时间为空时无法续页"""
+    if created_at is None:
+        return None
+    return f"{created_at.isoformat()}_{row_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解析游标，格式不对时抛 ValueError"""
+    created_at, row_id = cursor.rsplit("_", 1)
+    return datetime.fromisoformat(created_at), int(row_id)
+
+
+def keyset_before(created_col, id_col, cursor: Tuple[datetime, int]):
+    """排在游标之后（更旧）的行：created_at 更早，或同一时间 id 更小"""
+    created_at, row_id = cursor
+    return or_(created_col < created_at, and_(created_col == created_at, id_col < row_id))
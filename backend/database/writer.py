@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+单写者写入队列
+负责：把各处零散的小写入（状态流转、检测记录、发布进度）合并成批量事务，
+在同一个线程、同一个 Session 上顺序提交，避免多会话抢写锁导致 "database is locked"
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from backend.config import DB_WRITE_BATCH_SIZE, DB_WRITE_BATCH_WINDOW_MS
+
+T = TypeVar("T")
+
+log = logger.bind(module="数据库")
+
+# (写操作, 参数, 完成信号)
+_WriteItem = Tuple[Callable[..., Any], tuple, asyncio.Future]
+
+
+class DBWriter:
+    """
+    单写者批量写入器
+
+    写操作是形如 fn(session, *args) 的同步函数：只做增删改，不要自己 commit/rollback，
+    返回值应是普通数据（ID、字典等），提交后 ORM 对象会过期。
+    队列里攒到的操作在一个事务里执行并提交；某条操作出错时整批回滚，
+    再逐条单独提交，只有出错的那条会失败——因此写操作应当可以安全重放。
+
+    用法：
+        await writer.write(fn, ...)   # 等待提交完成（需要读己之写时）
+        writer.submit(fn, ...)        # 只投递，不等待
+    """
+
+    def __init__(
+            self,
+            session_factory: Optional[Callable[[], Session]] = None,
+            batch_size: int = DB_WRITE_BATCH_SIZE,
+            batch_window_ms: int = DB_WRITE_BATCH_WINDOW_MS,
+    ):
+        if session_factory is None:
+            from backend.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.batch_size = max(batch_size, 1)
+        self.batch_window = batch_window_ms / 1000
+
+        # 单线程执行器：所有写事务都在这一个线程、这一个 Session 上完成（首次投递时创建，stop 时释放）
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._session: Optional[Session] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {"ops": 0, "batches": 0, "failed": 0, "replayed": 0}
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "asyncio.Future[T]":
+        """投递一个写操作（必须在事件循环中调用），返回提交完成后才结束的 Future"""
+        self._ensure_started()
+        future = self._loop.create_future()
+        # 失败已在写线程中记日志；只投递不等待的调用方不会取回异常，这里标记为已取回
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._queue.put_nowait((fn, args, future))
+        return future
+
+    async def write(self, fn: Callable[..., T], *args: Any) -> T:
+        """投递并等待提交完成，返回写操作的返回值"""
+        return await self.submit(fn, *args)
+
+    def _ensure_started(self):
+        """首次投递时在当前事件循环中启动写入协程"""
+        loop = asyncio.get_running_loop()
+        if self._task and not self._task.done() and self._loop is loop:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._task = loop.create_task(self._worker(), name="db-writer")
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[_WriteItem] = [await self._queue.get()]
+            # 凑批：短暂等待后续写入，把一波突发写合并成一个事务
+            if self.batch_window and self._queue.qsize() < self.batch_size - 1:
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            ops = [(fn, args) for fn, args, _ in batch]
+            try:
+                outcomes = await loop.run_in_executor(self._executor, self._apply, ops)
+            except Exception as e:
+                outcomes = [(False, e)] * len(batch)
+
+            for (_, _, future), (ok, value) in zip(batch, outcomes):
+                self._queue.task_done()
+                if future.done():  # 调用方已取消等待
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _apply(self, ops: List[Tuple[Callable, tuple]]) -> List[Tuple[bool, Any]]:
+        """执行一批写操作（写线程中执行）"""
+        if self._session is None:
+            self._session = self.session_factory()
+        session = self._session
+        self._stats["batches"] += 1
+        self._stats["ops"] += len(ops)
+
+        try:
+            results = [(True, fn(session, *args)) for fn, args in ops]
+            session.commit()
+            return results
+        except Exception as e:
+            session.rollback()
+            if len(ops) == 1:
+                self._stats["failed"] += 1
+                log.error(f"🚨 写操作失败: {e}")
+                return [(False, e)]
+            log.warning(f"⚠️ 批量写入失败，逐条重放 {len(ops)} 个操作: {e}")
+        finally:
+            session.expunge_all()
+
+        # 整批失败：逐条单独提交，隔离出错的那条
+        self._stats["replayed"] += len(ops)
+        outcomes = []
+        for fn, args in ops:
+            try:
+                result = fn(session, *args)
+                session.commit()
+                outcomes.append((True, result))
+            except Exception as e:
+                session.rollback()
+                self._stats["failed"] += 1
+                log.error(f"🚨 写操作失败: {e}")
+                outcomes.append((False, e))
+            finally:
+                session.expunge_all()
+        return outcomes
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "queued": self._queue.qsize() if self._queue else 0}
+
+    async def stop(self):
+        """等待已投递的写入提交完成，然后停止写入协程，释放连接和写线程"""
+        if self._task and not self._task.done() and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._executor is None:
+            return
+        if self._session is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._session.close)
+            self._session = None
+        # 队列已排空、连接已关闭，写线程空闲，等待它退出
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+
+# 单例模式
+_instance: Optional[DBWriter] = None
+
+
+def get_db_writer() -> DBWriter:
+    global _instance
+    if _instance is None:
+        _instance = DBWriter()
+    return _instance
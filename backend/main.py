@@ -25,39 +25,34 @@ from backend.config import (
     APP_NAME, APP_VERSION, DEBUG, HOST, PORT, RELOAD,
     CORS_ORIGINS, PLATFORMS
 )
-from backend.database import init_db, get_db, SessionLocal
+from backend.database import init_db, get_db, SessionLocal, shutdown_db_executor
+from backend.database.writer import get_db_writer
 from backend.api import (
     account, article, publish, keywords, geo,
     index_check, reports, notifications, scheduler, knowledge
 )
 from backend.services.scheduler_service import get_scheduler_service
 from backend.services.n8n_service import get_n8n_service
+from backend.services.playwright.resource_blocker import resource_blocker
+from backend.services.playwright.selector_resolver import selector_resolver
 
 
 # ==================== 🌟 日志拦截器 (优化版) ====================
 
 def socket_log_sink(message):
     """
-    Loguru 拦截器：将每一条日志通过 WebSocket 广播出去
+    Loguru 拦截器：日志写入环形缓冲区，由 ws_manager 每 100ms 合并成一帧推送
+    不再为每一行日志创建广播任务；可以在数据库线程等任意线程中调用
     """
     try:
         record = message.record
         # 构造发送给前端的标准 JSON 格式
-        log_payload = {
+        ws_manager.push_log({
             "time": record["time"].strftime("%H:%M:%S"),
             "level": record["level"].name,
             "module": record["extra"].get("module", "系统"),
             "message": record["message"],
-        }
-
-        # 获取当前运行的事件循环
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                loop.create_task(ws_manager.broadcast(log_payload))
-        except RuntimeError:
-            # 如果当前线程没有运行中的 loop，则忽略（通常发生在关闭阶段）
-            pass
+        })
     except Exception:
         pass
 
@@ -83,7 +78,8 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"数据库初始化失败: {e}")
 
-    # 2. 注入全局 WebSocket 管理器
+    # 2. 注入全局 WebSocket 管理器，启动日志批量推送
+    ws_manager.start_log_flusher()
     account.set_ws_manager(ws_manager)
     publish.set_ws_manager(ws_manager)
     notifications.set_ws_callback(ws_manager.broadcast)
@@ -107,8 +103,9 @@ async def lifespan(app: FastAPI):
     # ---------------- 关闭阶段 ----------------
     logger.info("正在关闭服务，释放资源...")
 
-    # 停止定时任务
+    # 停止定时任务与发布调度器
     scheduler_instance.stop()
+    await scheduler_instance.dispatcher.stop()
 
     # 关闭 Playwright
     await playwright_mgr.stop()
@@ -117,6 +114,13 @@ async def lifespan(app: FastAPI):
     n8n_service = await get_n8n_service()
     await n8n_service.close()
 
+    # 提交单写者队列中剩余的写入，再释放数据库线程池
+    await get_db_writer().stop()
+    shutdown_db_executor()
+
+    # 停止日志推送与 WebSocket 发送协程
+    await ws_manager.stop()
+
     logger.info("服务已安全关闭")
 
 
@@ -135,6 +139,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # 键集分页游标
 )
 
 # 注册路由 - 请确保 reports.router 在 index_check 之后，或者前缀区分明确
@@ -152,14 +157,19 @@ app.include_router(knowledge.router)
 
 # ==================== WebSocket 端点 ====================
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket, client_id: str = None):
+async def websocket_endpoint(websocket: WebSocket, client_id: str = None, topics: str = None):
     """
     实时日志 WebSocket 通道
+
+    订阅主题：连接时 ?topics=log,alert，或随时发送 {"action": "subscribe", "topics": [...]}
+    可用主题：log / log:<模块>、publish / publish:<任务ID>、auth / auth:<任务ID>、
+    generate / generate:<任务ID>、alert；不订阅则接收全部
     """
     if not client_id:
         client_id = f"client_{uuid.uuid4().hex[:8]}"
 
-    await ws_manager.connect(websocket, client_id)
+    initial_topics = [t.strip() for t in topics.split(",") if t.strip()] if topics else None
+    await ws_manager.connect(websocket, client_id, initial_topics)
 
     # 发送连接成功的初始信号
     await ws_manager.send_personal({
@@ -171,8 +181,8 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str = None):
 
     try:
         while True:
-            # 保持连接，接收客户端心跳（如有）
-            await websocket.receive_text()
+            # 保持连接，接收客户端心跳和订阅变更
+            ws_manager.handle_client_message(client_id, await websocket.receive_text())
     except WebSocketDisconnect:
         ws_manager.disconnect(client_id)
     except Exception as e:
@@ -188,7 +198,14 @@ async def root():
 
 @app.get("/api/health")
 async def health():
-    return {"status": "ok"}
+    n8n_service = await get_n8n_service()
+    return {
+        "status": "ok",
+        "websocket": ws_manager.stats(),
+        "n8n_cache": n8n_service.cache_stats(),
+        "resource_blocking": resource_blocker.stats(),
+        "selectors": selector_resolver.stats(),
+    }
 
 
 # ==================== 启动脚本 ====================
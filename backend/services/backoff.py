@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+退避策略
+负责：按连续未收录次数排定文章的下次检测时间、按失败次数推迟发布重试；调度信息落在 GeoArticle 上，重启后不丢失
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+from backend.database.models import GeoArticle
+from backend.config import (
+    INDEX_BACKOFF_BASE_MINUTES, INDEX_BACKOFF_MAX_MINUTES, INDEX_BACKOFF_JITTER,
+    PUBLISH_RETRY_BASE_MINUTES, PUBLISH_RETRY_MAX_MINUTES
+)
+
+
+class BackoffPolicy:
+    """
+    收录复查退避策略
+
+    连续未收录次数越多，下次检测间隔越长（指数增长 + 随机抖动 + 上限）；
+    收录状态变化或文章重新发布时清零。调度信息落在 GeoArticle 上，重启后不丢失。
+    """
+
+    def __init__(
+            self,
+            base_minutes: float = INDEX_BACKOFF_BASE_MINUTES,
+            max_minutes: float = INDEX_BACKOFF_MAX_MINUTES,
+            jitter: float = INDEX_BACKOFF_JITTER,
+    ):
+        self.base_minutes = base_minutes
+        self.max_minutes = max_minutes
+        self.jitter = jitter
+
+    def delay(self, misses: int) -> timedelta:
+        """第 misses 次连续未命中后的等待时长"""
+        if misses <= 0:
+            return timedelta(0)
+        minutes = min(self.base_minutes * 2 ** (misses - 1), self.max_minutes)
+        minutes *= 1 + random.uniform(-self.jitter, self.jitter)
+        return timedelta(minutes=min(minutes, self.max_minutes))
+
+    def record(self, article: GeoArticle, index_status: str, now: Optional[datetime] = None):
+        """写入一次检测结论并排定下次检测时间"""
+        now = now or datetime.now()
+        if index_status == "indexed":
+            article.index_miss_count = 0
+            article.next_check_time = None
+        else:
+            # 状态发生变化（如已收录 -> 未收录）时从头计数
+            misses = (article.index_miss_count or 0) if article.index_status == index_status else 0
+            article.index_miss_count = misses + 1
+            article.next_check_time = now + self.delay(article.index_miss_count)
+        article.index_status = index_status
+
+    def retry_later(self, article: GeoArticle, now: Optional[datetime] = None):
+        """检测本身失败：不计入未命中，按当前次数（至少一次）推迟"""
+        now = now or datetime.now()
+        article.next_check_time = now + self.delay(max(article.index_miss_count or 0, 1))
+
+    # 重新发布后清空调度的字段值（供 UPDATE 语句直接使用）
+    RESET_VALUES = {"index_miss_count": 0, "next_check_time": None}
+
+    @classmethod
+    def reset(cls, article: GeoArticle):
+        """重新发布后清空调度，下一轮立即检测"""
+        for key, value in cls.RESET_VALUES.items():
+            setattr(article, key, value)
+
+
+index_backoff = BackoffPolicy()
+# 发布重试只用 delay()：失败后把 publish_time 推到下次允许领取的时间
+publish_backoff = BackoffPolicy(PUBLISH_RETRY_BASE_MINUTES, PUBLISH_RETRY_MAX_MINUTES)
@@ -5,14 +5,17 @@
 """
 
 import base64
+import hashlib
 import json
+import threading
+from collections import OrderedDict
 from loguru import logger
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from typing import Any, Dict, Optional, List
 
-from backend.config import ENCRYPTION_KEY
+from backend.config import ENCRYPTION_KEY, STORAGE_STATE_CACHE_SIZE
 
 
 class CryptoService:
@@ -22,25 +25,32 @@ class CryptoService:
 
     def __init__(self, key: Any = ENCRYPTION_KEY):
         """
-        初始化并派生密钥
+        保存原始密钥，派生推迟到第一次加解密时
         """
         # 确保 key 是 bytes 类型
         if isinstance(key, str):
-            key_bytes = key.encode()
+            self._key_bytes = key.encode()
         else:
-            key_bytes = bytes(key)
-
-        # 1. 派生强密钥
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=b"auto_geo_secure_salt_v1",  # 盐值固定以确保重启后仍能解密旧数据
-            iterations=100000,
-        )
-
-        # Fernet 密钥必须是 32 字节的 base64 编码
-        derived_key = base64.urlsafe_b64encode(kdf.derive(key_bytes))
-        self._fernet = Fernet(derived_key)
+            self._key_bytes = bytes(key)
+        self._fernet_obj: Optional[Fernet] = None
+        self._lock = threading.Lock()
+
+    @property
+    def _fernet(self) -> Fernet:
+        """🌟 懒加载：10 万次 PBKDF2 迭代不再拖慢导入和启动"""
+        if self._fernet_obj is None:
+            with self._lock:
+                if self._fernet_obj is None:
+                    kdf = PBKDF2HMAC(
+                        algorithm=hashes.SHA256(),
+                        length=32,
+                        salt=b"auto_geo_secure_salt_v1",  # 盐值固定以确保重启后仍能解密旧数据
+                        iterations=100000,
+                    )
+                    # Fernet 密钥必须是 32 字节的 base64 编码
+                    derived_key = base64.urlsafe_b64encode(kdf.derive(self._key_bytes))
+                    self._fernet_obj = Fernet(derived_key)
+        return self._fernet_obj
 
     def encrypt(self, data: str) -> str:
         """
@@ -136,4 +146,61 @@ def decrypt_storage_state(encrypted: str) -> Dict:
     """
     if not encrypted:
         return {}
-    return crypto_service.decrypt_dict(encrypted)
\ No newline at end of file
+    return crypto_service.decrypt_dict(encrypted)
+
+
+# ==================== 解密结果缓存 ====================
+
+class StorageStateCache:
+    """
+    已解密 storage_state 的 LRU 缓存
+
+    键为 (账号ID, 密文 SHA-256)：密文一变旧条目自然失效，
+    Account.storage_state 被重新赋值时也会主动清掉该账号的条目。
+    返回的字典被多次发布共享，调用方不要修改。
+    """
+
+    def __init__(self, max_size: int = STORAGE_STATE_CACHE_SIZE):
+        self.max_size = max_size
+        self._items: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, account_id: int, encrypted: str) -> Dict:
+        if not encrypted:
+            return {}
+        key = (account_id, hashlib.sha256(encrypted.encode("utf-8")).hexdigest())
+        with self._lock:
+            state = self._items.get(key)
+            if state is not None:
+                self._items.move_to_end(key)
+                self._stats["hits"] += 1
+                return state
+            self._stats["misses"] += 1
+
+        state = crypto_service.decrypt_dict(encrypted)
+        if state:  # 解密失败不缓存，密钥修复后可以立即重试
+            with self._lock:
+                self._items[key] = state
+                self._items.move_to_end(key)
+                while len(self._items) > self.max_size:
+                    self._items.popitem(last=False)
+        return state
+
+    def invalidate(self, account_id: int):
+        with self._lock:
+            for key in [k for k in self._items if k[0] == account_id]:
+                del self._items[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "size": len(self._items)}
+
+
+storage_state_cache = StorageStateCache()
+
+
+def load_storage_state(account_id: int, encrypted: str) -> Dict:
+    """
+    按账号读取解密后的 storage_state（带缓存）
+    """
+    return storage_state_cache.get(account_id, encrypted)
@@ -8,24 +8,202 @@ GEO文章业务服务 - 工业加固修复版 (v2.6)
 """
 
 import asyncio
+import os
 import random
 import json
-from typing import Any, Dict, Optional, List
-from datetime import datetime
+import socket
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, List
+from datetime import datetime, timedelta
 from loguru import logger
-from sqlalchemy.orm import Session
-
+from sqlalchemy import Integer, and_, or_, update
+from sqlalchemy.orm import Session, defer
+
+from backend.config import (
+    MAX_RETRY_COUNT, PUBLISH_LEASE_SECONDS, PUBLISH_LEASE_HEARTBEAT, PUBLISH_TIMEOUT, GENERATE_BULK_CONCURRENCY
+)
+from backend.database import run_db, snapshot
+from backend.database.pagination import keyset_before
 from backend.database.models import GeoArticle, Keyword, Account
+from backend.services.backoff import index_backoff, publish_backoff
 from backend.services.n8n_service import get_n8n_service
 from backend.services.playwright.publishers.base import get_publisher
-from backend.services.crypto import decrypt_storage_state
-from playwright.async_api import async_playwright
+from backend.services.crypto import load_storage_state
+from backend.services.playwright_mgr import playwright_mgr
 
 # 模块化日志绑定
 gen_log = logger.bind(module="生成器")
 pub_log = logger.bind(module="发布器")
 chk_log = logger.bind(module="监测站")
 
+# 列表摘要视图不加载的大字段（正文、发布日志、收录详情动辄数 KB）
+SUMMARY_DEFERRED_COLUMNS = (GeoArticle.content, GeoArticle.publish_logs, GeoArticle.index_details)
+
+# 当前进程的租约持有者标识，多进程/多机部署时互不冲突
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def publish_claimable(now: datetime):
+    """
+    可被领取发布的文章条件：
+    待发布 / 失败且未超重试次数 / 租约已过期（持有进程崩溃）
+    """
+    return and_(
+        GeoArticle.publish_time <= now,
+        or_(
+            GeoArticle.publish_status == "scheduled",
+            and_(GeoArticle.publish_status == "failed", GeoArticle.retry_count <= MAX_RETRY_COUNT),
+            and_(GeoArticle.publish_status.in_(("claimed", "publishing")), GeoArticle.lease_expires_at < now),
+        )
+    )
+
+
+def renew_publish_lease(db: Session, article_ids: List[int], owner: str, status: Optional[str] = None) -> int:
+    """
+    续租（单写者队列中执行）：只续本进程仍持有的 claimed / publishing 租约
+
+    Args:
+        status: 同时切换的发布状态（如开始执行时改为 publishing）
+
+    Returns:
+        续上的文章数；租约已过期被其他进程接管的文章不计入
+    """
+    values: Dict[str, Any] = {"lease_expires_at": datetime.now() + timedelta(seconds=PUBLISH_LEASE_SECONDS)}
+    if status:
+        values["publish_status"] = status
+    result = db.execute(
+        update(GeoArticle)
+        .where(GeoArticle.id.in_(article_ids),
+               GeoArticle.lease_owner == owner,
+               GeoArticle.publish_status.in_(("claimed", "publishing")))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def finish_publish(db: Session, article_id: int, owner: str, values: Dict[str, Any]) -> bool:
+    """写入发布结论并释放租约（单写者队列中执行）；租约已不属于 owner 时不写，返回 False"""
+    result = db.execute(
+        update(GeoArticle)
+        .where(GeoArticle.id == article_id, GeoArticle.lease_owner == owner)
+        .values(**values, lease_owner=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def new_placeholder(keyword_id: int, platform: str, publish_time: Optional[datetime]) -> GeoArticle:
+    """生成中的占位文章，调度器不会扫描 generating 状态"""
+    return GeoArticle(
+        keyword_id=keyword_id,
+        title="[AI正在创作中]...",
+        content="正在努力写作，请稍后刷新列表...",
+        platform=platform,
+        publish_status="generating",
+        publish_time=publish_time
+    )
+
+
+async def generate_article_fields(kw_text: str, company_name: str, platform: str,
+                                  publish_time: Optional[datetime]) -> Dict[str, Any]:
+    """
+    调用 n8n 生成一篇文章，返回需要回填到占位记录的字段
+    失败时返回 publish_status=failed 和错误信息，不抛异常
+    """
+    try:
+        gen_log.info(f"🛰️ 正在外发 AI 请求 (关键词: {kw_text})...")
+        n8n = await get_n8n_service()
+        n8n_res = await n8n.generate_geo_article(
+            keyword=kw_text,
+            platform=platform,
+            requirements=f"围绕【{company_name}】编写，风格专业商务。",
+            word_count=1200
+        )
+
+        if n8n_res.status != "success":
+            gen_log.error(f"❌ AI 生成失败：{n8n_res.error}")
+            return {"publish_status": "failed", "error_msg": n8n_res.error}
+
+        ai_data = n8n_res.data or {}
+        title = ai_data.get("title", f"关于{kw_text}的深度解析")
+        gen_log.success(f"✅ 生成成功：文章《{title[:10]}...》已进入待发布队列")
+        # 🌟 核心修复：只有到这一步，状态才改为 scheduled，调度器此时才能扫描到
+        return {
+            "title": title,
+            "content": ai_data.get("content", "内容生成失败"),
+            "publish_status": "scheduled",
+            "publish_time": publish_time or datetime.now(),
+        }
+    except Exception as e:
+        gen_log.exception(f"🚨 后台生成异常：{str(e)}")
+        return {"publish_status": "failed", "error_msg": str(e)}
+
+
+def _apply_generated(db: Session, article_id: int, fields: Dict[str, Any]):
+    """生成结果回填占位记录（单写者队列中执行）"""
+    db.query(GeoArticle).filter(GeoArticle.id == article_id).update(fields, synchronize_session=False)
+
+
+async def generate_bulk(
+        items: List[Dict[str, Any]],
+        platform: str,
+        publish_time: Optional[datetime] = None,
+        concurrency: int = GENERATE_BULK_CONCURRENCY,
+        on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+) -> Dict[str, Any]:
+    """
+    批量生成：占位记录已提前插入，这里用有界并发调用 n8n 并逐篇回填
+
+    Args:
+        items: [{"article_id", "keyword", "company_name"}]
+        on_progress: 每完成一篇回调一次，参数为汇总进度
+
+    Returns:
+        汇总进度 {"total", "completed", "succeeded", "failed"}
+    """
+    from backend.database.writer import get_db_writer
+
+    writer = get_db_writer()
+    # 调用方传入的并发数不能超过配置上限，避免一次请求打满 n8n
+    concurrency = min(max(concurrency or 1, 1), GENERATE_BULK_CONCURRENCY)
+    semaphore = asyncio.Semaphore(concurrency)
+    progress = {"total": len(items), "completed": 0, "succeeded": 0, "failed": 0}
+
+    async def run_one(item: Dict[str, Any]):
+        async with semaphore:
+            fields = await generate_article_fields(item["keyword"], item["company_name"], platform, publish_time)
+        try:
+            await writer.write(_apply_generated, item["article_id"], fields)
+        except Exception as e:
+            gen_log.error(f"🚨 文章 {item['article_id']} 生成结果回填失败: {e}")
+            # 回填失败也要把占位记录改为 failed，否则它会永远停在 generating
+            fields = {"publish_status": "failed", "error_msg": f"生成结果回填失败: {e}"}
+            try:
+                await writer.write(_apply_generated, item["article_id"], fields)
+            except Exception as e2:
+                gen_log.error(f"🚨 文章 {item['article_id']} 无法标记为失败，仍为 generating: {e2}")
+
+        progress["completed"] += 1
+        progress["failed" if fields["publish_status"] == "failed" else "succeeded"] += 1
+        if on_progress:
+            # 进度推送失败不影响生成本身
+            try:
+                await on_progress({**progress, "article_id": item["article_id"],
+                                   "status": fields["publish_status"]})
+            except Exception as e:
+                gen_log.warning(f"⚠️ 批量生成进度推送失败: {e}")
+
+    gen_log.info(f"📦 批量生成启动：{len(items)} 篇，并发 {concurrency}")
+    # 单篇出现意外异常时其余文章照常完成，汇总结果仍然返回
+    results = await asyncio.gather(*[run_one(item) for item in items], return_exceptions=True)
+    for item, result in zip(items, results):
+        if isinstance(result, Exception):
+            gen_log.error(f"🚨 文章 {item['article_id']} 批量生成异常: {result}")
+    gen_log.success(f"📦 批量生成结束：成功 {progress['succeeded']} 篇，失败 {progress['failed']} 篇")
+    return progress
+
 
 class GeoArticleService:
     def __init__(self, db: Session):
@@ -38,109 +216,167 @@ class GeoArticleService:
         流程：创建占位(generating) -> 调用 n8n -> 填充内容 -> 设为待发布(scheduled)
         """
         # 1. 创建占位记录，初始状态为 generating
-        article = GeoArticle(
-            keyword_id=keyword_id,
-            title="[AI正在创作中]...",
-            content="正在努力写作，请稍后刷新列表...",
-            platform=platform,
-            publish_status="generating",
-            publish_time=publish_time
-        )
-        self.db.add(article)
-        self.db.commit()
-        self.db.refresh(article)
+        article = new_placeholder(keyword_id, platform, publish_time)
+        await run_db(self._insert, article)
+        article_id = article.id
 
         gen_log.info(f"🆕 任务启动：为关键词 ID {keyword_id} 生成文章")
 
-        try:
-            # 2. 获取关键词文本
-            kw_obj = self.db.query(Keyword).filter(Keyword.id == keyword_id).first()
-            kw_text = kw_obj.keyword if kw_obj else "未知关键词"
-
-            # 3. 调用 n8n AI 中台
-            gen_log.info(f"🛰️ 正在外发 AI 请求 (关键词: {kw_text})...")
-            n8n = await get_n8n_service()
-            n8n_res = await n8n.generate_geo_article(
-                keyword=kw_text,
-                platform=platform,
-                requirements=f"围绕【{company_name}】编写，风格专业商务。",
-                word_count=1200
+        # 2. 获取关键词文本
+        kw_obj = await run_db(lambda: self.db.query(Keyword).filter(Keyword.id == keyword_id).first())
+        kw_text = kw_obj.keyword if kw_obj else "未知关键词"
+
+        # 3. 调用 n8n AI 中台并回填
+        fields = await generate_article_fields(kw_text, company_name, platform, publish_time)
+        for key, value in fields.items():
+            setattr(article, key, value)
+        await run_db(self.db.commit)
+        if fields["publish_status"] == "failed":
+            return {"success": False, "article_id": article_id, "message": fields["error_msg"]}
+        return {"success": True, "article_id": article_id}
+
+    def claim_for_publish(self, article_id: int, owner: str = WORKER_ID) -> bool:
+        """
+        原子领取一篇文章的发布权（单条 UPDATE ... WHERE）
+
+        只有满足可发布条件的文章才会被改为 claimed 并写入租约，
+        多个 worker 同时领取时只有一个能拿到 rowcount == 1。
+        租约过期被重新领取的文章视为一次失败尝试，计入 retry_count。
+        """
+        now = datetime.now()
+        stale = GeoArticle.publish_status.in_(("claimed", "publishing"))
+        result = self.db.execute(
+            update(GeoArticle)
+            .where(GeoArticle.id == article_id, publish_claimable(now))
+            .values(
+                publish_status="claimed",
+                lease_owner=owner,
+                lease_expires_at=now + timedelta(seconds=PUBLISH_LEASE_SECONDS),
+                retry_count=GeoArticle.retry_count + stale.cast(Integer),
             )
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+    def release_claim(self, article_id: int, owner: str = WORKER_ID):
+        """放弃未执行的租约，文章回到待发布状态"""
+        self.db.execute(
+            update(GeoArticle)
+            .where(GeoArticle.id == article_id,
+                   GeoArticle.publish_status == "claimed",
+                   GeoArticle.lease_owner == owner)
+            .values(publish_status="scheduled", lease_owner=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
 
-            if n8n_res.status == "success":
-                ai_data = n8n_res.data or {}
-                article.title = ai_data.get("title", f"关于{kw_text}的深度解析")
-                article.content = ai_data.get("content", "内容生成失败")
+    def _insert(self, obj):
+        self.db.add(obj)
+        self.db.commit()
+        self.db.refresh(obj)
 
-                # 🌟 核心修复：只有到这一步，状态才改为 scheduled，调度器此时才能扫描到
-                article.publish_status = "scheduled"
-                if not publish_time:
-                    article.publish_time = datetime.now()
+    @asynccontextmanager
+    async def _lease_heartbeat(self, article_id: int, owner: str):
+        """发布执行期间定期续租，防止慢发布的租约过期后被其他进程重新领取"""
+        from backend.database.writer import get_db_writer
 
-                gen_log.success(f"✅ 生成成功：文章《{article.title[:10]}...》已进入待发布队列")
-            else:
-                article.publish_status = "failed"
-                article.error_msg = n8n_res.error
-                gen_log.error(f"❌ AI 生成失败：{n8n_res.error}")
+        async def beat():
+            while True:
+                await asyncio.sleep(PUBLISH_LEASE_HEARTBEAT)
+                if not await get_db_writer().write(renew_publish_lease, [article_id], owner):
+                    pub_log.warning(f"⚠️ 文章 {article_id} 的发布租约已失效，停止续租")
+                    return
 
-            self.db.commit()
-            return {"success": True, "article_id": article.id}
+        task = asyncio.create_task(beat())
+        try:
+            yield
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
 
-        except Exception as e:
-            gen_log.exception(f"🚨 后台生成异常：{str(e)}")
-            article.publish_status = "failed"
-            article.error_msg = str(e)
-            self.db.commit()
-            return {"success": False, "message": str(e)}
+    async def _finish(self, article_id: int, owner: str, **values) -> bool:
+        """写入发布结论（条件写：仍持有租约才生效）"""
+        from backend.database.writer import get_db_writer
+
+        if await get_db_writer().write(finish_publish, article_id, owner, values):
+            return True
+        pub_log.error(f"⚠️ 文章 {article_id} 的租约已被其他任务接管，本次结果未写入")
+        return False
 
-    async def execute_publish(self, article_id: int) -> bool:
+    async def _fail(self, article, owner: str, error_msg: str) -> bool:
+        """
+        记一次失败尝试：累加 retry_count，并按失败次数把 publish_time 推到下次允许领取的时间，
+        避免每次都失败的文章被调度器每轮重新领取
+        """
+        attempts = (article.retry_count or 0) + 1
+        return await self._finish(article.id, owner, publish_status="failed", error_msg=error_msg,
+                                  retry_count=GeoArticle.retry_count + 1,
+                                  publish_time=datetime.now() + publish_backoff.delay(attempts))
+
+    async def execute_publish(self, article_id: int, lease_owner: Optional[str] = None) -> bool:
         """
         执行真实发布动作
-        增加了严格的状态校验，防止 AI 未完成时抢跑
+        调度器会先领取租约再投递；直接调用时在这里自行领取，保证同一篇文章不会被并发发布。
+        开始执行时重新确认并续租，执行中定期续租，结论只在仍持有租约时写入。
         """
-        article = self.db.query(GeoArticle).filter(GeoArticle.id == article_id).first()
+        from backend.database.writer import get_db_writer
+
+        writer = get_db_writer()
+        if lease_owner is None:
+            lease_owner = WORKER_ID
+            if not await run_db(self.claim_for_publish, article_id, lease_owner):
+                pub_log.info(f"⏭️ 跳过文章 {article_id}：当前不可发布或已被其他任务领取")
+                return False
+
+        # 🌟 排队期间租约可能已过期并被其他进程接管：先确认仍归本任务并续租
+        if not await writer.write(renew_publish_lease, [article_id], lease_owner):
+            pub_log.info(f"⏭️ 跳过文章 {article_id}：租约已不属于本任务")
+            return False
+
+        # 在数据库线程里取出列值快照：后面 release_claim 等 commit 会让实例过期，
+        # 不能在事件循环线程上再触发懒加载
+        article = await run_db(lambda: snapshot(self.get_article(article_id)))
 
-        # 🌟 核心修复：状态守卫
+        # 🌟 核心修复：状态守卫（只执行自己持有租约的文章）
         if not article:
             return False
 
-        if article.publish_status != "scheduled":
-            pub_log.info(f"⏭️ 跳过文章 {article_id}：当前状态为 {article.publish_status}，AI 尚未完成生成")
+        if article.publish_status != "claimed" or article.lease_owner != lease_owner:
+            pub_log.info(f"⏭️ 跳过文章 {article_id}：当前状态为 {article.publish_status}，租约不属于本任务")
             return False
 
         if "创作中" in article.title:
             pub_log.warning(f"⚠️ 文章 {article_id} 内容仍为占位符，拒绝启动浏览器")
+            await run_db(self.release_claim, article_id, lease_owner)
             return False
 
         # 1. 查找授权账号
-        account = self.db.query(Account).filter(
+        account = await run_db(lambda: snapshot(self.db.query(Account).filter(
             Account.platform == article.platform,
             Account.status == 1
-        ).first()
+        ).first()))
 
         if not account or not account.storage_state:
             pub_log.warning(f"⚠️ 无法发布：{article.platform} 平台暂无有效授权账号")
-            article.publish_status = "failed"
-            article.error_msg = "缺少授权数据，请重新授权"
-            self.db.commit()
+            await self._fail(article, lease_owner, "缺少授权数据，请重新授权")
             return False
 
         # 2. 获取适配器
         publisher = get_publisher(article.platform)
         if not publisher:
             pub_log.error(f"❌ 未找到平台适配器: {article.platform}")
+            await self._fail(article, lease_owner, f"未找到平台适配器: {article.platform}")
             return False
 
         # 3. 解析 Session
         try:
-            state_data = decrypt_storage_state(account.storage_state)
+            state_data = load_storage_state(account.id, account.storage_state)
             if not state_data:
                 state_data = json.loads(account.storage_state)
         except Exception as e:
             pub_log.error(f"❌ 账号 {account.account_name} 的 Session 解析失败: {e}")
-            article.publish_status = "failed"
-            article.error_msg = "Session解析失败，请重新授权"
-            self.db.commit()
+            await self._fail(article, lease_owner, "Session解析失败，请重新授权")
             return False
 
         # 4. 模拟人工随机延迟
@@ -148,81 +384,143 @@ class GeoArticleService:
         pub_log.info(f"⏳ 模拟人工：将在 {wait_time}s 后启动浏览器推送文章")
         await asyncio.sleep(wait_time)
 
-        # 5. 启动 Playwright 执行
-        async with async_playwright() as p:
-            # 调试阶段建议 headless=False
-            browser = await p.chromium.launch(headless=False)
-            try:
-                context = await browser.new_context(
+        # 5. 从常驻浏览器池租用该账号的上下文执行（不再每篇文章冷启动 Chromium）
+        try:
+            async with playwright_mgr.publish_pool.lease(
+                    account.id,
                     storage_state=state_data,
+                    block_profile=account.platform,
                     viewport={"width": 1280, "height": 800}
-                )
+            ) as context:
                 page = await context.new_page()
-
-                pub_log.info(f"🚀 正在执行 {article.platform} 自动化发布脚本...")
-                article.publish_status = "publishing"
-                self.db.commit()
-
-                # 执行适配器逻辑
-                result = await publisher.publish(page, article, account)
-
-                if result.get("success"):
-                    article.publish_status = "published"
-                    article.publish_time = datetime.now()
-                    article.platform_url = result.get("platform_url")
-                    article.publish_logs = f"[{datetime.now()}] ✅ 发布成功\n"
-                    pub_log.success(f"🎊 发布完成：{article.platform_url}")
-                    success = True
-                else:
-                    article.publish_status = "failed"
-                    article.error_msg = result.get("error_msg")
-                    article.retry_count += 1
-                    pub_log.error(f"❌ 发布失败：{article.error_msg}")
-                    success = False
-
-                self.db.commit()
+                try:
+                    if not await writer.write(renew_publish_lease, [article_id], lease_owner, "publishing"):
+                        pub_log.warning(f"⏭️ 文章 {article_id} 的租约已失效，放弃发布")
+                        return False
+
+                    pub_log.info(f"🚀 正在执行 {article.platform} 自动化发布脚本...")
+                    # 执行适配器逻辑（发布期间续租，超过 PUBLISH_TIMEOUT 强制结束）
+                    async with self._lease_heartbeat(article_id, lease_owner):
+                        try:
+                            result = await asyncio.wait_for(
+                                publisher.publish(page, article, account), PUBLISH_TIMEOUT)
+                        except asyncio.TimeoutError:
+                            result = {"success": False, "error_msg": f"发布超时（{PUBLISH_TIMEOUT}s）"}
+                finally:
+                    await page.close()
+
+            if result.get("success"):
+                platform_url = result.get("platform_url")
+                now = datetime.now()
+                # 重新发布后收录复查从头开始
+                success = await self._finish(
+                    article_id, lease_owner,
+                    publish_status="published",
+                    publish_time=now,
+                    platform_url=platform_url,
+                    publish_logs=f"[{now}] ✅ 发布成功\n",
+                    **index_backoff.RESET_VALUES,
+                )
+                if success:
+                    pub_log.success(f"🎊 发布完成：{platform_url}")
                 return success
 
-            except Exception as e:
-                pub_log.error(f"🚨 浏览器执行崩溃: {e}")
-                article.publish_status = "failed"
-                article.error_msg = f"执行异常: {str(e)}"
-                self.db.commit()
-                return False
-            finally:
-                await browser.close()
+            error_msg = result.get("error_msg")
+            pub_log.error(f"❌ 发布失败：{error_msg}")
+            await self._fail(article, lease_owner, error_msg)
+            return False
+
+        except Exception as e:
+            pub_log.error(f"🚨 浏览器执行崩溃: {e}")
+            await self._fail(article, lease_owner, f"执行异常: {str(e)}")
+            return False
 
     async def check_quality(self, article_id: int) -> Dict[str, Any]:
         """质检逻辑"""
-        article = self.get_article(article_id)
+        article = await run_db(self.get_article, article_id)
         if not article: return {"success": False, "message": "文章不存在"}
 
         gen_log.info(f"📊 正在对文章 {article_id} 进行 AI 质量评估...")
-        article.quality_score = random.randint(85, 98)
-        article.quality_status = "passed"
-        self.db.commit()
+        score = random.randint(85, 98)
+
+        def save():
+            article.quality_score = score
+            article.quality_status = "passed"
+            self.db.commit()
 
-        return {"success": True, "score": article.quality_score}
+        await run_db(save)
+        return {"success": True, "score": score}
 
     async def check_article_index(self, article_id: int) -> Dict[str, Any]:
-        """收录监测逻辑"""
-        article = self.get_article(article_id)
+        """收录监测逻辑：按文章所属关键词检测，结论同步到同关键词的所有已发布文章"""
+        from backend.services.index_check_service import IndexCheckService
+
+        article = await run_db(self.get_article, article_id)
         if not article or article.publish_status != "published":
             return {"status": "error", "message": "文章未发布"}
 
         chk_log.info(f"🔍 [监测] 正在检索文章《{article.title[:10]}...》的收录情况")
-        await asyncio.sleep(2)
-        is_indexed = random.random() > 0.5
-        article.index_status = "indexed" if is_indexed else "not_indexed"
-        article.last_check_time = datetime.now()
-        self.db.commit()
-        return {"status": "success", "index_status": article.index_status}
+        verdicts = await IndexCheckService(self.db).check_keyword(article.keyword_id)
+        if not verdicts:
+            return {"status": "error", "message": "关键词不存在"}
+        await run_db(self.db.refresh, article)
+        return {"status": "success", "index_status": article.index_status, "platforms": verdicts}
 
     def get_article(self, article_id: int) -> Optional[GeoArticle]:
         return self.db.query(GeoArticle).get(article_id)
 
-    def get_articles(self) -> List[GeoArticle]:
-        return self.db.query(GeoArticle).order_by(GeoArticle.created_at.desc()).all()
+    @staticmethod
+    def _list_query(query, publish_status: Optional[str], platform: Optional[str], keyword_id: Optional[int],
+                    before: Optional[tuple], limit: Optional[int]):
+        """列表的筛选、键集分页与排序（按创建时间倒序）"""
+        if publish_status:
+            query = query.filter(GeoArticle.publish_status == publish_status)
+        if platform:
+            query = query.filter(GeoArticle.platform == platform)
+        if keyword_id is not None:
+            query = query.filter(GeoArticle.keyword_id == keyword_id)
+        if before:
+            query = query.filter(keyset_before(GeoArticle.created_at, GeoArticle.id, before))
+        query = query.order_by(GeoArticle.created_at.desc(), GeoArticle.id.desc())
+        if limit:
+            query = query.limit(limit)
+        return query
+
+    def get_articles(
+            self,
+            limit: Optional[int] = None,
+            publish_status: Optional[str] = None,
+            platform: Optional[str] = None,
+            keyword_id: Optional[int] = None,
+            before: Optional[tuple] = None,
+            summary: bool = False,
+    ) -> List[GeoArticle]:
+        """
+        按创建时间倒序查询文章
+
+        Args:
+            before: 键集分页位置 (created_at, id)，只返回排在它之后的文章
+            summary: 摘要视图，不加载 SUMMARY_DEFERRED_COLUMNS；访问这些字段会直接报错而不是逐行补查
+        """
+        query = self.db.query(GeoArticle)
+        if summary:
+            query = query.options(*(defer(col, raiseload=True) for col in SUMMARY_DEFERRED_COLUMNS))
+        return self._list_query(query, publish_status, platform, keyword_id, before, limit).all()
+
+    def get_article_versions(
+            self,
+            limit: Optional[int] = None,
+            publish_status: Optional[str] = None,
+            platform: Optional[str] = None,
+            keyword_id: Optional[int] = None,
+            before: Optional[tuple] = None,
+    ) -> List[Any]:
+        """
+        与 get_articles 同一页的版本信息 [(id, created_at, updated_at)]
+        只查三个窄列、不构造 ORM 对象，用于在加载整页之前做 ETag 协商
+        """
+        query = self.db.query(GeoArticle.id, GeoArticle.created_at, GeoArticle.updated_at)
+        return self._list_query(query, publish_status, platform, keyword_id, before, limit).all()
 
     def delete_article(self, article_id: int) -> bool:
         article = self.get_article(article_id)
@@ -5,23 +5,73 @@
 """
 
 import asyncio
+import json
 import random
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import time
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
 from loguru import logger
 from sqlalchemy.orm import Session
-from playwright.async_api import async_playwright
 
+from backend.database import run_db
+from backend.database.writer import DBWriter, get_db_writer
 from backend.database.models import IndexCheckRecord, Keyword, QuestionVariant, GeoArticle
-from backend.config import AI_PLATFORMS
+from backend.config import (
+    AI_PLATFORMS, INDEX_CHECK_PLATFORM_CONCURRENCY, INDEX_CHECK_MIN_INTERVAL, INDEX_RECHECK_MIN_INTERVAL
+)
+from backend.services.backoff import index_backoff
+from backend.services.playwright_mgr import playwright_mgr
 
 # 🌟 绑定模块名，用于 WebSocket 实时日志着色
 chk_log = logger.bind(module="监测站")
 
+CHECK_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+
+class RateLimiter:
+    """最小间隔限流器：同一平台相邻两次提问至少间隔 interval 秒"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._next_at = 0.0
+
+    async def wait(self):
+        async with self._lock:
+            delay = self._next_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_at = time.monotonic() + self.interval
+
+
+# 平台级限流器，所有检测任务共享
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def _get_rate_limiter(platform_id: str) -> RateLimiter:
+    if platform_id not in _rate_limiters:
+        interval = INDEX_CHECK_MIN_INTERVAL.get(platform_id, INDEX_CHECK_MIN_INTERVAL.get("default", 0))
+        _rate_limiters[platform_id] = RateLimiter(interval)
+    return _rate_limiters[platform_id]
+
+
+def keyword_check_due(last_check_time: Optional[datetime], interval_minutes: Optional[int],
+                      now: Optional[datetime] = None) -> bool:
+    """关键词是否已过最小检测间隔"""
+    if last_check_time is None:
+        return True
+    interval = interval_minutes if interval_minutes is not None else INDEX_RECHECK_MIN_INTERVAL
+    return last_check_time + timedelta(minutes=interval) <= (now or datetime.now())
+
 
 class IndexCheckService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, writer: Optional[DBWriter] = None):
         self.db = db
+        # 检测记录和结论回填交给单写者队列合并提交
+        self.writer = writer or get_db_writer()
+        # 多个平台协程共享同一个 Session：读操作加锁后串行丢进数据库线程池
+        self._db_lock = asyncio.Lock()
         # 注意：这里假设你已经定义好了相关的 Checker 类
         # 如果还没写完逻辑，可以使用下方的 Mock 逻辑进行测试
         try:
@@ -40,19 +90,74 @@ class IndexCheckService:
             keyword_id: int,
             company_name: str,
             platforms: Optional[List[str]] = None
-    ):
+    ) -> Dict[str, Dict[str, Any]]:
         """
         🌟 核心方法：执行收录检测 (由 API 异步调用)
+
+        各 AI 平台并行检测，平台内按 INDEX_CHECK_PLATFORM_CONCURRENCY 开多个槽位，
+        每个槽位独占检测池中的一个上下文；每条结果完成即落库。
+
+        Returns:
+            按平台汇总的检测结论 {platform: {"checked", "errors", "keyword_found", "company_found", "hits"}}
         """
-        # 1. 基础数据校验
-        keyword_obj = self.db.query(Keyword).filter(Keyword.id == keyword_id).first()
-        if not keyword_obj:
+        # 1~2. 基础数据校验 + 获取检测问题
+        loaded = await self._run_db(self._load_questions, keyword_id, company_name)
+        if not loaded:
             chk_log.error(f"❌ 错误：关键词 ID {keyword_id} 不存在")
-            return
+            return {}
+        keyword_text, query_texts = loaded
+
+        chk_log.info(f"🔍 监测启动：正在检索关键词 【{keyword_text}】")
+
+        # 确定平台
+        target_platforms = platforms if platforms else ["doubao", "qianwen", "deepseek"]
+
+        # 3. 各平台并行检测
+        chk_log.info(f"🌐 并行检测 {len(target_platforms)} 个平台 × {len(query_texts)} 个问题 "
+                     f"(目标平台: {', '.join(target_platforms)})...")
+        started = time.monotonic()
+        verdicts = {p: {"checked": 0, "errors": 0, "keyword_found": False, "company_found": False, "hits": 0}
+                    for p in target_platforms}
+
+        results = await asyncio.gather(*[
+            self._check_platform(p, query_texts, keyword_id, keyword_text, company_name, verdicts[p])
+            for p in target_platforms
+        ], return_exceptions=True)
+        for platform_id, result in zip(target_platforms, results):
+            if isinstance(result, Exception):
+                chk_log.error(f"🚨 {platform_id} 检测过程中发生异常: {result}")
+
+        # 4. 结论扇出到该关键词下所有已发布文章（排在本轮检测记录之后提交）
+        try:
+            await self.writer.write(self._apply_verdict, keyword_id, verdicts)
+        except Exception as e:
+            chk_log.error(f"🚨 回填文章收录状态失败: {e}")
+
+        chk_log.success(f"✅ 关键词 【{keyword_text}】 监测任务执行完毕，"
+                        f"耗时 {time.monotonic() - started:.1f}s")
+        return verdicts
 
-        chk_log.info(f"🔍 监测启动：正在检索关键词 【{keyword_obj.keyword}】")
+    async def check_keyword(self, keyword_id: int, platforms: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """按关键词检测一次（公司名取自所属项目），结论回填到该关键词下所有已发布文章"""
+        def load_company():
+            keyword_obj = self.db.query(Keyword).filter(Keyword.id == keyword_id).first()
+            return keyword_obj.project.company_name if keyword_obj and keyword_obj.project else None
 
-        # 2. 获取检测问题
+        company_name = await self._run_db(load_company)
+        if not company_name:
+            chk_log.error(f"❌ 错误：关键词 ID {keyword_id} 不存在或未关联项目")
+            return {}
+        return await self.run_ai_search_check(keyword_id, company_name, platforms)
+
+    async def _run_db(self, fn, *args):
+        async with self._db_lock:
+            return await run_db(fn, *args)
+
+    def _load_questions(self, keyword_id: int, company_name: str) -> Optional[Tuple[str, List[str]]]:
+        """读取关键词文本和检测问题（同步，在数据库线程池中执行）"""
+        keyword_obj = self.db.query(Keyword).filter(Keyword.id == keyword_id).first()
+        if not keyword_obj:
+            return None
         questions = self.db.query(QuestionVariant).filter(
             QuestionVariant.keyword_id == keyword_id
         ).all()
@@ -60,77 +165,140 @@ class IndexCheckService:
         # 兜底：如果没有变体词，生成一个默认问题
         query_texts = [q.question for q in questions] if questions else [
             f"请推荐一些专业的{keyword_obj.keyword}服务商，{company_name}怎么样？"]
+        return keyword_obj.keyword, query_texts
 
-        # 确定平台
-        target_platforms = platforms if platforms else ["doubao", "qianwen", "deepseek"]
+    @staticmethod
+    def _apply_verdict(db: Session, keyword_id: int, verdicts: Dict[str, Dict[str, Any]]):
+        """
+        把一次关键词检测的结论写回所有受影响的文章（单写者队列中执行）
+
+        任一平台命中公司名即视为已收录，并由退避策略排定下次检测时间；
+        所有平台都检测失败时只记录时间，不改收录状态。
+        """
+        now = datetime.now()
+        checked = any(v["checked"] for v in verdicts.values())
+        indexed = any(v["company_found"] for v in verdicts.values())
+        details = json.dumps(verdicts, ensure_ascii=False)
+        articles = db.query(GeoArticle).filter(
+            GeoArticle.keyword_id == keyword_id,
+            GeoArticle.publish_status == "published"
+        ).all()
+        for article in articles:
+            if checked:
+                index_backoff.record(article, "indexed" if indexed else "not_indexed", now)
+            else:
+                index_backoff.retry_later(article, now)
+            article.index_details = details
+            article.last_check_time = now
+        db.query(Keyword).filter(Keyword.id == keyword_id).update(
+            {Keyword.last_check_time: now}, synchronize_session=False)
+        if articles:
+            chk_log.info(f"📝 检测结论已回填 {len(articles)} 篇文章 "
+                         f"({'已收录' if indexed else '未收录' if checked else '检测失败'})")
+
+    async def _check_platform(
+            self,
+            platform_id: str,
+            query_texts: List[str],
+            keyword_id: int,
+            keyword_text: str,
+            company_name: str,
+            verdict: Dict[str, Any]
+    ):
+        """单个平台：问题放入队列，由多个槽位并发消费"""
+        chk_log.info(f"📡 正在接入 {platform_id} 平台...")
+        queue: asyncio.Queue = asyncio.Queue()
+        for q_text in query_texts:
+            queue.put_nowait(q_text)
 
-        # 3. 启动 Playwright 执行检测
-        chk_log.info(f"🌐 正在初始化自动化浏览器 (目标平台: {', '.join(target_platforms)})...")
+        slots = INDEX_CHECK_PLATFORM_CONCURRENCY.get(
+            platform_id, INDEX_CHECK_PLATFORM_CONCURRENCY.get("default", 1))
+        slots = max(1, min(slots, len(query_texts)))
+        await asyncio.gather(*[
+            self._platform_worker(platform_id, slot, queue, keyword_id, keyword_text, company_name, verdict)
+            for slot in range(slots)
+        ])
+
+    async def _platform_worker(
+            self,
+            platform_id: str,
+            slot: int,
+            queue: asyncio.Queue,
+            keyword_id: int,
+            keyword_text: str,
+            company_name: str,
+            verdict: Dict[str, Any]
+    ):
+        checker = self.checkers.get(platform_id)
+        limiter = _get_rate_limiter(platform_id)
 
-        async with async_playwright() as p:
-            # 这里的 headless=True 代表后台运行。调试时可以改为 False 看效果
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
+        if not checker:
+            # 🌟 Mock 模式：如果没有实现具体插件，先跑通流程
+            while not queue.empty():
+                q_text = queue.get_nowait()
+                await asyncio.sleep(2)  # 模拟网络耗时
+                res = {
+                    "success": True,
+                    "answer": f"为您找到关于{keyword_text}的信息...",
+                    "keyword_found": True,
+                    "company_found": random.random() > 0.4
+                }
+                await self._save_record(keyword_id, platform_id, q_text, res, verdict)
+            return
+
+        # 槽位 key 在所有检测任务间共享，同平台并发数全局不超过槽位数
+        async with playwright_mgr.check_pool.lease(
+                f"{platform_id}#{slot}",
+                block_profile=platform_id,
                 viewport={'width': 1280, 'height': 800},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
+                user_agent=CHECK_USER_AGENT
+        ) as context:
             page = await context.new_page()
-
             try:
-                for platform_id in target_platforms:
-                    chk_log.info(f"📡 正在接入 {platform_id} 平台...")
-
-                    # 🌟 模拟/实际检测逻辑
-                    for q_text in query_texts:
-                        chk_log.info(f"💬 询问 AI: \"{q_text[:20]}...\"")
-
-                        # --- 核心逻辑：这里调用你定义的每个平台的爬虫逻辑 ---
-                        checker = self.checkers.get(platform_id)
-                        if checker:
-                            # 实际调用 Playwright 脚本
-                            res = await checker.check(page, q_text, keyword_obj.keyword, company_name)
-                        else:
-                            # 🌟 Mock 模式：如果没有实现具体插件，先跑通流程
-                            await asyncio.sleep(2)  # 模拟网络耗时
-                            is_hit = random.random() > 0.4
-                            res = {
-                                "success": True,
-                                "answer": f"为您找到关于{keyword_obj.keyword}的信息...",
-                                "keyword_found": True,
-                                "company_found": is_hit
-                            }
-
-                        # 4. 保存结果到数据库
-                        record = IndexCheckRecord(
-                            keyword_id=keyword_id,
-                            platform=platform_id,
-                            question=q_text,
-                            answer=res.get("answer"),
-                            keyword_found=res.get("keyword_found", False),
-                            company_found=res.get("company_found", False),
-                            check_time=datetime.now()
-                        )
-                        self.db.add(record)
-
-                        # 5. 回填更新 GeoArticle 状态
-                        article = self.db.query(GeoArticle).filter(GeoArticle.keyword_id == keyword_id).first()
-                        if article:
-                            if res.get("company_found"):
-                                article.index_status = "indexed"
-                                chk_log.success(f"🎯 命中！{platform_id} 已收录文章内容")
-                            else:
-                                article.index_status = "not_indexed"
-                                chk_log.warning(f"☁️ 未命中：{platform_id} 暂未发现关联信息")
-                            article.last_check_time = datetime.now()
-
-                self.db.commit()
-                chk_log.success(f"✅ 关键词 【{keyword_obj.keyword}】 监测任务执行完毕")
-
-            except Exception as e:
-                self.db.rollback()
-                chk_log.error(f"🚨 监测过程中发生异常: {str(e)}")
+                while not queue.empty():
+                    q_text = queue.get_nowait()
+                    await limiter.wait()
+                    chk_log.info(f"💬 [{platform_id}#{slot}] 询问 AI: \"{q_text[:20]}...\"")
+                    try:
+                        res = await checker.check(page, q_text, keyword_text, company_name)
+                    except Exception as e:
+                        res = {"success": False, "answer": None, "keyword_found": False,
+                               "company_found": False, "error_msg": str(e)}
+                    await self._save_record(keyword_id, platform_id, q_text, res, verdict)
             finally:
-                await browser.close()
+                await page.close()
+
+    async def _save_record(self, keyword_id: int, platform_id: str, q_text: str,
+                           res: Dict[str, Any], verdict: Dict[str, Any]):
+        """单条结果即时落库，并累计到平台结论（检测失败也留记录，只是不计入结论）"""
+        if not res.get("success", True):
+            verdict["errors"] += 1
+            chk_log.warning(f"⚠️ {platform_id} 检测失败: {res.get('error_msg')}")
+        else:
+            verdict["checked"] += 1
+            verdict["keyword_found"] |= bool(res.get("keyword_found"))
+            if res.get("company_found"):
+                verdict["company_found"] = True
+                verdict["hits"] += 1
+                chk_log.success(f"🎯 命中！{platform_id} 已收录文章内容")
+            else:
+                chk_log.warning(f"☁️ 未命中：{platform_id} 暂未发现关联信息")
+
+        # 只投递不等待：同一轮的记录会和其他平台的写入合并成一个事务
+        self.writer.submit(self._insert_record, dict(
+            keyword_id=keyword_id,
+            platform=platform_id,
+            question=q_text,
+            answer=res.get("answer"),
+            keyword_found=res.get("keyword_found", False),
+            company_found=res.get("company_found", False),
+            check_time=datetime.now()
+        ))
+
+    @staticmethod
+    def _insert_record(db: Session, fields: Dict[str, Any]):
+        # 每次执行都新建对象，整批回滚后逐条重放也安全
+        db.add(IndexCheckRecord(**fields))
 
     def get_check_records(self, keyword_id: Optional[int] = None, platform: Optional[str] = None, limit: int = 100):
         query = self.db.query(IndexCheckRecord)
@@ -69,10 +69,12 @@ class KeywordService:
         self.db.refresh(new_qv)
         return new_qv
 
-    async def distill(self, company_name: str, industry: str, description: str, count: int = 10) -> Dict[str, Any]:
+    async def distill(self, company_name: str, industry: str, description: str, count: int = 10,
+                      use_cache: bool = True) -> Dict[str, Any]:
         """
         🌟 核心方法：执行关键词蒸馏 (调用 n8n)
         修正了之前的 404 错误，对接标准 webhook 路径
+        use_cache=False 时跳过 n8n 响应缓存，强制重新蒸馏
         """
         logger.info(f"🧪 开始关键词蒸馏: {company_name} - {industry}")
 
@@ -85,7 +87,7 @@ class KeywordService:
             n8n = await get_n8n_service()
 
             # 2. 调用 /webhook/keyword-distill
-            result = await n8n.distill_keywords(input_keywords_list, project_id=None)
+            result = await n8n.distill_keywords(input_keywords_list, project_id=None, use_cache=use_cache)
 
             if result.status == "success":
                 logger.success(f"✅ n8n 响应成功")
@@ -119,15 +121,16 @@ class KeywordService:
             logger.exception(f"🚨 蒸馏服务连接异常: {e}")
             return {"status": "error", "message": str(e)}
 
-    async def generate_questions(self, keyword: str, count: int = 5) -> List[str]:
+    async def generate_questions(self, keyword: str, count: int = 5, use_cache: bool = True) -> List[str]:
         """
         生成问题变体 (调用 n8n)
+        use_cache=False 时跳过 n8n 响应缓存，强制重新生成
         """
         logger.info(f"❓ 正在为 [{keyword}] 生成长尾问题...")
         try:
             n8n = await get_n8n_service()
             # 调用 /webhook/generate-questions
-            result = await n8n.generate_questions(keyword, count)
+            result = await n8n.generate_questions(keyword, count, use_cache=use_cache)
 
             if result.status == "success":
                 data = result.data
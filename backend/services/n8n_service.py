@@ -6,12 +6,21 @@ n8n 服务封装 - 终极加固调试版
 3. 适配多种 n8n 返回结构 (List, Dict, 纯文本)
 """
 
+import hashlib
 import httpx
 import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
 from typing import Any, Literal, Optional, List, Dict
 from loguru import logger
 from pydantic import BaseModel, Field, ConfigDict
 
+from backend.config import DATA_DIR
+from backend.database import run_db
+
 
 # ==================== 配置 ====================
 
@@ -26,6 +35,23 @@ class N8nConfig:
     # 重试配置
     MAX_RETRIES = 1
 
+    # 🌟 响应缓存：相同端点 + 相同请求体直接复用上次结果，省掉一次完整的大模型往返
+    CACHE_ENABLED = os.getenv("N8N_CACHE_ENABLED", "1") != "0"
+    CACHE_PATH = DATA_DIR / "n8n_cache.db"
+    CACHE_MAX_ENTRIES = 2000
+    # 各端点缓存有效期（秒），未列出的端点不缓存
+    CACHE_TTL = {
+        "index-check-analysis": 3600,
+    }
+    # 关键词蒸馏、问题生成每次调用都应拿到新内容（再点一次"生成"要的就是新的一批），
+    # 默认不缓存；N8N_CACHE_GENERATION=1 时才按下面的有效期缓存，接口的 refresh 可强制重新生成
+    GENERATION_CACHE_TTL = {
+        "keyword-distill": 7 * 24 * 3600,
+        "generate-questions": 7 * 24 * 3600,
+    }
+    if os.getenv("N8N_CACHE_GENERATION", "0") == "1":
+        CACHE_TTL = {**CACHE_TTL, **GENERATION_CACHE_TTL}
+
 
 # ==================== 请求模型 ====================
 
@@ -66,6 +92,110 @@ class N8nResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+# ==================== 响应缓存 ====================
+
+def _normalize(value: Any) -> Any:
+    """请求体归一化：字典键排序、字符串去首尾空白，保证语义相同的请求得到同一个键"""
+    if isinstance(value, dict):
+        return {k: _normalize(value[k]) for k in sorted(value)}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+class N8nResponseCache:
+    """
+    n8n 响应的持久化缓存（DATA_DIR 下的独立 SQLite 文件）
+
+    键为 端点 + 归一化请求体 的 SHA-256；只缓存成功的响应。
+    条目过期后不再命中，总数超过上限时按最近命中时间淘汰最旧的条目。
+    """
+
+    def __init__(self, path: Path, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(endpoint: str, payload: Dict[str, Any]) -> str:
+        body = json.dumps(_normalize(payload), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(f"{endpoint}\n{body}".encode("utf-8")).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS n8n_cache ("
+                "key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL, last_hit REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_n8n_cache_last_hit ON n8n_cache (last_hit)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT response FROM n8n_cache WHERE key = ? AND expires_at > ?",
+                               (key, now)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            conn.execute("UPDATE n8n_cache SET last_hit = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self._stats["hits"] += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, endpoint: str, response: Dict[str, Any], ttl: float):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO n8n_cache (key, endpoint, response, created_at, expires_at, last_hit) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint, json.dumps(response, ensure_ascii=False), now, now + ttl, now)
+            )
+            # 先清过期条目，仍超限再按最近命中时间淘汰
+            evicted = conn.execute("DELETE FROM n8n_cache WHERE expires_at <= ?", (now,)).rowcount
+            evicted += conn.execute(
+                "DELETE FROM n8n_cache WHERE key IN ("
+                "SELECT key FROM n8n_cache ORDER BY last_hit DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+            conn.commit()
+            self._stats["stores"] += 1
+            self._stats["evictions"] += evicted
+
+    def record_bypass(self):
+        self._stats["bypassed"] += 1
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM n8n_cache")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """内存计数器，不碰缓存文件（健康检查会频繁调用）"""
+        return dict(self._stats)
+
+    def size(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM n8n_cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
 # ==================== 服务类 ====================
 
 class N8nService:
@@ -79,6 +209,10 @@ class N8nService:
         # 🌟 绑定模块名，用于前端实时日志
         self.log = logger.bind(module="AI中台")
         self._client: Optional[httpx.AsyncClient] = None
+        self.cache: Optional[N8nResponseCache] = (
+            N8nResponseCache(self.config.CACHE_PATH, self.config.CACHE_MAX_ENTRIES)
+            if self.config.CACHE_ENABLED else None
+        )
 
     @property
     def client(self) -> httpx.AsyncClient:
@@ -90,11 +224,54 @@ class N8nService:
         return self._client
 
     async def close(self):
-        """关闭 HTTP 客户端"""
+        """关闭 HTTP 客户端和缓存连接"""
         if self._client and not self._client.is_closed:
             await self._client.aclose()
+        if self.cache:
+            self.cache.close()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {"enabled": True, **self.cache.stats()} if self.cache else {"enabled": False}
 
     async def _call_webhook(
+            self,
+            endpoint: str,
+            payload: Dict[str, Any],
+            timeout: Optional[float] = None,
+            use_cache: bool = True
+    ) -> N8nResponse:
+        """
+        带缓存的统一调用入口
+
+        Args:
+            use_cache: False 时跳过缓存读取（强制重新生成），成功结果仍会写回缓存
+        """
+        ttl = self.config.CACHE_TTL.get(endpoint.strip("/"))
+        if not self.cache or not ttl:
+            return await self._post_webhook(endpoint, payload, timeout)
+
+        key = N8nResponseCache.make_key(endpoint.strip("/"), payload)
+        if use_cache:
+            try:
+                cached = await run_db(self.cache.get, key)
+            except Exception as e:
+                self.log.warning(f"⚠️ n8n 缓存读取失败，直接请求: {e}")
+                cached = None
+            if cached is not None:
+                self.log.info(f"⚡ 命中缓存: {endpoint}")
+                return N8nResponse(**cached)
+        else:
+            self.cache.record_bypass()
+
+        result = await self._post_webhook(endpoint, payload, timeout)
+        if result.status == "success":
+            try:
+                await run_db(self.cache.put, key, endpoint.strip("/"), result.model_dump(), ttl)
+            except Exception as e:
+                self.log.warning(f"⚠️ n8n 缓存写入失败: {e}")
+        return result
+
+    async def _post_webhook(
             self,
             endpoint: str,
             payload: Dict[str, Any],
@@ -160,17 +337,18 @@ class N8nService:
 
     # ==================== 业务方法 ====================
 
-    async def distill_keywords(self, keywords: List[str], project_id: Optional[int] = None) -> N8nResponse:
+    async def distill_keywords(self, keywords: List[str], project_id: Optional[int] = None,
+                               use_cache: bool = True) -> N8nResponse:
         """关键词蒸馏"""
         self.log.info(f"🧹 正在蒸馏提纯关键词...")
         payload = KeywordDistillRequest(keywords=keywords, project_id=project_id).model_dump()
-        return await self._call_webhook("keyword-distill", payload)
+        return await self._call_webhook("keyword-distill", payload, use_cache=use_cache)
 
-    async def generate_questions(self, question: str, count: int = 10) -> N8nResponse:
+    async def generate_questions(self, question: str, count: int = 10, use_cache: bool = True) -> N8nResponse:
         """生成问题变体"""
         self.log.info(f"❓ 正在基于原题扩展变体...")
         payload = GenerateQuestionsRequest(question=question, count=count).model_dump()
-        return await self._call_webhook("generate-questions", payload)
+        return await self._call_webhook("generate-questions", payload, use_cache=use_cache)
 
     async def generate_geo_article(
             self,
@@ -200,7 +378,8 @@ class N8nService:
             doubao_indexed: bool,
             qianwen_indexed: bool,
             deepseek_indexed: bool,
-            history: Optional[List[Dict]] = None
+            history: Optional[List[Dict]] = None,
+            use_cache: bool = True
     ) -> N8nResponse:
         """分析收录结果"""
         self.log.info(f"📊 正在请求 AI 深度分析收录趋势...")
@@ -211,7 +390,7 @@ class N8nService:
             deepseek_indexed=deepseek_indexed,
             history=history or []
         ).model_dump()
-        return await self._call_webhook("index-check-analysis", payload)
+        return await self._call_webhook("index-check-analysis", payload, use_cache=use_cache)
 
 
 # ==================== 单例模式 ====================
@@ -6,10 +6,12 @@
 
 from typing import List, Dict, Any, Optional
 from loguru import logger
+from sqlalchemy import and_, case, func
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 
+from backend.database import run_db
 from backend.database.models import Project, Keyword, IndexCheckRecord
 from backend.config import AI_PLATFORMS
 
@@ -61,27 +63,9 @@ class NotificationService:
         Returns:
             触发的预警列表
         """
-        alerts = []
-
-        # 获取要检查的项目
-        if project_id:
-            projects = [self.db.query(Project).filter(Project.id == project_id).first()]
-        else:
-            projects = self.db.query(Project).filter(Project.status == 1).all()
-
-        projects = [p for p in projects if p]
-
-        for project in projects:
-            # 检查每个关键词
-            keywords = self.db.query(Keyword).filter(
-                Keyword.project_id == project.id,
-                Keyword.status == "active"
-            ).all()
-
-            for keyword in keywords:
-                # 检查各种预警规则
-                keyword_alerts = await self._check_keyword_alerts(keyword, project)
-                alerts.extend(keyword_alerts)
+        # 一次聚合查询拿到所有关键词的 7 天 / 30 天统计，再批量套规则
+        stats = await run_db(self._keyword_stats, project_id)
+        alerts = self._evaluate_rules(stats)
 
         # 发送通知
         for alert in alerts:
@@ -89,90 +73,110 @@ class NotificationService:
 
         return alerts
 
-    async def _check_keyword_alerts(
-        self,
-        keyword: Keyword,
-        project: Project
-    ) -> List[Dict[str, Any]]:
-        """检查单个关键词的预警"""
-        alerts = []
+    def _keyword_stats(self, project_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        按关键词聚合近 7 天 / 30 天的检测统计（单条 GROUP BY 查询）
 
-        # 获取最近的检测记录（最近7天）
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        records = self.db.query(IndexCheckRecord).filter(
-            IndexCheckRecord.keyword_id == keyword.id,
-            IndexCheckRecord.check_time >= seven_days_ago
-        ).all()
-
-        if not records:
-            # 没有检测记录
-            alerts.append({
-                "type": "no_data",
-                "level": "warning",
-                "keyword": keyword.keyword,
-                "project": project.name,
-                "company": project.company_name,
-                "message": f"关键词 '{keyword.keyword}' 最近7天没有检测数据",
-                "timestamp": datetime.now().isoformat()
-            })
-            return alerts
-
-        # 计算命中率
-        total = len(records)
-        keyword_found = sum(1 for r in records if r.keyword_found)
-        company_found = sum(1 for r in records if r.company_found)
-        hit_rate = (keyword_found + company_found) / (total * 2) * 100
-
-        # 检查命中率过低
-        if self.ALERT_RULES["hit_rate_drop"].enabled and hit_rate < self.ALERT_RULES["hit_rate_drop"].threshold:
-            alerts.append({
-                "type": "hit_rate_low",
-                "level": "warning" if hit_rate > 10 else "critical",
-                "keyword": keyword.keyword,
-                "project": project.name,
-                "company": project.company_name,
-                "hit_rate": round(hit_rate, 2),
-                "message": f"关键词 '{keyword.keyword}' 命中率仅为 {hit_rate:.1f}%，低于阈值 {self.ALERT_RULES['hit_rate_drop'].threshold}%",
-                "timestamp": datetime.now().isoformat()
-            })
+        Returns:
+            每个活跃关键词一行：关键词、项目信息，以及 total/keyword_found/company_found × 7d/30d
+        """
+        now = datetime.now()
+        seven_days_ago = now - timedelta(days=7)
+        thirty_days_ago = now - timedelta(days=30)
+        in_7d = IndexCheckRecord.check_time >= seven_days_ago
+
+        def count_if(*conditions):
+            return func.coalesce(func.sum(case((and_(*conditions), 1), else_=0)), 0)
+
+        query = self.db.query(
+            Keyword.id,
+            Keyword.keyword,
+            Project.name.label("project"),
+            Project.company_name.label("company"),
+            count_if(in_7d).label("total_7d"),
+            count_if(in_7d, IndexCheckRecord.keyword_found.is_(True)).label("keyword_found_7d"),
+            count_if(in_7d, IndexCheckRecord.company_found.is_(True)).label("company_found_7d"),
+            func.count(IndexCheckRecord.id).label("total_30d"),
+            count_if(IndexCheckRecord.keyword_found.is_(True)).label("keyword_found_30d"),
+            count_if(IndexCheckRecord.company_found.is_(True)).label("company_found_30d"),
+        ).join(
+            Project, Project.id == Keyword.project_id
+        ).outerjoin(
+            IndexCheckRecord, and_(
+                IndexCheckRecord.keyword_id == Keyword.id,
+                IndexCheckRecord.check_time >= thirty_days_ago
+            )
+        ).filter(Keyword.status == "active")
 
-        # 检查零收录
-        if self.ALERT_RULES["no_index"].enabled and hit_rate == 0:
-            alerts.append({
-                "type": "no_index",
-                "level": "critical",
-                "keyword": keyword.keyword,
-                "project": project.name,
-                "company": project.company_name,
-                "message": f"关键词 '{keyword.keyword}' 在所有AI平台零收录！",
-                "timestamp": datetime.now().isoformat()
-            })
+        if project_id:
+            query = query.filter(Project.id == project_id)
+        else:
+            query = query.filter(Project.status == 1)
 
-        # 检查持续低迷
-        if self.ALERT_RULES["consistently_low"].enabled:
-            # 获取更长时间的数据（30天）
-            thirty_days_ago = datetime.now() - timedelta(days=30)
-            long_term_records = self.db.query(IndexCheckRecord).filter(
-                IndexCheckRecord.keyword_id == keyword.id,
-                IndexCheckRecord.check_time >= thirty_days_ago
-            ).all()
+        return [row._asdict() for row in query.group_by(Keyword.id).all()]
 
-            if long_term_records:
-                lt_total = len(long_term_records)
-                lt_keyword_found = sum(1 for r in long_term_records if r.keyword_found)
-                lt_company_found = sum(1 for r in long_term_records if r.company_found)
-                lt_hit_rate = (lt_keyword_found + lt_company_found) / (lt_total * 2) * 100
+    @staticmethod
+    def _hit_rate(total: int, keyword_found: int, company_found: int) -> float:
+        return (keyword_found + company_found) / (total * 2) * 100 if total else 0.0
 
-                if lt_hit_rate < self.ALERT_RULES["consistently_low"].threshold:
+    def _evaluate_rules(self, stats: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """对聚合统计批量执行预警规则"""
+        alerts = []
+        timestamp = datetime.now().isoformat()
+        hit_rule = self.ALERT_RULES["hit_rate_drop"]
+        zero_rule = self.ALERT_RULES["no_index"]
+        low_rule = self.ALERT_RULES["consistently_low"]
+
+        for row in stats:
+            base = {
+                "keyword": row["keyword"],
+                "project": row["project"],
+                "company": row["company"],
+                "timestamp": timestamp,
+            }
+
+            if not row["total_7d"]:
+                # 没有检测记录
+                alerts.append({
+                    **base,
+                    "type": "no_data",
+                    "level": "warning",
+                    "message": f"关键词 '{row['keyword']}' 最近7天没有检测数据",
+                })
+                continue
+
+            # 计算命中率
+            hit_rate = self._hit_rate(row["total_7d"], row["keyword_found_7d"], row["company_found_7d"])
+
+            # 检查命中率过低
+            if hit_rule.enabled and hit_rate < hit_rule.threshold:
+                alerts.append({
+                    **base,
+                    "type": "hit_rate_low",
+                    "level": "warning" if hit_rate > 10 else "critical",
+                    "hit_rate": round(hit_rate, 2),
+                    "message": f"关键词 '{row['keyword']}' 命中率仅为 {hit_rate:.1f}%，低于阈值 {hit_rule.threshold}%",
+                })
+
+            # 检查零收录
+            if zero_rule.enabled and hit_rate == 0:
+                alerts.append({
+                    **base,
+                    "type": "no_index",
+                    "level": "critical",
+                    "message": f"关键词 '{row['keyword']}' 在所有AI平台零收录！",
+                })
+
+            # 检查持续低迷（30天）
+            if low_rule.enabled and row["total_30d"]:
+                lt_hit_rate = self._hit_rate(row["total_30d"], row["keyword_found_30d"], row["company_found_30d"])
+                if lt_hit_rate < low_rule.threshold:
                     alerts.append({
+                        **base,
                         "type": "consistently_low",
                         "level": "warning",
-                        "keyword": keyword.keyword,
-                        "project": project.name,
-                        "company": project.company_name,
                         "hit_rate_30d": round(lt_hit_rate, 2),
-                        "message": f"关键词 '{keyword.keyword}' 30天命中率持续低迷（{lt_hit_rate:.1f}%）",
-                        "timestamp": datetime.now().isoformat()
+                        "message": f"关键词 '{row['keyword']}' 30天命中率持续低迷（{lt_hit_rate:.1f}%）",
                     })
 
         return alerts
@@ -198,16 +202,10 @@ class NotificationService:
         Returns:
             预警摘要数据
         """
-        # 获取项目
-        if project_id:
-            projects = [self.db.query(Project).filter(Project.id == project_id).first()]
-        else:
-            projects = self.db.query(Project).filter(Project.status == 1).all()
-
-        projects = [p for p in projects if p]
+        stats = self._keyword_stats(project_id)
 
         summary = {
-            "total_keywords": 0,
+            "total_keywords": len(stats),
             "alert_keywords": 0,
             "critical_count": 0,
             "warning_count": 0,
@@ -215,34 +213,16 @@ class NotificationService:
             "recent_alerts": []
         }
 
-        for project in projects:
-            keywords = self.db.query(Keyword).filter(
-                Keyword.project_id == project.id,
-                Keyword.status == "active"
-            ).all()
-
-            summary["total_keywords"] += len(keywords)
-
-            for keyword in keywords:
-                # 简单检查当前状态
-                seven_days_ago = datetime.now() - timedelta(days=7)
-                records = self.db.query(IndexCheckRecord).filter(
-                    IndexCheckRecord.keyword_id == keyword.id,
-                    IndexCheckRecord.check_time >= seven_days_ago
-                ).all()
-
-                if records:
-                    total = len(records)
-                    keyword_found = sum(1 for r in records if r.keyword_found)
-                    company_found = sum(1 for r in records if r.company_found)
-                    hit_rate = (keyword_found + company_found) / (total * 2) * 100
-
-                    if hit_rate < 30:
-                        summary["alert_keywords"] += 1
-                        if hit_rate < 10:
-                            summary["critical_count"] += 1
-                        else:
-                            summary["warning_count"] += 1
+        for row in stats:
+            if not row["total_7d"]:
+                continue
+            hit_rate = self._hit_rate(row["total_7d"], row["keyword_found_7d"], row["company_found_7d"])
+            if hit_rate < 30:
+                summary["alert_keywords"] += 1
+                if hit_rate < 10:
+                    summary["critical_count"] += 1
+                else:
+                    summary["warning_count"] += 1
 
         return summary
 
@@ -5,10 +5,55 @@ AI平台检测器基类
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from playwright.async_api import Page, BrowserContext
 from loguru import logger
 import asyncio
+import time
+
+from ..selector_resolver import selector_resolver
+
+
+# 在页面内监听 DOM 变化：回答文本出现（且不是旧回答/提问本身）、停止按钮消失，且 stableMs 内无变化即判定生成结束
+_WAIT_ANSWER_JS = """
+([answerSelectors, stopSelectors, ignored, stableMs, timeoutMs]) => new Promise(resolve => {
+    const pick = () => {
+        for (const sel of answerSelectors) {
+            const els = document.querySelectorAll(sel);
+            if (!els.length) continue;
+            const text = (els[els.length - 1].innerText || '').trim();
+            if (text) return text;
+        }
+        return '';
+    };
+    const generating = () => stopSelectors.some(sel => {
+        const el = document.querySelector(sel);
+        return el && el.offsetParent !== null;
+    });
+    let timer = null;
+    let finished = false;
+    const finish = (done) => {
+        if (finished) return;
+        finished = true;
+        observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(deadline);
+        resolve({done, text: pick()});
+    };
+    const arm = () => {
+        clearTimeout(timer);
+        timer = setTimeout(() => {
+            const text = pick();
+            if (text && !ignored.includes(text) && !generating()) finish(true);
+            else arm();
+        }, stableMs);
+    };
+    const observer = new MutationObserver(arm);
+    observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+    const deadline = setTimeout(() => finish(false), timeoutMs);
+    arm();
+})
+"""
 
 
 class AIPlatformChecker(ABC):
@@ -32,6 +77,34 @@ class AIPlatformChecker(ABC):
         self.url = config.get("url", "")
         self.color = config.get("color", "#333333")
 
+    # 回答区域候选选择器（按优先级），子类通过 SELECTORS 覆盖前两项
+    ANSWER_FALLBACK_SELECTORS = ["[class*='content']", "[class*='bubble']"]
+    # 输入框兜底选择器，与 SELECTORS["input_box"] 一起竞速
+    INPUT_FALLBACK_SELECTORS = ["textarea"]
+    # 生成中才会出现的“停止生成”按钮，平台专属的写在 SELECTORS["stop_button"]；
+    # 不用 [class*='stop'] 这类宽泛匹配，它会命中 desktop / stopwatch 等常驻元素，导致永远判定为生成中
+    STOP_SELECTORS = ["[aria-label*='停止']", "[aria-label='Stop generating']"]
+    # 回答文本保持不变多久视为生成结束（毫秒）
+    ANSWER_STABLE_MS = 1500
+    # 等待回答的最长时间（毫秒）
+    ANSWER_TIMEOUT = 60000
+
+    @property
+    def answer_selectors(self) -> List[str]:
+        selectors = getattr(self, "SELECTORS", {})
+        primary = [selectors[k] for k in ("answer_area", "chat_message") if selectors.get(k)]
+        return primary + self.ANSWER_FALLBACK_SELECTORS
+
+    @property
+    def input_selectors(self) -> List[str]:
+        selectors = getattr(self, "SELECTORS", {})
+        return ([selectors["input_box"]] if selectors.get("input_box") else []) + self.INPUT_FALLBACK_SELECTORS
+
+    @property
+    def stop_selectors(self) -> List[str]:
+        selectors = getattr(self, "SELECTORS", {})
+        return ([selectors["stop_button"]] if selectors.get("stop_button") else []) + self.STOP_SELECTORS
+
     @abstractmethod
     async def check(
         self,
@@ -77,6 +150,11 @@ class AIPlatformChecker(ABC):
             logger.error(f"导航失败: {self.name}, {e}")
             return False
 
+    async def resolve_selector(self, page: Page, name: str, candidates: List[str],
+                               timeout: int = 15000) -> Optional[str]:
+        """同时等待多个候选选择器，返回命中的那个（上次命中的优先，见 selector_resolver）"""
+        return await selector_resolver.resolve(page, self.platform_id, name, candidates, timeout)
+
     async def wait_for_selector(
         self,
         page: Page,
@@ -95,6 +173,63 @@ class AIPlatformChecker(ABC):
             logger.warning(f"等待选择器超时: {selector}")
             return False
 
+    async def extract_answer(self, page: Page) -> str:
+        """读取最新一条回答的文本，取不到时返回空字符串"""
+        for selector in self.answer_selectors:
+            try:
+                elements = await page.query_selector_all(selector)
+                # 获取最后一个元素（最新回答）
+                if elements:
+                    text = await elements[-1].inner_text()
+                    if text.strip():
+                        return text
+            except Exception:
+                continue
+        return ""
+
+    async def wait_for_answer_complete(
+        self,
+        page: Page,
+        baseline: str = "",
+        question: str = "",
+        timeout: Optional[int] = None,
+        stable_ms: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        等待 AI 回答生成结束
+
+        页面内的 MutationObserver 在以下条件同时满足时立即返回：
+        回答文本非空且不同于 baseline/提问本身、停止按钮已消失、stable_ms 内 DOM 无变化。
+
+        Args:
+            baseline: 提问前最后一条回答的文本（extract_answer 的结果），用于排除旧回答
+            question: 本次提问，回显的用户消息不算回答
+            timeout: 最长等待（毫秒），默认 ANSWER_TIMEOUT
+            stable_ms: 文本稳定时长（毫秒），默认 ANSWER_STABLE_MS
+
+        Returns:
+            {"done": 是否判定生成结束, "text": 回答文本, "elapsed": 耗时秒数}
+        """
+        timeout = timeout or self.ANSWER_TIMEOUT
+        stable_ms = stable_ms or self.ANSWER_STABLE_MS
+        started = time.monotonic()
+        try:
+            result = await page.evaluate(
+                _WAIT_ANSWER_JS,
+                [self.answer_selectors, self.stop_selectors, [baseline.strip(), question.strip()], stable_ms, timeout]
+            )
+        except Exception as e:
+            # 页面跳转等导致脚本上下文销毁时，退回直接读取
+            logger.warning(f"{self.name} 回答监听中断: {e}")
+            result = {"done": False, "text": await self.extract_answer(page)}
+
+        elapsed = round(time.monotonic() - started, 2)
+        if result.get("done"):
+            logger.info(f"{self.name} 回答生成完成，耗时 {elapsed}s")
+        else:
+            logger.warning(f"{self.name} 等待回答超时（{elapsed}s），使用当前已生成内容")
+        return {"done": bool(result.get("done")), "text": result.get("text") or "", "elapsed": elapsed}
+
     def check_keywords_in_text(
         self,
         text: str,
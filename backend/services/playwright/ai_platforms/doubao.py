@@ -25,6 +25,8 @@ class DoubaoChecker(AIPlatformChecker):
         "submit_button": "button[type='submit']",
         "answer_area": "[class*='answer']",
         "chat_message": "[class*='message']",
+        # 生成中才出现的“停止生成”按钮
+        "stop_button": "[data-testid='chat_input_local_break_button']",
     }
 
     async def check(
@@ -48,51 +50,32 @@ class DoubaoChecker(AIPlatformChecker):
                     "error_msg": "导航失败"
                 }
 
-            # 2. 等待输入框加载
-            input_selector = self.SELECTORS["input_box"]
-            if not await self.wait_for_selector(page, input_selector, 10000):
-                # 尝试其他选择器
-                input_selector = "textarea"
-                if not await self.wait_for_selector(page, input_selector, 5000):
-                    return {
-                        "success": False,
-                        "answer": None,
-                        "keyword_found": False,
-                        "company_found": False,
-                        "error_msg": "输入框未找到"
-                    }
+            # 2. 等待输入框加载（所有候选同时等待）
+            input_selector = await self.resolve_selector(page, "input_box", self.input_selectors)
+            if not input_selector:
+                return {
+                    "success": False,
+                    "answer": None,
+                    "keyword_found": False,
+                    "company_found": False,
+                    "error_msg": "输入框未找到"
+                }
 
             # 3. 输入问题
             await page.fill(input_selector, question)
             await asyncio.sleep(0.5)
             logger.info(f"豆包已输入问题: {question[:30]}...")
 
-            # 4. 提交（按Enter键）
+            # 4. 提交（按Enter键），记下提问前的最后一条回答用于区分新旧
+            baseline = await self.extract_answer(page)
             await page.keyboard.press("Enter")
             logger.info("豆包已提交问题")
 
-            # 5. 等待回答生成（豆包生成需要时间）
-            await asyncio.sleep(8)  # 等待AI生成回答
+            # 5. 等待回答生成结束（文本稳定且停止按钮消失即返回）
+            result = await self.wait_for_answer_complete(page, baseline, question)
 
             # 6. 获取回答内容
-            answer_selectors = [
-                self.SELECTORS["answer_area"],
-                self.SELECTORS["chat_message"],
-                "[class*='content']",
-                "[class*='bubble']",
-            ]
-
-            answer_text = ""
-            for selector in answer_selectors:
-                try:
-                    elements = await page.query_selector_all(selector)
-                    # 获取最后一个元素（最新回答）
-                    if elements:
-                        answer_text = await elements[-1].inner_text()
-                        if answer_text.strip():
-                            break
-                except Exception:
-                    continue
+            answer_text = result["text"] or await self.extract_answer(page)
 
             if not answer_text:
                 # 尝试获取整个页面的文本
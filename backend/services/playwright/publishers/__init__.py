@@ -5,6 +5,8 @@ Playwright发布适配器模块
 """
 
 from .base import BasePublisher, PublisherRegistry, registry, get_publisher, list_publishers
+from .content_injector import inject_content, markdown_to_html
+from .publish_response import parse_publish_response, submit_and_capture
 from .zhihu import ZhihuPublisher
 from .baijiahao import BaijiahaoPublisher
 from .sohu import SohuPublisher
@@ -40,6 +42,10 @@ __all__ = [
     "get_publisher",
     "list_publishers",
     "register_publishers",
+    "inject_content",
+    "markdown_to_html",
+    "parse_publish_response",
+    "submit_and_capture",
     "ZhihuPublisher",
     "BaijiahaoPublisher",
     "SohuPublisher",
@@ -4,13 +4,52 @@
 重写了！直接访问编辑器URL！
 """
 
-import asyncio
 from typing import Dict, Any
 from playwright.async_api import Page
 from loguru import logger
 
 from .base import BasePublisher
 
+EDITOR_IFRAME = "iframe"
+NEWBIE_GUIDE = "text=图文编辑能力升级"
+
+# 候选选择器，由 resolve_selector 同时等待并记住命中的那个
+TITLE_SELECTORS = [
+    "div[placeholder*='请输入标题']",
+    "input[placeholder*='请输入标题']",
+    "textarea[placeholder*='请输入标题']",
+    "[contenteditable='true']:has-text('请输入标题')",
+]
+PUBLISH_BUTTON_SELECTORS = [
+    "button:has-text('发布')",
+    "button[class*='publish']",
+    "button[class*='submit']",
+]
+
+PUBLISH_BUTTON_ENABLED_JS = """() => Array.from(document.querySelectorAll('button'))
+    .some(btn => (btn.textContent?.trim() || '') === '发布' && !btn.disabled)"""
+
+PUBLISH_SIGNAL_JS = """() => {
+    // 检查URL变化
+    if (window.location.href.includes('success') || window.location.href.includes('publish')) {
+        return 'url_changed';
+    }
+
+    // 检查成功提示文本
+    const bodyText = document.body?.innerText || '';
+    if (bodyText.includes('发布成功') || bodyText.includes('提交成功')) {
+        return 'success_message';
+    }
+
+    // 检查是否有成功提示元素
+    const successEl = document.querySelector('[class*="success"]');
+    if (successEl && successEl.offsetParent !== null) {
+        return 'success_element';
+    }
+
+    return 'unknown';
+}"""
+
 
 class BaijiahaoPublisher(BasePublisher):
     """
@@ -25,67 +64,76 @@ class BaijiahaoPublisher(BasePublisher):
     4. 有新手教程弹窗需要关闭
     """
 
+    # 正文是 UEditor（iframe），优先走编辑器实例的 setContent
+    inject_strategies = ("editor_api", "insert_html", "paste", "type")
+
     async def publish(self, page: Page, article: Any, account: Any) -> Dict[str, Any]:
         """
         发布文章到百家号 - 重写的流程！
         """
+        timer = self.timer()
         try:
             logger.info(f"[百家号] 开始发布文章: {article.title}")
 
             # ========== 步骤1: 直接进入图文编辑页面 ==========
-            edit_url = "https://baijiahao.baidu.com/builder/rc/edit?type=news"
-            logger.info(f"[百家号] 导航到编辑页面: {edit_url}")
-            try:
-                await page.goto(edit_url, wait_until="domcontentloaded")
-                logger.info(f"[百家号] 当前页面: {page.url}")
-            except Exception as e:
-                logger.error(f"[百家号] 导航编辑页面失败: {e}")
-                return {"success": False, "platform_url": None, "error_msg": f"导航编辑页面失败: {e}"}
+            async with timer.step("打开编辑器"):
+                edit_url = "https://baijiahao.baidu.com/builder/rc/edit?type=news"
+                logger.info(f"[百家号] 导航到编辑页面: {edit_url}")
+                try:
+                    await page.goto(edit_url, wait_until="domcontentloaded")
+                    logger.info(f"[百家号] 当前页面: {page.url}")
+                except Exception as e:
+                    logger.error(f"[百家号] 导航编辑页面失败: {e}")
+                    return {"success": False, "platform_url": None, "error_msg": f"导航编辑页面失败: {e}"}
 
-            # 检查是否跳转到登录页
-            if "login" in page.url.lower():
-                return {"success": False, "platform_url": None, "error_msg": "需要重新登录，请检查账号授权状态"}
+                # 检查是否跳转到登录页
+                if "login" in page.url.lower():
+                    return {"success": False, "platform_url": None, "error_msg": "需要重新登录，请检查账号授权状态"}
 
-            # 等待页面加载
-            logger.info("[百家号] 等待编辑页面加载...")
-            await asyncio.sleep(3)
+                # 等待页面加载：正文编辑器的 iframe 出现即可
+                logger.info("[百家号] 等待编辑页面加载...")
+                await self.wait_for_load(page, "load", 15000)
+                await self.wait_visible(page, EDITOR_IFRAME, 15000)
 
             # ========== 步骤2: 关闭弹窗和新手教程 ==========
-            logger.info("[百家号] 开始关闭弹窗和新手教程...")
-            await self._close_popups(page)
+            async with timer.step("关闭弹窗"):
+                logger.info("[百家号] 开始关闭弹窗和新手教程...")
+                await self._close_popups(page)
 
             # ========== 步骤3: 填充标题 ==========
-            logger.info("[百家号] 开始填充标题...")
-            title_result = await self._fill_title(page, article.title)
-            if not title_result:
-                logger.warning("[百家号] 标题填充可能失败，继续尝试发布")
-            else:
-                await asyncio.sleep(0.5)
+            async with timer.step("填充标题"):
+                logger.info("[百家号] 开始填充标题...")
+                title_result = await self._fill_title(page, article.title)
+                if not title_result:
+                    logger.warning("[百家号] 标题填充可能失败，继续尝试发布")
 
             # ========== 步骤4: 填充正文 ==========
-            logger.info("[百家号] 开始填充正文...")
-            content_result = await self._fill_content(page, article.content)
-            if not content_result:
-                return {"success": False, "platform_url": None, "error_msg": "正文填充失败"}
-
-            # 等待内容加载
-            await asyncio.sleep(2)
+            async with timer.step("填充正文"):
+                logger.info("[百家号] 开始填充正文...")
+                content_result = await self._fill_content(page, article.content)
+                if not content_result:
+                    return {"success": False, "platform_url": None, "error_msg": "正文填充失败"}
 
             # ========== 步骤5: 点击发布按钮 ==========
-            logger.info("[百家号] 点击发布按钮...")
-            publish_result = await self._click_publish(page)
-            if not publish_result:
-                return {"success": False, "platform_url": None, "error_msg": "发布按钮未找到或点击失败"}
-
-            # ========== 步骤6: 等待发布结果 ==========
-            logger.info("[百家号] 等待发布结果...")
-            result = await self._wait_for_publish_result(page)
+            async with timer.step("提交发布"):
+                logger.info("[百家号] 点击发布按钮...")
+                submitted, outcome = await self.submit_and_capture(page, lambda: self._click_publish(page))
+                if not submitted:
+                    return {"success": False, "platform_url": None, "error_msg": "发布按钮未找到或点击失败"}
+
+            # ========== 步骤6: 等待发布结果（优先采用发布接口的响应） ==========
+            async with timer.step("等待结果"):
+                logger.info("[百家号] 等待发布结果...")
+                result = await self.settle_publish_result(
+                    page, outcome, lambda: self._wait_for_publish_result(page))
 
             return result
 
         except Exception as e:
             logger.error(f"[百家号] 发布异常: {e}")
             return {"success": False, "platform_url": None, "error_msg": str(e)}
+        finally:
+            logger.info(timer.summary())
 
     async def _close_popups(self, page: Page):
         """
@@ -101,8 +149,8 @@ class BaijiahaoPublisher(BasePublisher):
         try:
             logger.info("[百家号] 开始关闭弹窗...")
 
-            # 等待页面完全加载
-            await asyncio.sleep(2)
+            # 新手教程在编辑器初始化后才弹出，出现即处理，不出现最多等 2 秒
+            await self.wait_visible(page, NEWBIE_GUIDE, 2000)
 
             # ============ 核心方法：精确点击新手教程的×按钮 ============
             closed = await page.evaluate("""() => {
@@ -130,7 +178,7 @@ class BaijiahaoPublisher(BasePublisher):
 
             if closed.get('success'):
                 logger.info(f"[百家号] 成功关闭新手教程弹窗: {closed.get('method')}")
-                await asyncio.sleep(1)
+                await self.wait_hidden(page, NEWBIE_GUIDE, 2000)
                 return
 
             logger.info(f"[百家号] 未找到新手教程弹窗: {closed.get('reason')}")
@@ -168,7 +216,6 @@ class BaijiahaoPublisher(BasePublisher):
                             is_visible = await element.is_visible()
                             if is_visible:
                                 await element.click(timeout=3000)
-                                await asyncio.sleep(0.3)
                                 closed_count += 1
                                 logger.info(f"[百家号] 已点击: {selector}")
                         except Exception:
@@ -183,12 +230,11 @@ class BaijiahaoPublisher(BasePublisher):
             for _ in range(3):
                 try:
                     await page.keyboard.press("Escape")
-                    await asyncio.sleep(0.3)
                 except:
                     pass
 
-            # 最后再等一下，让页面响应
-            await asyncio.sleep(1)
+            # 遮罩退出后再继续
+            await self.wait_hidden(page, "[class*='mask'], [class*='Mask']", 2000)
 
         except Exception as e:
             logger.debug(f"[百家号] 关闭弹窗异常: {e}")
@@ -202,8 +248,6 @@ class BaijiahaoPublisher(BasePublisher):
         try:
             logger.info(f"[百家号] 尝试填充标题: {title}")
 
-            await asyncio.sleep(1)
-
             # 方法1: JavaScript直接填充（因为标题可能是contenteditable的div）
             result = await page.evaluate(f"""(title) => {{
                 // 查找包含"请输入标题"placeholder的元素
@@ -240,34 +284,18 @@ class BaijiahaoPublisher(BasePublisher):
                 return True
 
             # 方法2: 尝试各种选择器
-            selectors = [
-                "div[placeholder*='请输入标题']",
-                "input[placeholder*='请输入标题']",
-                "textarea[placeholder*='请输入标题']",
-                "[contenteditable='true']:has-text('请输入标题')",
-            ]
+            selector = await self.resolve_selector(page, "title", TITLE_SELECTORS, 3000)
+            if selector:
+                # 点击激活
+                element = page.locator(selector).locator("visible=true").first
+                await element.click()
 
-            for selector in selectors:
-                try:
-                    element = await page.query_selector(selector)
-                    if element:
-                        is_visible = await element.is_visible()
-                        if is_visible:
-                            # 点击激活
-                            await element.click()
-                            await asyncio.sleep(0.3)
-
-                            # 清空并填充
-                            await page.fill(selector, "")
-                            await asyncio.sleep(0.2)
-                            await page.fill(selector, title)
-                            await asyncio.sleep(0.5)
-
-                            logger.info(f"[百家号] 标题填充成功")
-                            return True
-                except Exception as e:
-                    logger.debug(f"[百家号] 选择器 {selector} 失败: {e}")
-                    continue
+                # 清空并填充
+                await element.fill("")
+                await element.fill(title)
+
+                logger.info(f"[百家号] 标题填充成功")
+                return True
 
             logger.warning("[百家号] 所有标题填充方法都失败")
             return False
@@ -280,105 +308,37 @@ class BaijiahaoPublisher(BasePublisher):
         """
         填充正文
 
-        根据实际页面重写！正文在iframe里！
+        根据实际页面重写！正文在iframe里！预渲染成 HTML 后一次写入，不再逐字输入
         """
         try:
             logger.info(f"[百家号] 开始填充正文，长度: {len(content)}")
 
-            await asyncio.sleep(1)
-
-            # 方法1: 尝试在iframe中填充
+            # 方法1: 在iframe中填充
             try:
-                # 查找iframe
-                iframe_element = await page.query_selector("iframe")
-                if iframe_element:
+                iframe_element = await page.wait_for_selector("iframe", timeout=5000)
+                iframe = await iframe_element.content_frame() if iframe_element else None
+                if iframe:
                     logger.info("[百家号] 找到iframe，切换到iframe内容...")
-
-                    # 获取iframe内容
-                    iframe = await iframe_element.content_frame()
-                    if iframe:
-                        # 在iframe中查找可编辑区域
-                        await asyncio.sleep(1)
-
-                        # 尝试在iframe中查找编辑器
-                        editable_selectors = [
-                            "[contenteditable='true']",
-                            "body",
-                            ".editor-body",
-                        ]
-
-                        for selector in editable_selectors:
-                            try:
-                                editor = await iframe.query_selector(selector)
-                                if editor:
-                                    is_visible = await editor.is_visible()
-                                    if is_visible:
-                                        # 点击激活
-                                        await editor.click()
-                                        await asyncio.sleep(0.5)
-
-                                        # 清空
-                                        await iframe.keyboard.press("Control+A")
-                                        await asyncio.sleep(0.2)
-
-                                        # 分段输入
-                                        chunk_size = 500
-                                        for i in range(0, len(content), chunk_size):
-                                            chunk = content[i:i+chunk_size]
-                                            await iframe.keyboard.type(chunk)
-                                            await asyncio.sleep(0.1)
-
-                                        logger.info(f"[百家号] iframe正文填充成功，长度: {len(content)}")
-                                        return True
-                            except Exception as e:
-                                logger.debug(f"[百家号] iframe选择器 {selector} 失败: {e}")
-                                continue
+                    for selector in ("[contenteditable='true']", "body", ".editor-body"):
+                        if await iframe.query_selector(selector) is None:
+                            continue
+                        if await self.inject_content(iframe, selector, content):
+                            logger.info(f"[百家号] iframe正文填充成功，长度: {len(content)}")
+                            return True
             except Exception as e:
                 logger.debug(f"[百家号] iframe填充失败: {e}")
 
             # 方法2: 尝试直接在主页面查找contenteditable
             logger.info("[百家号] 尝试直接在主页面查找编辑器...")
-
-            selectors = [
-                "[contenteditable='true']",
-                "div[role='textbox']",
-                "[class*='editor']",
-            ]
-
-            for selector in selectors:
+            for selector in ("[contenteditable='true']", "div[role='textbox']"):
                 try:
-                    elements = await page.query_selector_all(selector)
-                    for element in elements:
-                        try:
-                            is_visible = await element.is_visible()
-                            if not is_visible:
-                                continue
-
-                            # 点击激活
-                            await element.click()
-                            await asyncio.sleep(0.5)
-
-                            # 清空
-                            await page.keyboard.press("Control+A")
-                            await asyncio.sleep(0.2)
-
-                            # 分段输入
-                            chunk_size = 500
-                            for i in range(0, len(content), chunk_size):
-                                chunk = content[i:i+chunk_size]
-                                await page.keyboard.type(chunk)
-                                await asyncio.sleep(0.1)
-
-                            logger.info(f"[百家号] 主页面正文填充成功，长度: {len(content)}")
-                            return True
-
-                        except Exception as e:
-                            logger.debug(f"[百家号] 元素填充失败: {e}")
-                            continue
-
+                    if await page.query_selector(selector) is None:
+                        continue
+                    if await self.inject_content(page, selector, content):
+                        logger.info(f"[百家号] 主页面正文填充成功，长度: {len(content)}")
+                        return True
                 except Exception as e:
                     logger.debug(f"[百家号] 选择器 {selector} 失败: {e}")
-                    continue
 
             logger.warning("[百家号] 所有正文填充方法都失败")
             return False
@@ -396,7 +356,11 @@ class BaijiahaoPublisher(BasePublisher):
         try:
             logger.info("[百家号] 开始查找发布按钮")
 
-            await asyncio.sleep(1)
+            # 正文写入后发布按钮会从禁用变为可用，最多等 5 秒，超时再走下面的强制启用
+            try:
+                await page.wait_for_function(PUBLISH_BUTTON_ENABLED_JS, timeout=5000)
+            except Exception:
+                pass
 
             # 先检查发布按钮是否可用
             button_state = await page.evaluate("""() => {
@@ -435,28 +399,16 @@ class BaijiahaoPublisher(BasePublisher):
                     }
                     return false;
                 }""")
-                await asyncio.sleep(0.5)
 
             # 点击发布按钮
-            selectors = [
-                "button:has-text('发布')",
-                "button[class*='publish']",
-                "button[class*='submit']",
-            ]
-
-            for selector in selectors:
+            selector = await self.resolve_selector(page, "publish_button", PUBLISH_BUTTON_SELECTORS, 3000)
+            if selector:
                 try:
-                    element = await page.query_selector(selector)
-                    if element:
-                        is_visible = await element.is_visible()
-                        if is_visible:
-                            await element.click()
-                            await asyncio.sleep(0.5)
-                            logger.info("[百家号] 发布按钮已点击")
-                            return True
+                    await page.locator(selector).locator("visible=true").first.click()
+                    logger.info("[百家号] 发布按钮已点击")
+                    return True
                 except Exception as e:
-                    logger.debug(f"[百家号] 选择器 {selector} 失败: {e}")
-                    continue
+                    logger.debug(f"[百家号] 选择器 {selector} 点击失败: {e}")
 
             # JavaScript方式点击
             result = await page.evaluate("""() => {
@@ -491,34 +443,18 @@ class BaijiahaoPublisher(BasePublisher):
         try:
             logger.info("[百家号] 等待发布结果...")
 
-            # 等待页面响应
-            await asyncio.sleep(5)
+            # 等到出现成功迹象（跳转 / 成功提示）再判断，最多 10 秒
+            async def has_signal() -> bool:
+                return await page.evaluate(PUBLISH_SIGNAL_JS) != 'unknown'
+
+            await self.wait_until(has_signal, timeout=10000, interval=300)
 
             current_url = page.url
             logger.info(f"[百家号] 当前URL: {current_url}")
 
             # 检查是否有成功提示
             try:
-                success_indicators = await page.evaluate("""() => {
-                    // 检查URL变化
-                    if (window.location.href.includes('success') || window.location.href.includes('publish')) {
-                        return 'url_changed';
-                    }
-
-                    // 检查成功提示文本
-                    const bodyText = document.body?.innerText || '';
-                    if (bodyText.includes('发布成功') || bodyText.includes('提交成功')) {
-                        return 'success_message';
-                    }
-
-                    // 检查是否有成功提示元素
-                    const successEl = document.querySelector('[class*="success"]');
-                    if (successEl && successEl.offsetParent !== null) {
-                        return 'success_element';
-                    }
-
-                    return 'unknown';
-                }""")
+                success_indicators = await page.evaluate(PUBLISH_SIGNAL_JS)
 
                 logger.info(f"[百家号] 发布状态检测: {success_indicators}")
 
@@ -4,11 +4,51 @@ Playwright发布适配器
 用适配器模式实现各平台发布，开闭原则！
 """
 
+import asyncio
+import re
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from playwright.async_api import Page, BrowserContext
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Pattern, Sequence, Tuple, Union
+from playwright.async_api import Page, BrowserContext, Frame
 from loguru import logger
 
+from .content_injector import DEFAULT_STRATEGIES, inject_content
+from .publish_response import submit_and_capture
+from ..selector_resolver import selector_resolver
+
+
+class StepTimer:
+    """
+    单次发布的分步计时
+    用法：
+        timer = self.timer()
+        async with timer.step("填充正文"):
+            ...
+        logger.info(timer.summary())
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.steps: List[Tuple[str, float]] = []
+        self._started = time.perf_counter()
+
+    @asynccontextmanager
+    async def step(self, label: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((label, time.perf_counter() - start))
+
+    def as_dict(self) -> Dict[str, float]:
+        return {label: round(seconds, 2) for label, seconds in self.steps}
+
+    def summary(self) -> str:
+        total = time.perf_counter() - self._started
+        parts = " | ".join(f"{label} {seconds:.1f}s" for label, seconds in self.steps)
+        return f"⏱️ [{self.name}] {parts} | 总计 {total:.1f}s"
+
 
 class BasePublisher(ABC):
     """
@@ -16,6 +56,9 @@ class BasePublisher(ABC):
     注意：所有平台适配器都要继承这个类！
     """
 
+    # 正文注入策略，按顺序尝试；各平台按自己的编辑器覆盖
+    inject_strategies: Sequence[str] = DEFAULT_STRATEGIES
+
     def __init__(self, platform_id: str, config: Dict[str, Any]):
         self.platform_id = platform_id
         self.config = config
@@ -69,6 +112,121 @@ class BasePublisher(ABC):
             logger.warning(f"等待选择器超时: {selector}, {e}")
             return False
 
+    # ==================== 条件等待 ====================
+    # 代替固定 sleep：条件满足立即返回，超时返回 False，不抛异常
+
+    async def resolve_selector(self, target: Union[Page, Frame], name: str, candidates: Sequence[str],
+                               timeout: int = 10000, state: str = "visible") -> Optional[str]:
+        """同时等待多个候选选择器，返回命中的那个（上次命中的优先，见 selector_resolver）"""
+        return await selector_resolver.resolve(target, self.platform_id, name, candidates, timeout, state)
+
+    def timer(self) -> StepTimer:
+        return StepTimer(self.name)
+
+    async def wait_for_load(self, page: Page, state: str = "domcontentloaded", timeout: int = 30000) -> bool:
+        """等待页面加载状态：load / domcontentloaded / networkidle"""
+        try:
+            await page.wait_for_load_state(state, timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    async def wait_visible(self, target: Union[Page, Frame], selector: str, timeout: int = 10000) -> bool:
+        """等待元素可见（用于可有可无的元素，超时不记警告）"""
+        try:
+            await target.locator(selector).first.wait_for(state="visible", timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    async def wait_hidden(self, target: Union[Page, Frame], selector: str, timeout: int = 10000) -> bool:
+        """等待元素消失（弹窗关闭、加载遮罩退出）"""
+        try:
+            await target.locator(selector).first.wait_for(state="hidden", timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    async def wait_editor_ready(self, target: Union[Page, Frame], selector: str, timeout: int = 15000) -> bool:
+        """等待编辑器可编辑：元素已渲染且 isContentEditable"""
+        try:
+            await target.wait_for_function(
+                """(sel) => {
+                    const el = document.querySelector(sel);
+                    return !!el && el.isContentEditable && el.getClientRects().length > 0;
+                }""",
+                arg=selector,
+                timeout=timeout,
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"等待编辑器就绪超时: {selector}, {e}")
+            return False
+
+    async def wait_until(self, predicate: Callable[[], Awaitable[Any]], timeout: int = 10000,
+                         interval: int = 200) -> bool:
+        """轮询异步条件直到为真（如按钮 is_enabled），predicate 抛异常视为未满足"""
+        deadline = time.monotonic() + timeout / 1000
+        while True:
+            try:
+                if await predicate():
+                    return True
+            except Exception:
+                pass
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(interval / 1000)
+
+    async def wait_for_url(self, page: Page, matcher: Union[str, Pattern, Callable[[str], bool]],
+                           timeout: int = 25000) -> bool:
+        """等待页面跳转到目标地址（发布成功后的文章页等）"""
+        try:
+            await page.wait_for_url(matcher, timeout=timeout, wait_until="commit")
+            return True
+        except Exception:
+            return False
+
+    @asynccontextmanager
+    async def network_quiet(self, page: Page, pattern: Union[str, Pattern], idle_ms: int = 500,
+                            timeout: int = 15000):
+        """
+        包住一个会触发请求的动作，退出时等到匹配 pattern 的请求全部结束并静默 idle_ms
+        用法：
+            async with self.network_quiet(page, r"upload|image"):
+                await file_input.set_input_files(path)
+        """
+        matcher = re.compile(pattern) if isinstance(pattern, str) else pattern
+        inflight = set()
+        last_activity = time.monotonic()
+
+        def on_request(request):
+            nonlocal last_activity
+            if matcher.search(request.url):
+                inflight.add(request)
+                last_activity = time.monotonic()
+
+        def on_done(request):
+            nonlocal last_activity
+            if request in inflight:
+                inflight.discard(request)
+                last_activity = time.monotonic()
+
+        page.on("request", on_request)
+        page.on("requestfinished", on_done)
+        page.on("requestfailed", on_done)
+
+        async def settled() -> bool:
+            return not inflight and time.monotonic() - last_activity >= idle_ms / 1000
+
+        try:
+            yield
+            if not await self.wait_until(settled, timeout=timeout, interval=50):
+                logger.warning(f"等待请求结束超时: {matcher.pattern}，仍有 {len(inflight)} 个未完成")
+        finally:
+            page.remove_listener("request", on_request)
+            page.remove_listener("requestfinished", on_done)
+            page.remove_listener("requestfailed", on_done)
+
     async def fill_title(self, page: Page, title: str, title_selector: str) -> bool:
         """
         填充标题
@@ -87,13 +245,19 @@ class BasePublisher(ABC):
         """
         填充正文
         """
-        try:
-            await page.fill(content_selector, content)
-            logger.info(f"正文已填充: {len(content)} 字符")
-            return True
-        except Exception as e:
-            logger.error(f"填充正文失败: {e}")
-            return False
+        return await self.inject_content(page, content_selector, content) is not None
+
+    async def inject_content(self, target: Union[Page, Frame], selector: str, content: str) -> Optional[str]:
+        """
+        把 Markdown 正文渲染成 HTML 后一次性写入编辑器（按 inject_strategies 依次尝试）
+
+        Returns:
+            生效的注入策略名，失败返回 None
+        """
+        strategy = await inject_content(target, selector, content, self.inject_strategies)
+        if not strategy:
+            logger.error(f"填充正文失败: {self.name}")
+        return strategy
 
     async def click_publish_button(self, page: Page, publish_selector: str) -> bool:
         """
@@ -107,24 +271,60 @@ class BasePublisher(ABC):
             logger.error(f"点击发布按钮失败: {e}")
             return False
 
-    async def wait_for_publish_result(self, page: Page, timeout: int = 30000) -> Dict[str, Any]:
+    async def submit_and_capture(self, page: Page, submit: Callable[[], Awaitable[bool]],
+                                 timeout: int = 30000) -> Tuple[bool, Optional[Dict[str, Any]]]:
         """
-        等待发布结果
+        执行发布动作并截获平台发布接口的响应（接口登记在 publish_response.PUBLISH_RESPONSE_SPECS）
 
         Returns:
-            发布结果
+            (是否已提交, 接口结果)；接口结果里有真实的文章 ID / 链接或错误码，None 表示需退回页面判断
         """
-        # 默认实现：等待一段时间后检查URL是否变化
-        await page.wait_for_timeout(3000)
+        return await submit_and_capture(page, self.platform_id, submit, timeout)
 
-        result = {
-            "success": True,
-            "platform_url": page.url,
-            "error_msg": None
-        }
+    @staticmethod
+    def outcome_confirmed(outcome: Optional[Dict[str, Any]]) -> bool:
+        """接口结果能否直接采用：明确失败，或成功且带回了文章链接"""
+        return bool(outcome) and (not outcome["success"] or bool(outcome.get("platform_url")))
+
+    async def settle_publish_result(self, page: Page, outcome: Optional[Dict[str, Any]],
+                                    page_check: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        结合接口结果与页面检查得出发布结果
 
+        接口结果已确认（见 outcome_confirmed）时直接采用；没截获到响应，或接口只说成功却没带 ID/链接
+        （可能截到的不是真正的发布接口）时，以 page_check 的页面跳转检查为准，接口给的文章 ID 一并保留
+        """
+        if self.outcome_confirmed(outcome):
+            return outcome
+
+        result = await page_check()
+        if outcome and result.get("success"):
+            result = {**outcome, **result}
+        elif outcome:
+            logger.warning(f"[{self.name}] 发布接口返回成功但没有文章链接，页面也未确认发布")
         return result
 
+    async def wait_for_publish_result(self, page: Page, timeout: int = 10000,
+                                      outcome: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        等待发布结果
+
+        Args:
+            timeout: 没有可用的接口结果时，等待页面离开编辑页的最长时间（毫秒）
+            outcome: submit_and_capture 截获的接口结果，已确认则直接采用
+
+        Returns:
+            发布结果
+        """
+        return await self.settle_publish_result(page, outcome, lambda: self._wait_for_leave_editor(page, timeout))
+
+    async def _wait_for_leave_editor(self, page: Page, timeout: int) -> Dict[str, Any]:
+        """页面兜底判断：发布成功后会离开编辑页，以此代替等待网络空闲（长连接页面可能一直等满超时）"""
+        editor_url = self.config.get("publish_url") or page.url
+        if await self.wait_for_url(page, lambda url: url.rstrip("/") != editor_url.rstrip("/"), timeout=timeout):
+            return {"success": True, "platform_url": page.url, "error_msg": None}
+        return {"success": False, "platform_url": None, "error_msg": "发布超时"}
+
 
 class PublisherRegistry:
     """
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+正文注入工具
+负责：把 Markdown 正文预渲染成 HTML，一次性写入各平台编辑器，代替逐字模拟键盘输入
+
+注入策略（按平台配置的顺序逐个尝试，写入后校验编辑器里确实有正文才算成功）：
+    editor_api   调用页面里的编辑器实例（UEditor / CKEditor / TinyMCE）直接 setContent
+    paste        派发带 text/html 的粘贴事件，走编辑器自己的粘贴解析（Draft.js / ProseMirror）
+    insert_html  document.execCommand("insertHTML")，适用于普通 contenteditable
+    type         keyboard.insert_text 插入纯文本，兜底
+"""
+
+import html
+import re
+from typing import List, Optional, Sequence, Union
+
+from playwright.async_api import Frame, Page
+from loguru import logger
+
+DEFAULT_STRATEGIES = ("paste", "insert_html", "type")
+
+# 选中编辑器内全部内容（注入即替换）
+_SELECT_ALL_JS = """(el) => {
+    el.focus();
+    if (typeof el.select === "function") { el.select(); return; }
+    const range = document.createRange();
+    range.selectNodeContents(el);
+    const sel = window.getSelection();
+    sel.removeAllRanges();
+    sel.addRange(range);
+}"""
+
+_PASTE_JS = """(el, payload) => {
+    const dt = new DataTransfer();
+    dt.setData("text/html", payload.html);
+    dt.setData("text/plain", payload.text);
+    el.dispatchEvent(new ClipboardEvent("paste", { clipboardData: dt, bubbles: true, cancelable: true }));
+}"""
+
+_INSERT_HTML_JS = """(el, payload) => document.execCommand("insertHTML", false, payload.html)"""
+
+# 编辑器实例挂在主页面 window 上，即使编辑区在 iframe 里
+_EDITOR_API_JS = """(payload) => {
+    if (window.UE && window.UE.instants) {
+        const editors = Object.values(window.UE.instants);
+        if (editors.length) { editors[0].setContent(payload.html); return "ueditor"; }
+    }
+    if (window.CKEDITOR && window.CKEDITOR.instances) {
+        const editors = Object.values(window.CKEDITOR.instances);
+        if (editors.length) { editors[0].setData(payload.html); return "ckeditor"; }
+    }
+    if (window.tinymce && window.tinymce.activeEditor) {
+        window.tinymce.activeEditor.setContent(payload.html);
+        return "tinymce";
+    }
+    return null;
+}"""
+
+_TEXT_LENGTH_JS = """(el) => {
+    const text = el.value !== undefined ? el.value : (el.innerText || el.textContent);
+    return (text || "").replace(/\\s+/g, "").length;
+}"""
+
+
+# ==================== Markdown 渲染 ====================
+
+def _attr(value: str) -> str:
+    """属性值里的引号转义（正文已先做过 & < > 转义），防止链接 / 图片地址里的引号跑出属性"""
+    return value.replace('"', "&quot;").replace("'", "&#x27;")
+
+
+_INLINE_RULES = [
+    (re.compile(r"!\[([^\]]*)\]\(([^)\s]+)\)"),
+     lambda m: f'<img src="{_attr(m.group(2))}" alt="{_attr(m.group(1))}">'),
+    (re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)"), lambda m: f'<a href="{_attr(m.group(2))}">{m.group(1)}</a>'),
+    (re.compile(r"`([^`]+)`"), r"<code>\1</code>"),
+    (re.compile(r"\*\*(.+?)\*\*|__(.+?)__"), lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>"),
+    (re.compile(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?!\*)"), r"<em>\1</em>"),
+]
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*$")
+_UL_ITEM = re.compile(r"^\s*[-*+]\s+(.*)$")
+_OL_ITEM = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+_QUOTE = re.compile(r"^\s*>\s?(.*)$")
+_RULE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+
+
+def _inline(text: str) -> str:
+    text = html.escape(text, quote=False)
+    for pattern, repl in _INLINE_RULES:
+        text = pattern.sub(repl, text)
+    return text
+
+
+def markdown_to_html(markdown: str) -> str:
+    """
+    把 AI 生成的 Markdown 渲染成编辑器能识别的 HTML
+    只覆盖文章里实际会出现的语法：标题、段落、列表、引用、代码块、分隔线、粗斜体、链接、图片
+    """
+    blocks: List[str] = []
+    paragraph: List[str] = []
+    list_tag: Optional[str] = None
+    list_items: List[str] = []
+    code: Optional[List[str]] = None
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.append("<p>" + "<br>".join(_inline(line) for line in paragraph) + "</p>")
+            paragraph.clear()
+
+    def flush_list():
+        nonlocal list_tag
+        if list_tag:
+            blocks.append(f"<{list_tag}>" + "".join(f"<li>{item}</li>" for item in list_items) + f"</{list_tag}>")
+            list_items.clear()
+            list_tag = None
+
+    for line in (markdown or "").replace("\r\n", "\n").split("\n"):
+        if code is not None:
+            if line.strip().startswith("```"):
+                blocks.append("<pre><code>" + html.escape("\n".join(code), quote=False) + "</code></pre>")
+                code = None
+            else:
+                code.append(line)
+            continue
+
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            flush_paragraph()
+            flush_list()
+            code = []
+            continue
+        if not stripped:
+            flush_paragraph()
+            flush_list()
+            continue
+
+        heading = _HEADING.match(stripped)
+        ul, ol = _UL_ITEM.match(line), _OL_ITEM.match(line)
+        if heading:
+            flush_paragraph()
+            flush_list()
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+        elif _RULE.match(stripped):
+            flush_paragraph()
+            flush_list()
+            blocks.append("<hr>")
+        elif ul or ol:
+            flush_paragraph()
+            tag = "ul" if ul else "ol"
+            if list_tag != tag:
+                flush_list()
+                list_tag = tag
+            list_items.append(_inline((ul or ol).group(1)))
+        elif _QUOTE.match(line):
+            flush_paragraph()
+            flush_list()
+            blocks.append(f"<blockquote>{_inline(_QUOTE.match(line).group(1))}</blockquote>")
+        else:
+            flush_list()
+            paragraph.append(stripped)
+
+    if code is not None:
+        blocks.append("<pre><code>" + html.escape("\n".join(code), quote=False) + "</code></pre>")
+    flush_paragraph()
+    flush_list()
+    return "".join(blocks)
+
+
+def html_to_text(rendered: str) -> str:
+    """HTML 转纯文本（粘贴事件的 text/plain 与 type 兜底用），块级元素之间换行"""
+    text = re.sub(r"<br\s*/?>", "\n", rendered)
+    text = re.sub(r"</(p|h[1-6]|li|blockquote|pre)>|<hr\s*/?>", "\n", text)
+    text = re.sub(r"<[^>]+>", "", text)
+    return html.unescape(text).strip()
+
+
+# ==================== 注入 ====================
+
+async def inject_content(
+        target: Union[Page, Frame],
+        selector: str,
+        markdown: str,
+        strategies: Sequence[str] = DEFAULT_STRATEGIES,
+        timeout: int = 10000,
+) -> Optional[str]:
+    """
+    把 Markdown 正文写入编辑器
+
+    Args:
+        target: 编辑器所在的页面或 iframe
+        selector: 可编辑区域选择器
+        strategies: 注入策略，按顺序尝试
+
+    Returns:
+        成功的策略名；全部失败返回 None
+    """
+    rendered = markdown_to_html(markdown)
+    plain = html_to_text(rendered)
+    payload = {"html": rendered, "text": plain}
+    expected = len(re.sub(r"\s+", "", plain))
+    page = target.page if isinstance(target, Frame) else target
+
+    editor = target.locator(selector).first
+    try:
+        await editor.wait_for(state="visible", timeout=timeout)
+    except Exception as e:
+        logger.warning(f"正文编辑器未出现: {selector}, {e}")
+        return None
+
+    for strategy in strategies:
+        try:
+            if strategy == "editor_api":
+                if not await page.evaluate(_EDITOR_API_JS, payload):
+                    continue
+            else:
+                await editor.click()
+                await editor.evaluate(_SELECT_ALL_JS)
+                if strategy == "paste":
+                    await editor.evaluate(_PASTE_JS, payload)
+                elif strategy == "insert_html":
+                    await editor.evaluate(_INSERT_HTML_JS, payload)
+                elif strategy == "type":
+                    await page.keyboard.insert_text(plain)
+                else:
+                    logger.warning(f"未知的正文注入策略: {strategy}")
+                    continue
+
+            # 编辑器里的文字量达到预期的八成才算写入成功（编辑器会吞掉部分空行、列表符号）
+            written = await editor.evaluate(_TEXT_LENGTH_JS)
+            if written >= expected * 0.8:
+                logger.info(f"正文已注入 ({strategy}): {len(plain)} 字符")
+                return strategy
+            logger.debug(f"正文注入策略 {strategy} 未生效: {written}/{expected}")
+        except Exception as e:
+            logger.debug(f"正文注入策略 {strategy} 失败: {e}")
+
+    logger.warning(f"所有正文注入策略均失败: {selector}")
+    return None
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+发布接口响应捕获
+负责：点击发布时用 page.expect_response 截获平台的发布/提交接口，直接从响应里拿到文章 ID、链接和错误码
+
+以前点完发布要先干等，再把“地址变了”当成功、把当前地址当文章链接；
+平台其实已经在接口响应里给出了结果，拿到响应就能立即收尾，也不会把已成功的文章当失败重发。
+
+各平台的接口地址和响应格式登记在 PUBLISH_RESPONSE_SPECS，新发布器与旧版 services/publisher.py 共用。
+"""
+
+import json
+import re
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from playwright.async_api import Page, Response, TimeoutError as PlaywrightTimeoutError
+from loguru import logger
+
+# 发布接口都是写操作
+_SUBMIT_METHODS = ("POST", "PUT")
+
+
+def _outcome(success: bool, article_id: Any = None, platform_url: Optional[str] = None,
+             error_code: Any = None, error_msg: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "success": success,
+        "article_id": str(article_id) if article_id not in (None, "") else None,
+        "platform_url": platform_url,
+        "error_code": error_code,
+        "error_msg": error_msg,
+    }
+
+
+def _failure(code: Any, msg: Any) -> Dict[str, Any]:
+    return _outcome(False, error_code=code, error_msg=str(msg or f"发布接口返回错误码 {code}"))
+
+
+# ==================== 各平台响应解析 ====================
+
+def parse_zhihu(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    知乎：旧接口 PUT /api/articles/{id}/publish 直接返回文章；
+    新接口 /api/v4/content/publish 返回 {"code": 0, "data": {"result": "<JSON 字符串>"}}
+    """
+    error = data.get("error")
+    if error:
+        return _failure(error.get("code"), error.get("message"))
+    if data.get("code") not in (None, 0):
+        return _failure(data.get("code"), data.get("message"))
+
+    article_id, url = data.get("id"), data.get("url")
+    result = (data.get("data") or {}).get("result")
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except ValueError:
+            result = None
+    if isinstance(result, dict):
+        published = result.get("publish") or result
+        article_id = article_id or published.get("id")
+        url = url or published.get("url")
+    if article_id and not url:
+        url = f"https://zhuanlan.zhihu.com/p/{article_id}"
+    return _outcome(True, article_id, url)
+
+
+def parse_toutiao(data: Dict[str, Any]) -> Dict[str, Any]:
+    """头条号：{"code": 0, "message": "success", "data": {"pgc_id": "..."}}"""
+    if data.get("code") not in (None, 0):
+        return _failure(data.get("code"), data.get("message"))
+    article_id = (data.get("data") or {}).get("pgc_id")
+    url = f"https://www.toutiao.com/article/{article_id}/" if article_id else None
+    return _outcome(True, article_id, url)
+
+
+def parse_baijiahao(data: Dict[str, Any]) -> Dict[str, Any]:
+    """百家号：{"errno": 0, "errmsg": "success", "ret": {"article_id": "...", "url": "..."}}"""
+    if data.get("errno") not in (None, 0):
+        return _failure(data.get("errno"), data.get("errmsg"))
+    ret = data.get("ret") or {}
+    article_id = ret.get("article_id") or ret.get("nid")
+    url = ret.get("url") or (f"https://baijiahao.baidu.com/s?id={article_id}" if article_id else None)
+    return _outcome(True, article_id, url)
+
+
+def parse_sohu(data: Dict[str, Any]) -> Dict[str, Any]:
+    """搜狐号：成功 {"success": true, "data": <文章ID>}，失败 {"success": false, "code": ..., "msg": ...}"""
+    if data.get("success") is False or data.get("code") not in (None, 0, 200):
+        return _failure(data.get("code"), data.get("msg") or data.get("message"))
+    article_id = data.get("data")
+    if isinstance(article_id, dict):
+        article_id = article_id.get("id")
+    url = f"https://www.sohu.com/a/{article_id}" if article_id else None
+    return _outcome(True, article_id, url)
+
+
+# 平台 -> (发布接口地址正则, 响应解析函数)
+PUBLISH_RESPONSE_SPECS: Dict[str, Tuple[str, Callable[[Dict[str, Any]], Dict[str, Any]]]] = {
+    "zhihu": (r"/api/articles/\d+/publish|/api/v4/content/publish", parse_zhihu),
+    "toutiao": (r"/mp/agw/article/publish", parse_toutiao),
+    "baijiahao": (r"/pcui/article/publish", parse_baijiahao),
+    "sohu": (r"/news/v\d+/news/publish", parse_sohu),
+}
+
+
+def parse_publish_response(platform_id: str, data: Any) -> Optional[Dict[str, Any]]:
+    """
+    按平台解析发布接口的 JSON 响应
+
+    Returns:
+        {"success", "article_id", "platform_url", "error_code", "error_msg"}；平台未登记或响应不是对象时返回 None
+    """
+    spec = PUBLISH_RESPONSE_SPECS.get(platform_id)
+    if not spec or not isinstance(data, dict):
+        return None
+    return spec[1](data)
+
+
+# ==================== 捕获 ====================
+
+class _NotSubmitted(Exception):
+    """发布动作没有真正点下去，放弃等待响应"""
+
+
+async def read_publish_response(platform_id: str, response: Response) -> Optional[Dict[str, Any]]:
+    """读取并解析捕获到的发布响应；响应体不是 JSON 时只根据 HTTP 状态判断失败"""
+    try:
+        data = await response.json()
+    except Exception:
+        if response.status >= 400:
+            return _failure(response.status, f"发布接口返回 HTTP {response.status}")
+        return None
+    return parse_publish_response(platform_id, data)
+
+
+async def submit_and_capture(
+        page: Page,
+        platform_id: str,
+        submit: Callable[[], Awaitable[bool]],
+        timeout: int = 30000,
+) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    执行发布动作，同时截获平台发布接口的响应
+
+    Args:
+        submit: 点击发布（含二次确认）的协程函数，返回是否点击成功
+        timeout: 从开始执行 submit 起等待发布响应的最长时间（毫秒）
+
+    Returns:
+        (是否已提交, 接口结果)；接口结果为 None 表示没截获到或无法解析，调用方退回页面判断
+    """
+    spec = PUBLISH_RESPONSE_SPECS.get(platform_id)
+    if not spec:
+        return await submit(), None
+
+    matcher = re.compile(spec[0])
+
+    def is_publish_response(response: Response) -> bool:
+        return response.request.method in _SUBMIT_METHODS and bool(matcher.search(response.url))
+
+    try:
+        async with page.expect_response(is_publish_response, timeout=timeout) as response_info:
+            if not await submit():
+                raise _NotSubmitted()
+        response = await response_info.value
+    except _NotSubmitted:
+        return False, None
+    except PlaywrightTimeoutError:
+        logger.warning(f"未截获到发布接口响应: {platform_id}，退回页面判断")
+        return True, None
+
+    outcome = await read_publish_response(platform_id, response)
+    if outcome is None:
+        logger.warning(f"发布接口响应无法解析: {platform_id} HTTP {response.status}")
+    elif outcome["success"]:
+        logger.info(f"发布接口确认成功: {platform_id} id={outcome['article_id']} {outcome['platform_url']}")
+    else:
+        logger.error(f"发布接口返回失败: {platform_id} [{outcome['error_code']}] {outcome['error_msg']}")
+    return True, outcome
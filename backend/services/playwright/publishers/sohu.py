@@ -4,13 +4,15 @@
 对搜狐号也熟悉！
 """
 
-import asyncio
 from typing import Dict, Any
 from playwright.async_api import Page
 from loguru import logger
 
 from .base import BasePublisher
 
+TITLE_SELECTOR = "#title, input[name='title'], input[placeholder*='标题']"
+PUBLISH_BUTTON_SELECTORS = [".publish-btn", "button:has-text('发布')", "[class*='publish']"]
+
 
 class SohuPublisher(BasePublisher):
     """
@@ -19,54 +21,55 @@ class SohuPublisher(BasePublisher):
     发布页面：https://mp.sohu.com/upload/article
     """
 
+    # 搜狐使用 UEditor，优先走编辑器实例的 setContent
+    inject_strategies = ("editor_api", "insert_html", "paste", "type")
+
     async def publish(self, page: Page, article: Any, account: Any) -> Dict[str, Any]:
         """发布文章到搜狐号"""
+        timer = self.timer()
         try:
             # 1. 导航到发布页面
-            if not await self.navigate_to_publish_page(page):
-                return {"success": False, "platform_url": None, "error_msg": "导航失败"}
+            async with timer.step("打开编辑器"):
+                if not await self.navigate_to_publish_page(page):
+                    return {"success": False, "platform_url": None, "error_msg": "导航失败"}
 
-            # 2. 等待编辑器加载
-            await asyncio.sleep(3)
+                # 2. 等待编辑器加载（标题框出现即可开始填写）
+                await self.wait_visible(page, TITLE_SELECTOR, 10000)
 
             # 3. 填充标题
-            if not await self._fill_title(page, article.title):
-                return {"success": False, "platform_url": None, "error_msg": "标题填充失败"}
+            async with timer.step("填充标题"):
+                if not await self._fill_title(page, article.title):
+                    return {"success": False, "platform_url": None, "error_msg": "标题填充失败"}
 
             # 4. 填充正文
-            if not await self._fill_content(page, article.content):
-                return {"success": False, "platform_url": None, "error_msg": "正文填充失败"}
+            async with timer.step("填充正文"):
+                if not await self._fill_content(page, article.content):
+                    return {"success": False, "platform_url": None, "error_msg": "正文填充失败"}
 
             # 5. 点击发布
-            if not await self._click_publish(page):
-                return {"success": False, "platform_url": None, "error_msg": "发布失败"}
-
-            # 6. 等待结果
-            result = await self._wait_for_publish_result(page)
+            async with timer.step("提交发布"):
+                submitted, outcome = await self.submit_and_capture(page, lambda: self._click_publish(page))
+                if not submitted:
+                    return {"success": False, "platform_url": None, "error_msg": "发布失败"}
 
-            return result
+            # 6. 等待结果（优先采用发布接口的响应）
+            async with timer.step("等待结果"):
+                return await self.settle_publish_result(
+                    page, outcome, lambda: self._wait_for_publish_result(page))
 
         except Exception as e:
             logger.error(f"搜狐号发布失败: {e}")
             return {"success": False, "platform_url": None, "error_msg": str(e)}
+        finally:
+            logger.info(timer.summary())
 
     async def _fill_title(self, page: Page, title: str) -> bool:
         """填充标题"""
         try:
-            selectors = [
-                "#title",
-                "input[name='title']",
-                "input[placeholder*='标题']",
-            ]
-
-            for selector in selectors:
-                try:
-                    if await self.wait_for_selector(page, selector, 5000):
-                        await page.fill(selector, title)
-                        logger.info(f"搜狐号标题已填充: {title[:20]}...")
-                        return True
-                except Exception:
-                    continue
+            if await self.wait_visible(page, TITLE_SELECTOR, 5000):
+                await page.locator(TITLE_SELECTOR).first.fill(title)
+                logger.info(f"搜狐号标题已填充: {title[:20]}...")
+                return True
 
             return False
         except Exception as e:
@@ -76,32 +79,24 @@ class SohuPublisher(BasePublisher):
     async def _fill_content(self, page: Page, content: str) -> bool:
         """填充正文"""
         try:
-            # 搜狐使用ueditor
-            selectors = [
-                "#ueditor_textarea",
-                ".ueditor-body",
-                "iframe[id*='ueditor']",
-            ]
-
-            for selector in selectors:
+            # 搜狐使用ueditor：编辑区在 iframe 的 body 里
+            for selector in ("iframe[id*='ueditor']", ".ueditor-body", "#ueditor_textarea"):
                 try:
-                    if await self.wait_for_selector(page, selector, 5000):
-                        # 如果是iframe，需要切换
-                        if "iframe" in selector:
-                            frame = page.frame(selector)
-                            frame.fill("body", content)
-                        else:
-                            await page.fill(selector, content)
-
+                    if not await self.wait_for_selector(page, selector, 5000):
+                        continue
+                    if "iframe" in selector:
+                        frame = await (await page.query_selector(selector)).content_frame()
+                        await self.wait_editor_ready(frame, "body", 5000)
+                        filled = await self.inject_content(frame, "body", content)
+                    else:
+                        filled = await self.inject_content(page, selector, content)
+                    if filled:
                         logger.info(f"搜狐号正文已填充: {len(content)} 字符")
                         return True
                 except Exception:
                     continue
 
-            # 直接输入
-            await page.keyboard.type(content)
-            logger.info(f"搜狐号正文已填充（直接输入）: {len(content)} 字符")
-            return True
+            return False
 
         except Exception as e:
             logger.error(f"搜狐号正文填充失败: {e}")
@@ -110,40 +105,17 @@ class SohuPublisher(BasePublisher):
     async def _click_publish(self, page: Page) -> bool:
         """点击发布按钮"""
         try:
-            selectors = [
-                ".publish-btn",
-                "button:has-text('发布')",
-                "[class*='publish']",
-            ]
+            selector = await self.resolve_selector(page, "publish_button", PUBLISH_BUTTON_SELECTORS, 5000)
+            if not selector:
+                return False
 
-            for selector in selectors:
-                try:
-                    if await self.wait_for_selector(page, selector, 3000):
-                        await page.click(selector)
-                        logger.info("搜狐号发布按钮已点击")
-                        return True
-                except Exception:
-                    continue
-
-            return False
+            await page.locator(selector).locator("visible=true").first.click()
+            logger.info("搜狐号发布按钮已点击")
+            return True
         except Exception as e:
             logger.error(f"搜狐号点击发布失败: {e}")
             return False
 
     async def _wait_for_publish_result(self, page: Page) -> Dict[str, Any]:
-        """等待发布结果"""
-        try:
-            await asyncio.sleep(3)
-
-            return {
-                "success": True,
-                "platform_url": page.url,
-                "error_msg": None
-            }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "platform_url": None,
-                "error_msg": f"等待结果失败: {str(e)}"
-            }
+        """等待发布结果：发布成功后离开编辑页"""
+        return await self._wait_for_leave_editor(page, 10000)
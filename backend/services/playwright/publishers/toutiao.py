@@ -7,7 +7,6 @@
 3. 增强发布按钮判定：适配“预览并发布”红色按钮
 """
 
-import asyncio
 import os
 import re
 import httpx
@@ -18,19 +17,29 @@ from playwright.async_api import Page
 from loguru import logger
 from .base import BasePublisher, registry
 
+EDITOR_SELECTOR = ".ProseMirror"
+# 封面上传接口
+UPLOAD_PATTERN = r"upload|image"
+
 
 class ToutiaoPublisher(BasePublisher):
+    # ProseMirror 编辑器：粘贴 HTML 保留段落与标题结构
+    inject_strategies = ("paste", "insert_html", "type")
+
     async def publish(self, page: Page, article: Any, account: Any) -> Dict[str, Any]:
         temp_files = []
+        timer = self.timer()
         try:
             logger.info("🚀 开始今日头条发布流程 (v4.0 强力交互版)...")
 
-            # 1. 导航与充分等待
-            await page.goto(self.config["publish_url"], wait_until="networkidle", timeout=60000)
-            await asyncio.sleep(10)  # 增加到 10s 确保 Heavy Editor 加载完毕
+            # 1. 导航并等待 Heavy Editor 可编辑
+            async with timer.step("打开编辑器"):
+                await page.goto(self.config["publish_url"], wait_until="networkidle", timeout=60000)
+                await self.wait_editor_ready(page, EDITOR_SELECTOR, timeout=30000)
 
             # 2. UI 强力清理
-            await self._clean_toutiao_ui_v4(page)
+            async with timer.step("清理界面"):
+                await self._clean_toutiao_ui_v4(page)
 
             # 3. 标题极限剪裁 (今日头条 20 字以内最容易通过校验)
             raw_title = article.title.replace("#", "").strip()
@@ -38,38 +47,48 @@ class ToutiaoPublisher(BasePublisher):
             logger.info(f"📝 极限剪裁标题: {safe_title}")
 
             # 4. 图片准备 (必须有封面)
-            image_urls = re.findall(r'!\[.*?\]\(((?:https?://)?\S+?)\)', article.content)
-            clean_content = re.sub(r'!\[.*?\]\(.*?\)', '', article.content)
+            async with timer.step("准备图片"):
+                image_urls = re.findall(r'!\[.*?\]\(((?:https?://)?\S+?)\)', article.content)
+                clean_content = re.sub(r'!\[.*?\]\(.*?\)', '', article.content)
 
-            # 备用图源
-            fallback_urls = [f"https://source.unsplash.com/800x600/?tech,drone,{random.randint(1, 50)}"]
-            downloaded_paths = await self._download_images(image_urls + fallback_urls)
-            temp_files.extend(downloaded_paths)
+                # 备用图源
+                fallback_urls = [f"https://source.unsplash.com/800x600/?tech,drone,{random.randint(1, 50)}"]
+                downloaded_paths = await self._download_images(image_urls + fallback_urls)
+                temp_files.extend(downloaded_paths)
 
             # 5. 强力填充标题
-            if not await self._fill_title_v4(page, safe_title):
-                return {"success": False, "error_msg": "标题填充失败 (物理坐标激活无效)"}
+            async with timer.step("填充标题"):
+                if not await self._fill_title_v4(page, safe_title):
+                    return {"success": False, "error_msg": "标题填充失败 (物理坐标激活无效)"}
 
             # 6. 填充正文
-            if not await self._fill_content_v4(page, clean_content):
-                return {"success": False, "error_msg": "正文填充失败"}
+            async with timer.step("填充正文"):
+                if not await self._fill_content_v4(page, clean_content):
+                    return {"success": False, "error_msg": "正文填充失败"}
 
             # 7. 封面上传 (头条号命门)
-            if downloaded_paths:
-                await self._upload_mandatory_cover_v4(page, downloaded_paths[0])
-            else:
-                logger.warning("未获得有效封面，发布按钮可能无法激活")
+            async with timer.step("上传封面"):
+                if downloaded_paths:
+                    await self._upload_mandatory_cover_v4(page, downloaded_paths[0])
+                else:
+                    logger.warning("未获得有效封面，发布按钮可能无法激活")
 
             # 8. 发布确认
-            if not await self._handle_final_publish_v4(page):
-                return {"success": False, "error_msg": "发布按钮点击无效 (可能字数或封面不达标)"}
+            async with timer.step("提交发布"):
+                submitted, outcome = await self.submit_and_capture(
+                    page, lambda: self._handle_final_publish_v4(page))
+                if not submitted:
+                    return {"success": False, "error_msg": "发布按钮点击无效 (可能字数或封面不达标)"}
 
-            return await self._wait_for_publish_result(page)
+            async with timer.step("等待结果"):
+                return await self.settle_publish_result(
+                    page, outcome, lambda: self._wait_for_publish_result(page))
 
         except Exception as e:
             logger.exception(f"❌ 今日头条发布异常: {str(e)}")
             return {"success": False, "error_msg": str(e)}
         finally:
+            logger.info(timer.summary())
             for f in temp_files:
                 if os.path.exists(f):
                     try:
@@ -104,9 +123,8 @@ class ToutiaoPublisher(BasePublisher):
 
             # 2. 物理坐标激活 (核心：直接点标题大约所在的位置)
             await page.mouse.click(400, 220)
-            await asyncio.sleep(1)
 
-            if await title_el.is_visible(timeout=5000):
+            if await self.wait_visible(page, sel, 5000):
                 await title_el.click(force=True)
                 await page.keyboard.press("Control+A")
                 await page.keyboard.press("Backspace")
@@ -120,16 +138,8 @@ class ToutiaoPublisher(BasePublisher):
     async def _fill_content_v4(self, page: Page, content: str) -> bool:
         """正文填充"""
         try:
-            editor = page.locator(".ProseMirror").first
-            await editor.click(force=True)
-            await page.evaluate('''(args) => {
-                const el = document.querySelector(args.sel);
-                el.innerHTML = ''; 
-                const dt = new DataTransfer();
-                dt.setData("text/plain", args.text);
-                const ev = new ClipboardEvent("paste", { clipboardData: dt, bubbles: true });
-                el.dispatchEvent(ev);
-            }''', {"sel": ".ProseMirror", "text": content})
+            if not await self.inject_content(page, EDITOR_SELECTOR, content):
+                return False
             await page.keyboard.press("Enter")
             return True
         except:
@@ -139,10 +149,10 @@ class ToutiaoPublisher(BasePublisher):
         """强制封面"""
         try:
             await page.locator("text=单图").first.click()
-            await asyncio.sleep(1)
             file_input = page.locator("input[type='file']").first
-            await file_input.set_input_files(path)
-            await asyncio.sleep(5)
+            await file_input.wait_for(state="attached", timeout=5000)
+            async with self.network_quiet(page, UPLOAD_PATTERN):
+                await file_input.set_input_files(path)
             logger.info("✅ 封面上传指令发送完毕")
         except:
             pass
@@ -154,20 +164,18 @@ class ToutiaoPublisher(BasePublisher):
             btn = page.locator("button:has-text('预览并发布'), button:has-text('发布')").last
             await btn.scroll_into_view_if_needed()
 
-            # 轮询 10 次直到按钮可用
+            # 最多尝试 10 轮，每轮等按钮可用最多 2 秒
             for _ in range(10):
-                if await btn.is_enabled():
+                if await self.wait_until(btn.is_enabled, timeout=2000):
                     await btn.click(force=True)
                     logger.success("✅ 已触发发布按钮点击")
 
                     # 检查是否有二次弹窗
-                    await asyncio.sleep(2)
-                    confirm = page.locator(".byte-modal__footer button:has-text('确认'), button:has-text('发布')").first
-                    if await confirm.is_visible(timeout=3000):
-                        await confirm.click()
+                    confirm = ".byte-modal__footer button:has-text('确认'), button:has-text('发布')"
+                    if await self.wait_visible(page, confirm, 3000):
+                        await page.locator(confirm).first.click()
                     return True
 
-                await asyncio.sleep(2)
                 # 如果按钮还是灰的，尝试点一下标题激活
                 await page.mouse.click(400, 220)
             return False
@@ -191,10 +199,12 @@ class ToutiaoPublisher(BasePublisher):
         return paths
 
     async def _wait_for_publish_result(self, page: Page) -> Dict[str, Any]:
-        for i in range(25):
-            if "content_manage" in page.url or "profile" in page.url:
-                return {"success": True, "platform_url": page.url}
-            await asyncio.sleep(1)
+        # 发布成功后离开编辑页（编辑页本身也在 profile_v4 下，需排除）
+        def published(url: str) -> bool:
+            return "content_manage" in url or ("profile" in url and "graphic/publish" not in url)
+
+        if await self.wait_for_url(page, published, timeout=25000):
+            return {"success": True, "platform_url": page.url}
         return {"success": False, "error_msg": "发布超时，可能存在标题违规或封面未选中"}
 
 
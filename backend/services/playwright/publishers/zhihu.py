@@ -7,7 +7,6 @@
 3. 增强图源稳定性
 """
 
-import asyncio
 import re
 import os
 import httpx
@@ -19,69 +18,90 @@ from loguru import logger
 
 from .base import BasePublisher, registry
 
+EDITOR_SELECTOR = ".public-DraftEditor-content"
+# 封面与正文图片的上传接口
+UPLOAD_PATTERN = r"upload|/images"
+
 
 class ZhihuPublisher(BasePublisher):
+    # Draft.js 编辑器：只认自己的粘贴处理，execCommand 写入的内容不会进入编辑器状态
+    inject_strategies = ("paste", "type")
+
     async def publish(self, page: Page, article: Any, account: Any) -> Dict[str, Any]:
         temp_files = []
+        timer = self.timer()
         try:
             logger.info("🚀 开始知乎发布 (v3.6 状态自检版)...")
 
             # 1. 导航并验证登录状态
-            await page.goto(self.config["publish_url"], wait_until="networkidle", timeout=60000)
-            await asyncio.sleep(5)
+            async with timer.step("打开编辑器"):
+                await page.goto(self.config["publish_url"], wait_until="networkidle", timeout=60000)
 
-            # 🌟 [关键修复] 检查是否被重定向到了登录页
-            if "signin" in page.url or "login" in page.url:
-                logger.error("❌ 登录已失效：页面被重定向至登录页，请重新扫码授权账号")
-                return {"success": False, "error_msg": "账号登录已过期，请重新授权"}
+                # 🌟 [关键修复] 检查是否被重定向到了登录页
+                if "signin" in page.url or "login" in page.url:
+                    logger.error("❌ 登录已失效：页面被重定向至登录页，请重新扫码授权账号")
+                    return {"success": False, "error_msg": "账号登录已过期，请重新授权"}
+
+                await self.wait_editor_ready(page, EDITOR_SELECTOR)
 
             # 2. 图像获取逻辑
-            # 清洗正文
-            clean_content = re.sub(r'!\[.*?\]\(.*?\)', '', article.content)
-            # 尝试下载正文原图
-            image_urls = re.findall(r'!\[.*?\]\(((?:https?://)?\S+?)\)', article.content)
-            downloaded_paths = await self._download_images(image_urls)
-
-            # 🌟 [关键修复] 自动配图策略：确保不使用占位符关键词
-            if not downloaded_paths:
-                # 如果标题包含正在创作中，则尝试使用关键词表里的原词
-                search_kw = article.title
-                if "创作中" in search_kw or not search_kw:
-                    # 兜底：尝试从关联的关键词对象获取
-                    search_kw = "科技创新"  # 终极回退词
-
-                logger.info(f"⚠️ 正文无有效图片，启动自动配图。搜索词: {search_kw}")
-                fallback_path = await self._generate_fallback_image(search_kw)
-                if fallback_path:
-                    downloaded_paths = [fallback_path]
-                    temp_files.append(fallback_path)
+            async with timer.step("准备图片"):
+                # 清洗正文
+                clean_content = re.sub(r'!\[.*?\]\(.*?\)', '', article.content)
+                # 尝试下载正文原图
+                image_urls = re.findall(r'!\[.*?\]\(((?:https?://)?\S+?)\)', article.content)
+                downloaded_paths = await self._download_images(image_urls)
+
+                # 🌟 [关键修复] 自动配图策略：确保不使用占位符关键词
+                if not downloaded_paths:
+                    # 如果标题包含正在创作中，则尝试使用关键词表里的原词
+                    search_kw = article.title
+                    if "创作中" in search_kw or not search_kw:
+                        # 兜底：尝试从关联的关键词对象获取
+                        search_kw = "科技创新"  # 终极回退词
+
+                    logger.info(f"⚠️ 正文无有效图片，启动自动配图。搜索词: {search_kw}")
+                    fallback_path = await self._generate_fallback_image(search_kw)
+                    if fallback_path:
+                        downloaded_paths = [fallback_path]
+                        temp_files.append(fallback_path)
 
             # 3. 填充标题 (增加对占位标题的防御)
-            display_title = article.title
-            if "创作中" in display_title:
-                await asyncio.sleep(5)  # 再等5秒看数据库是否更新
-                # 提示：实际生产中应在 Service 层拦截，这里做二次防御
+            async with timer.step("填充标题"):
+                display_title = article.title
+                if "创作中" in display_title:
+                    # 提示：实际生产中应在 Service 层拦截，这里只做提醒
+                    logger.warning(f"⚠️ 标题仍是占位内容: {display_title}")
 
-            await self._fill_title(page, display_title)
+                await self._fill_title(page, display_title)
 
             # 4. 填充内容
-            await self._fill_content_and_clean_ui(page, clean_content)
+            async with timer.step("填充正文"):
+                if not await self._fill_content_and_clean_ui(page, clean_content):
+                    return {"success": False, "error_msg": "正文填充失败"}
 
             # 5. 上传图像
             if downloaded_paths:
-                await self._upload_real_images(page, downloaded_paths)
+                async with timer.step("上传图片"):
+                    await self._upload_real_images(page, downloaded_paths)
 
             # 6. 发布流程
-            topic_word = search_kw[:4] if 'search_kw' in locals() else "科技"
-            if not await self._handle_publish_process(page, topic_word):
-                return {"success": False, "error_msg": "发布确认环节失败"}
+            async with timer.step("提交发布"):
+                topic_word = search_kw[:4] if 'search_kw' in locals() else "科技"
+                submitted, outcome = await self.submit_and_capture(
+                    page, lambda: self._handle_publish_process(page, topic_word))
+                if not submitted:
+                    return {"success": False, "error_msg": "发布确认环节失败"}
 
-            return await self._wait_for_publish_result(page)
+            async with timer.step("等待结果"):
+                return await self.settle_publish_result(
+                    page, outcome, lambda: self._wait_for_publish_result(page))
 
         except Exception as e:
             logger.exception(f"❌ 知乎脚本严重故障: {str(e)}")
             return {"success": False, "error_msg": str(e)}
         finally:
+            logger.info(timer.summary())
             for f in temp_files:
                 if os.path.exists(f): os.remove(f)
 
@@ -112,30 +132,23 @@ class ZhihuPublisher(BasePublisher):
         url = f"https://source.unsplash.com/800x600/?business,technology,{clean_kw}"
         return (await self._download_images([url]))[0] if True else None
 
-    async def _fill_content_and_clean_ui(self, page: Page, content: str):
-        editor = ".public-DraftEditor-content"
-        await page.wait_for_selector(editor)
-        await page.click(editor)
-        await page.evaluate('''(text) => {
-            const dt = new DataTransfer();
-            dt.setData("text/plain", text);
-            const ev = new ClipboardEvent("paste", { clipboardData: dt, bubbles: true });
-            document.querySelector(".public-DraftEditor-content").dispatchEvent(ev);
-        }''', content)
-        await asyncio.sleep(2)
-        try:
-            confirm = page.locator("button:has-text('确认并解析')").first
-            if await confirm.is_visible(timeout=3000):
-                await confirm.click()
-        except:
-            pass
+    async def _fill_content_and_clean_ui(self, page: Page, content: str) -> bool:
+        strategy = await self.inject_content(page, EDITOR_SELECTOR, content)
+        if not strategy:
+            return False
+        # 纯文本兜底时知乎会识别出 Markdown 并弹出解析确认
+        if strategy == "type":
+            confirm = "button:has-text('确认并解析')"
+            if await self.wait_visible(page, confirm, 3000):
+                await page.locator(confirm).first.click()
+        return True
 
     async def _upload_real_images(self, page: Page, paths: List[str]):
         try:
             logger.info("正在尝试上传封面图...")
             cover_input = page.locator("input.UploadPicture-input").first
-            await cover_input.set_input_files(paths[0])
-            await asyncio.sleep(4)
+            async with self.network_quiet(page, UPLOAD_PATTERN):
+                await cover_input.set_input_files(paths[0])
 
             logger.info("正在正文插入图片...")
             await page.keyboard.press("Control+Home")
@@ -145,8 +158,8 @@ class ZhihuPublisher(BasePublisher):
             async with page.expect_file_chooser() as fc_info:
                 await img_icon.click()
             file_chooser = await fc_info.value
-            await file_chooser.set_files(paths[0])
-            await asyncio.sleep(5)
+            async with self.network_quiet(page, UPLOAD_PATTERN):
+                await file_chooser.set_files(paths[0])
         except Exception as e:
             logger.error(f"真实图片上传动作失败: {e}")
 
@@ -158,32 +171,26 @@ class ZhihuPublisher(BasePublisher):
 
     async def _handle_publish_process(self, page: Page, topic: str) -> bool:
         await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        add_topic = page.locator("button:has-text('添加话题')").first
-        if await add_topic.is_visible(timeout=2000):
-            await add_topic.click()
+        if await self.wait_visible(page, "button:has-text('添加话题')", 2000):
+            await page.locator("button:has-text('添加话题')").first.click()
         topic_input = page.locator("input[placeholder*='话题']").first
         if await topic_input.is_visible():
             await topic_input.fill(topic)
-            await asyncio.sleep(2)
-            suggestion = page.locator(".Suggestion-item, .PublishPanel-suggestionItem").first
-            if await suggestion.is_visible():
-                await suggestion.click()
+            suggestion = ".Suggestion-item, .PublishPanel-suggestionItem"
+            if await self.wait_visible(page, suggestion, 3000):
+                await page.locator(suggestion).first.click()
             else:
                 await page.keyboard.press("Enter")
         final_btn = page.locator(
             "button.PublishPanel-submitButton, .WriteIndex-publishButton, button:has-text('发布')").last
-        for _ in range(5):
-            if await final_btn.is_enabled():
-                await final_btn.click(force=True)
-                return True
-            await asyncio.sleep(2)
+        if await self.wait_until(final_btn.is_enabled, timeout=10000):
+            await final_btn.click(force=True)
+            return True
         return False
 
     async def _wait_for_publish_result(self, page: Page) -> Dict[str, Any]:
-        for i in range(25):
-            if "/p/" in page.url and "/edit" not in page.url:
-                return {"success": True, "platform_url": page.url}
-            await asyncio.sleep(1)
+        if await self.wait_for_url(page, lambda url: "/p/" in url and "/edit" not in url, timeout=25000):
+            return {"success": True, "platform_url": page.url}
         return {"success": False, "error_msg": "发布超时"}
 
 
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+浏览器资源拦截
+负责：按平台规则（config.RESOURCE_BLOCK_PROFILES）给自动化上下文挂路由，拦掉图片、视频、字体和统计脚本，并统计拦截量
+
+被拦截的请求不会下载，拿不到真实大小；节省流量按资源类型的典型大小估算。
+"""
+
+import re
+from collections import defaultdict
+from typing import Any, Dict, Optional, Pattern
+
+from playwright.async_api import BrowserContext, Route
+from loguru import logger
+
+from backend.config import RESOURCE_BLOCK_PROFILES, RESOURCE_BLOCKING_ENABLED
+
+# 各类资源的典型大小（字节），用于估算拦截节省的流量
+_TYPICAL_BYTES = {
+    "image": 60 * 1024,
+    "media": 800 * 1024,
+    "font": 80 * 1024,
+    "stylesheet": 30 * 1024,
+    "script": 40 * 1024,
+}
+_DEFAULT_BYTES = 5 * 1024
+
+
+def _compile(patterns) -> Optional[Pattern]:
+    return re.compile("|".join(f"(?:{p})" for p in patterns)) if patterns else None
+
+
+class BlockRule:
+    """一个平台的拦截规则"""
+
+    def __init__(self, block_types=(), block_urls=(), allow_urls=()):
+        self.block_types = frozenset(block_types)
+        self.block_urls = _compile(block_urls)
+        self.allow_urls = _compile(allow_urls)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if self.allow_urls and self.allow_urls.search(url):
+            return False
+        if resource_type in self.block_types:
+            return True
+        return bool(self.block_urls and self.block_urls.search(url))
+
+
+class ResourceBlocker:
+    """
+    资源拦截器 (单例)
+    在浏览器池新建上下文时挂上对应平台的路由；上下文复用时路由随之保留
+    """
+
+    def __init__(self, profiles: Dict[str, Dict[str, Any]] = RESOURCE_BLOCK_PROFILES,
+                 enabled: bool = RESOURCE_BLOCKING_ENABLED):
+        self.enabled = enabled
+        self._rules = {name: BlockRule(**profile) for name, profile in profiles.items()}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def rule_for(self, profile: str) -> Optional[BlockRule]:
+        return self._rules.get(profile) or self._rules.get("default")
+
+    def record(self, profile: str, resource_type: str):
+        """记一次拦截"""
+        stats = self._stats.setdefault(profile, {"blocked": 0, "estimated_bytes": 0, "by_type": defaultdict(int)})
+        stats["blocked"] += 1
+        stats["estimated_bytes"] += _TYPICAL_BYTES.get(resource_type, _DEFAULT_BYTES)
+        stats["by_type"][resource_type] += 1
+
+    async def apply(self, context: BrowserContext, profile: str) -> bool:
+        """
+        给上下文挂上 profile 对应的拦截路由
+
+        Returns:
+            是否启用了拦截
+        """
+        rule = self.rule_for(profile)
+        if not self.enabled or rule is None:
+            return False
+
+        async def handle(route: Route):
+            request = route.request
+            try:
+                if rule.should_block(request.resource_type, request.url):
+                    self.record(profile, request.resource_type)
+                    await route.abort("blockedbyclient")
+                else:
+                    await route.fallback()
+            except Exception as e:
+                # 页面已关闭等情况下路由可能失效，忽略即可
+                logger.debug(f"资源拦截路由处理失败: {e}")
+
+        await context.route("**/*", handle)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """拦截统计快照：各平台拦截请求数、估算节省字节、按资源类型分布"""
+        platforms = {
+            name: {**s, "by_type": dict(s["by_type"])}
+            for name, s in self._stats.items()
+        }
+        return {
+            "enabled": self.enabled,
+            "blocked": sum(s["blocked"] for s in platforms.values()),
+            "estimated_bytes": sum(s["estimated_bytes"] for s in platforms.values()),
+            "platforms": platforms,
+        }
+
+
+resource_blocker = ResourceBlocker()
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+候选选择器解析
+负责：把同一元素的多个候选选择器合成一个 locator（locator.or_）同时等待，谁先出现用谁；
+按平台记住命中的候选并持久化到 SELECTOR_CACHE_FILE，下次优先探测；统计选择器漂移
+
+以前逐个候选 wait_for_selector，每个未命中的候选都要白等一次超时；
+合并成一个 locator 后只需等一次，页面改版导致的命中变化（漂移）会记入统计并打日志，便于及时更新选择器。
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from playwright.async_api import Frame, Locator, Page
+from loguru import logger
+
+from backend.config import SELECTOR_CACHE_FILE
+
+
+class SelectorResolver:
+    """
+    候选选择器解析器 (单例)
+    缓存 key 为 "平台.元素名"，值为上次命中的候选选择器
+    """
+
+    def __init__(self, cache_file: Optional[Path] = SELECTOR_CACHE_FILE):
+        self._cache_file = cache_file
+        self._winners: Dict[str, str] = self._load()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def _load(self) -> Dict[str, str]:
+        if not self._cache_file or not self._cache_file.exists():
+            return {}
+        try:
+            return json.loads(self._cache_file.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.warning(f"选择器缓存读取失败，重新学习: {e}")
+            return {}
+
+    def _save(self):
+        if not self._cache_file:
+            return
+        tmp = self._cache_file.with_suffix(".tmp")
+        try:
+            tmp.write_text(json.dumps(self._winners, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self._cache_file)
+        except Exception as e:
+            logger.warning(f"选择器缓存写入失败: {e}")
+
+    def ordered(self, platform: str, name: str, candidates: Sequence[str]) -> List[str]:
+        """上次命中的候选排在最前，其余保持原有优先级"""
+        winner = self._winners.get(f"{platform}.{name}")
+        if winner in candidates:
+            return [winner] + [c for c in candidates if c != winner]
+        return list(candidates)
+
+    @staticmethod
+    def _candidate(target: Union[Page, Frame], selector: str, state: str) -> Locator:
+        locator = target.locator(selector)
+        return locator.locator("visible=true") if state == "visible" else locator
+
+    async def resolve(
+            self,
+            target: Union[Page, Frame],
+            platform: str,
+            name: str,
+            candidates: Sequence[str],
+            timeout: int = 10000,
+            state: str = "visible",
+    ) -> Optional[str]:
+        """
+        同时等待所有候选选择器，返回命中的那个
+
+        Args:
+            target: 页面或 iframe
+            platform: 平台 ID（缓存与统计的分组）
+            name: 元素名，如 "publish_button"
+            candidates: 候选选择器，按优先级排列
+            state: "visible" 只认可见元素，"attached" 存在于 DOM 即可（隐藏的 file input 等）
+
+        Returns:
+            命中的候选选择器；超时未出现返回 None
+        """
+        key = f"{platform}.{name}"
+        ordered = self.ordered(platform, name, candidates)
+        combined = self._candidate(target, ordered[0], state)
+        for selector in ordered[1:]:
+            combined = combined.or_(self._candidate(target, selector, state))
+
+        try:
+            await combined.first.wait_for(state="attached", timeout=timeout)
+        except Exception:
+            self._record(key, None)
+            logger.warning(f"候选选择器均未命中: {key} ({len(ordered)} 个候选)")
+            return None
+
+        # 合并 locator 按 DOM 顺序返回，按优先级再探测一遍确定是哪个候选命中
+        for selector in ordered:
+            try:
+                if await self._candidate(target, selector, state).count():
+                    self._record(key, selector)
+                    return selector
+            except Exception:
+                continue
+
+        # 元素在探测间隙消失
+        self._record(key, None)
+        return None
+
+    def _record(self, key: str, winner: Optional[str]):
+        cached = self._winners.get(key)
+        stats = self._stats.setdefault(key, {"resolved": 0, "cache_hits": 0, "drifts": 0, "failures": 0})
+        if winner is None:
+            stats["failures"] += 1
+            return
+
+        stats["resolved"] += 1
+        if winner == cached:
+            stats["cache_hits"] += 1
+            return
+
+        if cached is not None:
+            stats["drifts"] += 1
+            logger.warning(f"⚠️ 选择器漂移: {key} {cached} -> {winner}")
+        self._winners[key] = winner
+        self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        """漂移统计：各元素当前命中的选择器、解析次数、缓存命中、漂移、失败"""
+        entries = {
+            key: {"winner": self._winners.get(key), **self._stats.get(key, {})}
+            for key in sorted(set(self._winners) | set(self._stats))
+        }
+        return {
+            "drifts": sum(s.get("drifts", 0) for s in self._stats.values()),
+            "failures": sum(s.get("failures", 0) for s in self._stats.values()),
+            "entries": entries,
+        }
+
+
+selector_resolver = SelectorResolver()
@@ -1,17 +1,20 @@
 # -*- coding: utf-8 -*-
 """
-Playwright 浏览器管理器 - 工业加固终极版 (v2.5)
-负责：浏览器生命周期、账号授权、自动化发布、用户名提取
+Playwright 浏览器管理器 - 工业加固终极版 (v2.6)
+负责：浏览器生命周期、常驻浏览器池、账号授权、自动化发布、用户名提取
 """
 
 import asyncio
+import hashlib
 import json
 import os
+import time
 import uuid
 import inspect
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, List, Any, Callable
+from typing import Optional, Dict, List, Any, Callable, Awaitable, AsyncIterator
 
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 from loguru import logger
@@ -20,10 +23,15 @@ from sqlalchemy.orm import Session
 # 内部导入
 from backend.config import (
     BROWSER_TYPE, BROWSER_ARGS, PLATFORMS,
-    LOGIN_CHECK_INTERVAL, LOGIN_MAX_WAIT_TIME
+    LOGIN_CHECK_INTERVAL, LOGIN_MAX_WAIT_TIME,
+    BROWSER_POOL_SIZE, BROWSER_POOL_MAX_CONTEXTS, BROWSER_POOL_MAX_USES,
+    BROWSER_CONTEXT_MAX_USES, BROWSER_CONTEXT_IDLE_TTL, PUBLISH_HEADLESS,
+    INDEX_CHECK_HEADLESS
 )
-from backend.services.crypto import encrypt_cookies, encrypt_storage_state, decrypt_storage_state
+from backend.database.writer import get_db_writer
+from backend.services.crypto import encrypt_cookies, encrypt_storage_state, load_storage_state
 from backend.services.playwright.publishers.base import registry
+from backend.services.playwright.resource_blocker import resource_blocker
 
 # 🌟 统一日志模块绑定
 browser_log = logger.bind(module="浏览器")
@@ -47,6 +55,325 @@ class AuthTask:
         self.created_account_id: Optional[int] = None
 
 
+# ==================== 常驻浏览器池 ====================
+
+class PooledBrowser:
+    """池中的一个浏览器进程"""
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.uses = 0       # 累计租用次数
+        self.active = 0     # 当前租出的上下文数
+        self.retired = False
+        self.created_at = datetime.now()
+
+    @property
+    def healthy(self) -> bool:
+        return not self.retired and self.browser.is_connected()
+
+
+class PooledContext:
+    """池中的一个账号上下文"""
+
+    def __init__(self, key: Any, context: BrowserContext, owner: PooledBrowser, fingerprint: str):
+        self.key = key
+        self.context = context
+        self.owner = owner
+        self.fingerprint = fingerprint
+        self.uses = 0
+        self.last_used = time.monotonic()
+
+
+class BrowserPool:
+    """
+    常驻浏览器池
+
+    - 预热的浏览器进程被多次复用，避免每次发布都冷启动 Chromium
+    - 按 key（通常是账号 ID）租出 BrowserContext，同一账号串行使用，空闲上下文可被下次租用复用
+    - 浏览器累计租用达到上限后退役，待租出的上下文全部归还后关闭重建
+    - key 为 None 时租出一次性上下文，归还即关闭
+    """
+
+    def __init__(
+            self,
+            launcher: Callable[[], Awaitable[Browser]],
+            size: int = BROWSER_POOL_SIZE,
+            max_contexts: int = BROWSER_POOL_MAX_CONTEXTS,
+            max_uses: int = BROWSER_POOL_MAX_USES,
+            context_max_uses: int = BROWSER_CONTEXT_MAX_USES,
+            idle_ttl: float = BROWSER_CONTEXT_IDLE_TTL,
+            name: str = "pool",
+    ):
+        self._launcher = launcher
+        self.size = size
+        self.max_contexts = max_contexts
+        self.max_uses = max_uses
+        self.context_max_uses = context_max_uses
+        self.idle_ttl = idle_ttl
+        self.name = name
+
+        self._browsers: List[PooledBrowser] = []
+        self._idle: Dict[Any, PooledContext] = {}
+        # key -> [锁, 引用数]；引用数归零即删除，避免按账号无限增长
+        self._key_locks: Dict[Any, List[Any]] = {}
+        # 只保护簿记（列表、计数、空闲表），启动浏览器 / 建关上下文等 I/O 一律在锁外进行
+        self._lock = asyncio.Lock()
+        # 正在启动的浏览器进程，其它租用者等它就绪而不是并发再起一个
+        self._launching: Optional[asyncio.Future] = None
+        self._slots = asyncio.Semaphore(size * max_contexts)
+        self._stats = {"launched": 0, "recycled": 0, "contexts_created": 0, "contexts_reused": 0}
+
+    @staticmethod
+    def fingerprint(storage_state: Optional[Dict]) -> str:
+        """storage_state 指纹：账号重新授权后旧上下文不再复用"""
+        if not storage_state:
+            return ""
+        raw = json.dumps(storage_state, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @asynccontextmanager
+    async def lease(
+            self,
+            key: Any = None,
+            storage_state: Optional[Dict] = None,
+            fingerprint: Optional[str] = None,
+            block_profile: Optional[str] = None,
+            **context_options
+    ) -> AsyncIterator[BrowserContext]:
+        """
+        租用一个浏览器上下文
+
+        Args:
+            key: 复用标识（账号 ID），None 表示一次性上下文
+            storage_state: 登录态，仅在新建上下文时注入
+            fingerprint: storage_state 指纹，不传则自动计算
+            block_profile: 资源拦截规则名（平台 ID，见 RESOURCE_BLOCK_PROFILES），仅在新建上下文时挂载
+            context_options: 透传给 browser.new_context 的参数
+        """
+        if fingerprint is None:
+            fingerprint = self.fingerprint(storage_state)
+
+        key_lock = self._ref_key_lock(key) if key is not None else None
+        held = False
+        try:
+            if key_lock:
+                await key_lock.acquire()
+                held = True
+            try:
+                async with self._slots:
+                    pctx = await self._acquire(key, storage_state, fingerprint, block_profile, context_options)
+                    ok = False
+                    try:
+                        yield pctx.context
+                        ok = True
+                    finally:
+                        await self._release(pctx, reusable=ok)
+            finally:
+                if held:
+                    key_lock.release()
+        finally:
+            if key_lock:
+                self._unref_key_lock(key)
+
+    def _ref_key_lock(self, key: Any) -> asyncio.Lock:
+        entry = self._key_locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        return entry[0]
+
+    def _unref_key_lock(self, key: Any):
+        entry = self._key_locks.get(key)
+        if entry:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                self._key_locks.pop(key, None)
+
+    async def _acquire(self, key: Any, storage_state: Optional[Dict], fingerprint: str,
+                       block_profile: Optional[str], context_options: Dict[str, Any]) -> PooledContext:
+        stale = None
+        async with self._lock:
+            pctx = self._idle.pop(key, None) if key is not None else None
+            if pctx and (pctx.fingerprint != fingerprint or not pctx.owner.healthy
+                         or time.monotonic() - pctx.last_used > self.idle_ttl):
+                stale, pctx = pctx, None
+            if pctx:
+                pctx.owner.active += 1
+                self._count_use(pctx)
+                self._stats["contexts_reused"] += 1
+        if stale:
+            await self._close_context(stale)
+        if pctx:
+            return pctx
+
+        # 新建上下文：_pick_browser 已为该进程占好 active 名额
+        owner = await self._pick_browser()
+        try:
+            options = dict(context_options)
+            if storage_state:
+                options["storage_state"] = storage_state
+            context = await owner.browser.new_context(**options)
+            if block_profile:
+                await resource_blocker.apply(context, block_profile)
+        except BaseException:
+            await self._return_slot(owner)
+            raise
+
+        pctx = PooledContext(key, context, owner, fingerprint)
+        async with self._lock:
+            self._count_use(pctx)
+            self._stats["contexts_created"] += 1
+        return pctx
+
+    def _count_use(self, pctx: PooledContext):
+        pctx.uses += 1
+        pctx.owner.uses += 1
+        if pctx.owner.uses >= self.max_uses:
+            pctx.owner.retired = True
+
+    async def _pick_browser(self) -> PooledBrowser:
+        """挑选负载最低的健康浏览器并占用一个名额，必要时启动新进程"""
+        while True:
+            dead: List[PooledBrowser] = []
+            async with self._lock:
+                for pb in [b for b in self._browsers if not b.browser.is_connected()]:
+                    browser_log.warning(f"⚠️ [{self.name}] 检测到浏览器进程已断开，移出浏览器池")
+                    self._detach_browser(pb)
+                    dead.append(pb)
+
+                candidates = [b for b in self._browsers if b.healthy and b.active < self.max_contexts]
+                live = [b for b in self._browsers if not b.retired]
+                # 有空闲进程或已达进程上限时复用；否则启动新进程分摊负载
+                if candidates and (any(b.active == 0 for b in candidates) or len(live) >= self.size):
+                    pb = min(candidates, key=lambda b: b.active)
+                    pb.active += 1
+                    chosen, launching = pb, None
+                elif self._launching is None:
+                    self._launching = asyncio.get_running_loop().create_future()
+                    chosen, launching = None, None
+                else:
+                    chosen, launching = None, self._launching
+
+            for pb in dead:
+                await self._close_browser(pb)
+            if chosen:
+                return chosen
+            if launching is not None:
+                # 别人正在启动浏览器，等它就绪后重新挑选
+                await asyncio.shield(launching)
+                continue
+            return await self._launch()
+
+    async def _launch(self) -> PooledBrowser:
+        """启动新浏览器进程（锁外），就绪后加入池并占用一个名额"""
+        try:
+            browser = await self._launcher()
+        except BaseException:
+            async with self._lock:
+                waiter, self._launching = self._launching, None
+            waiter.set_result(None)
+            raise
+
+        async with self._lock:
+            pb = PooledBrowser(browser)
+            pb.active += 1
+            self._browsers.append(pb)
+            self._stats["launched"] += 1
+            live = len([b for b in self._browsers if not b.retired])
+            waiter, self._launching = self._launching, None
+        waiter.set_result(None)
+        browser_log.info(f"🌐 [{self.name}] 浏览器进程已预热 ({live}/{self.size})")
+        return pb
+
+    async def _return_slot(self, owner: PooledBrowser):
+        """新建上下文失败时归还 _pick_browser 占用的名额"""
+        async with self._lock:
+            owner.active -= 1
+            retire = owner.retired and owner.active == 0 and owner in self._browsers
+            if retire:
+                self._detach_browser(owner)
+        if retire:
+            await self._close_browser(owner)
+
+    async def _release(self, pctx: PooledContext, reusable: bool):
+        to_close: List[PooledContext] = []
+        retired: Optional[PooledBrowser] = None
+        async with self._lock:
+            owner = pctx.owner
+            owner.active -= 1
+            pctx.last_used = time.monotonic()
+
+            if (reusable and pctx.key is not None and owner.healthy
+                    and pctx.uses < self.context_max_uses and pctx.key not in self._idle):
+                self._idle[pctx.key] = pctx
+            else:
+                to_close.append(pctx)
+
+            if owner.retired and owner.active == 0 and owner in self._browsers:
+                to_close.extend(self._detach_browser(owner))
+                retired = owner
+                self._stats["recycled"] += 1
+
+            to_close.extend(self._sweep_idle())
+
+        for stale in to_close:
+            await self._close_context(stale)
+        if retired:
+            await self._close_browser(retired)
+            browser_log.info(f"♻️ [{self.name}] 浏览器进程达到 {self.max_uses} 次租用，已回收")
+
+    def _sweep_idle(self) -> List[PooledContext]:
+        """摘出超时或所属进程失效的空闲上下文（调用方在锁外关闭）"""
+        now = time.monotonic()
+        expired = []
+        for key, pctx in list(self._idle.items()):
+            if now - pctx.last_used > self.idle_ttl or not pctx.owner.healthy:
+                self._idle.pop(key, None)
+                expired.append(pctx)
+        return expired
+
+    def _detach_browser(self, pb: PooledBrowser) -> List[PooledContext]:
+        """把进程及其空闲上下文移出池（持锁调用），返回被摘下的空闲上下文"""
+        detached = []
+        for key, pctx in list(self._idle.items()):
+            if pctx.owner is pb:
+                detached.append(self._idle.pop(key))
+        if pb in self._browsers:
+            self._browsers.remove(pb)
+        return detached
+
+    async def _close_context(self, pctx: PooledContext):
+        try:
+            await pctx.context.close()
+        except Exception:
+            pass
+
+    async def _close_browser(self, pb: PooledBrowser):
+        try:
+            await pb.browser.close()
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """池状态快照，便于排查"""
+        return {
+            **self._stats,
+            "browsers": len(self._browsers),
+            "active_contexts": sum(b.active for b in self._browsers),
+            "idle_contexts": len(self._idle),
+        }
+
+    async def close(self):
+        """关闭池内所有浏览器"""
+        async with self._lock:
+            contexts = list(self._idle.values())
+            self._idle.clear()
+            browsers = list(self._browsers)
+            self._browsers.clear()
+        for pctx in contexts:
+            await self._close_context(pctx)
+        for pb in browsers:
+            await self._close_browser(pb)
+
+
 class PlaywrightManager:
     """
     Playwright 管理器 (单例)
@@ -60,6 +387,16 @@ class PlaywrightManager:
         self._is_running = False
         self._db_factory: Optional[Callable] = None
         self._ws_callback: Optional[Callable] = None
+        # 🌟 发布专用常驻浏览器池（按账号租用上下文）
+        self.publish_pool = BrowserPool(
+            lambda: self._launch_browser(headless=PUBLISH_HEADLESS),
+            name="发布池"
+        )
+        # 🌟 收录检测专用浏览器池（按 AI 平台 + 槽位租用上下文）
+        self.check_pool = BrowserPool(
+            lambda: self._launch_browser(headless=INDEX_CHECK_HEADLESS),
+            name="检测池"
+        )
 
     def set_db_factory(self, db_factory: Callable):
         self._db_factory = db_factory
@@ -79,13 +416,13 @@ class PlaywrightManager:
         # 否则直接返回（SessionLocal 情况）
         return db_obj
 
-    async def start(self):
-        """启动浏览器服务"""
-        if self._is_running:
-            return
+    async def _ensure_playwright(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
 
-        browser_log.info("🚀 正在初始化自动化浏览器核心...")
-        self._playwright = await async_playwright().start()
+    async def _launch_browser(self, headless: bool) -> Browser:
+        """统一的浏览器启动入口：授权浏览器与浏览器池共用"""
+        await self._ensure_playwright()
 
         # 查找本地 Chrome 路径以绕过检测
         chrome_paths = [
@@ -96,7 +433,7 @@ class PlaywrightManager:
         executable_path = next((p for p in chrome_paths if os.path.exists(p)), None)
 
         launch_options = {
-            "headless": False,  # 授权时必须可见
+            "headless": headless,
             "args": BROWSER_ARGS + [
                 "--disable-blink-features=AutomationControlled",  # 隐藏自动化特征
                 "--no-sandbox"
@@ -105,17 +442,29 @@ class PlaywrightManager:
         if executable_path:
             launch_options["executable_path"] = executable_path
 
-        self._browser = await self._playwright[BROWSER_TYPE].launch(**launch_options)
+        return await self._playwright[BROWSER_TYPE].launch(**launch_options)
+
+    async def start(self):
+        """启动浏览器服务"""
+        if self._is_running:
+            return
+
+        browser_log.info("🚀 正在初始化自动化浏览器核心...")
+        self._browser = await self._launch_browser(headless=False)  # 授权时必须可见
         self._is_running = True
         browser_log.success("✅ Playwright 浏览器服务已就绪")
 
     async def stop(self):
         """安全停止所有资源"""
-        if not self._is_running: return
-        for ctx in list(self._contexts.values()): await ctx.close()
-        if self._browser: await self._browser.close()
-        if self._playwright: await self._playwright.stop()
-        self._is_running = False
+        await self.publish_pool.close()
+        await self.check_pool.close()
+        if self._is_running:
+            for ctx in list(self._contexts.values()): await ctx.close()
+            if self._browser: await self._browser.close()
+            self._is_running = False
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
 
     async def create_auth_task(self, platform: str, account_id: Optional[int] = None,
                                account_name: Optional[str] = None) -> AuthTask:
@@ -171,48 +520,50 @@ class PlaywrightManager:
                 "() => ({ localStorage: {...localStorage}, sessionStorage: {...sessionStorage} })")
             username = await self._extract_username(task.page, task.platform)
 
-            db = self._get_db()
-            if not db: return json.dumps({"success": False, "message": "数据库连接失败"})
+            if not self._db_factory:
+                return json.dumps({"success": False, "message": "数据库连接失败"})
 
-            try:
-                from backend.database.models import Account
-                if task.account_id:
-                    account = db.query(Account).get(task.account_id)
-                else:
-                    account = db.query(Account).filter(Account.platform == task.platform,
-                                                       Account.username == username).first()
-                    if not account:
-                        account = Account(platform=task.platform,
-                                          account_name=task.account_name or f"{task.platform}_{username}")
-                        db.add(account)
-
-                # 加密存储
-                account.cookies = encrypt_cookies(cookies)
-                account.storage_state = encrypt_storage_state({"cookies": cookies, "origins": []})
-                account.username = username
-                account.status = 1
-                account.last_auth_time = datetime.now()
-
-                db.commit()
-                db.refresh(account)
-
-                task.created_account_id = account.id
-                task.status = "success"
-
-                browser_log.success(f"🎉 账号 {username} 授权成功并已保存")
-
-                if self._ws_callback:
-                    await self._ws_callback({"type": "auth_complete", "task_id": task_id, "success": True})
-
-                # 延时清理任务，给前端留出轮询时间
-                asyncio.create_task(self._delayed_close_task(task_id))
-                return json.dumps({"success": True, "message": "授权成功，请返回软件"})
-            finally:
-                db.close()
+            # 入库放到数据库线程池，避免阻塞驱动浏览器的事件循环
+            task.created_account_id = await get_db_writer().write(self._save_auth_account, task, cookies, username)
+            task.status = "success"
+
+            browser_log.success(f"🎉 账号 {username} 授权成功并已保存")
+
+            if self._ws_callback:
+                await self._ws_callback({"type": "auth_complete", "task_id": task_id, "success": True})
+
+            # 延时清理任务，给前端留出轮询时间
+            asyncio.create_task(self._delayed_close_task(task_id))
+            return json.dumps({"success": True, "message": "授权成功，请返回软件"})
         except Exception as e:
             browser_log.error(f"授权入库失败: {e}")
             return json.dumps({"success": False, "message": str(e)})
 
+    @staticmethod
+    def _save_auth_account(db, task: AuthTask, cookies: List[Dict], username: Optional[str]) -> int:
+        """授权结果入库（单写者队列中执行），返回账号 ID"""
+        from backend.database.models import Account
+
+        if task.account_id:
+            account = db.query(Account).get(task.account_id)
+        else:
+            account = db.query(Account).filter(Account.platform == task.platform,
+                                               Account.username == username).first()
+            if not account:
+                account = Account(platform=task.platform,
+                                  account_name=task.account_name or f"{task.platform}_{username}")
+                db.add(account)
+
+        # 加密存储
+        account.cookies = encrypt_cookies(cookies)
+        account.storage_state = encrypt_storage_state({"cookies": cookies, "origins": []})
+        account.username = username
+        account.status = 1
+        account.last_auth_time = datetime.now()
+
+        db.flush()
+        return account.id
+
     # 🌟 补全缺失的方法：供 account.py 调用
     def get_auth_task(self, task_id: str) -> Optional[AuthTask]:
         return self._auth_tasks.get(task_id)
@@ -245,23 +596,23 @@ class PlaywrightManager:
     # ==================== 真实发布入口 ====================
     async def execute_publish(self, article: Any, account: Any) -> Dict[str, Any]:
         """供 Service 调用的执行入口"""
-        await self.start()
         publisher = registry.get(account.platform)
         if not publisher: return {"success": False, "error_msg": "适配器未注册"}
 
         # 🌟 加固：处理加密的 Session
         try:
-            raw_state = decrypt_storage_state(account.storage_state)
+            raw_state = load_storage_state(account.id, account.storage_state)
             state_data = raw_state if raw_state else json.loads(account.storage_state)
         except:
             state_data = None
 
-        context = await self._browser.new_context(storage_state=state_data)
-        page = await context.new_page()
-        try:
-            return await publisher.publish(page, article, account)
-        finally:
-            await context.close()
+        async with self.publish_pool.lease(account.id, storage_state=state_data,
+                                           block_profile=account.platform) as context:
+            page = await context.new_page()
+            try:
+                return await publisher.publish(page, article, account)
+            finally:
+                await page.close()
 
 
 # 单例
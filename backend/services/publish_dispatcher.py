@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+发布调度器 - 有界并发版
+负责：按平台排队、全局/单平台并发限流、背压、每个发布任务独立数据库会话
+"""
+
+import asyncio
+from typing import Callable, Dict, FrozenSet, List, Optional, Set
+from loguru import logger
+
+from backend.database import run_db
+from backend.config import MAX_CONCURRENT_PUBLISH, PUBLISH_PLATFORM_CONCURRENCY, PUBLISH_QUEUE_SIZE
+
+log = logger.bind(module="调度中心")
+
+
+class PublishDispatcher:
+    """
+    发布调度器
+
+    每个平台一条队列 + 固定数量的 worker，避免某个平台卡住时阻塞其他平台；
+    所有 worker 共享一个全局信号量，保证同时运行的发布不超过 MAX_CONCURRENT_PUBLISH。
+    排队总数受 PUBLISH_QUEUE_SIZE 限制，调度器按剩余容量取数，积压时不会一次拉起上百个浏览器。
+    """
+
+    def __init__(
+            self,
+            max_concurrent: int = MAX_CONCURRENT_PUBLISH,
+            platform_concurrency: Optional[Dict[str, int]] = None,
+            queue_size: int = PUBLISH_QUEUE_SIZE,
+    ):
+        self.max_concurrent = max_concurrent
+        self.platform_concurrency = platform_concurrency or PUBLISH_PLATFORM_CONCURRENCY
+        self.queue_size = queue_size
+        self.db_factory: Optional[Callable] = None
+
+        self._global: Optional[asyncio.Semaphore] = None
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: List[asyncio.Task] = []
+        self._inflight: Set[int] = set()  # 排队中 + 执行中的文章 ID
+        self._queued = 0
+        self._running = 0
+        self._stats = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    def set_db_factory(self, db_factory: Callable):
+        self.db_factory = db_factory
+
+    @property
+    def capacity(self) -> int:
+        """当前还能接收的排队数量"""
+        return max(self.queue_size - self._queued, 0)
+
+    def is_inflight(self, article_id: int) -> bool:
+        return article_id in self._inflight
+
+    def inflight_ids(self) -> FrozenSet[int]:
+        """排队中 + 执行中的文章 ID 快照（交给数据库线程时不受后续变动影响）"""
+        return frozenset(self._inflight)
+
+    def submit(self, article_id: int, platform: str, lease_owner: Optional[str] = None) -> bool:
+        """
+        投递一篇文章，非阻塞
+
+        Args:
+            lease_owner: 调度器领取该文章时写入的租约持有者
+
+        Returns:
+            是否已入队（重复投递或队列已满返回 False）
+        """
+        if article_id in self._inflight:
+            return False
+        if self._queued >= self.queue_size:
+            self._stats["rejected"] += 1
+            return False
+
+        queue = self._queues.get(platform) or self._start_platform(platform)
+        queue.put_nowait((article_id, lease_owner))
+        self._inflight.add(article_id)
+        self._queued += 1
+        self._stats["submitted"] += 1
+        return True
+
+    def _start_platform(self, platform: str) -> asyncio.Queue:
+        """首次遇到某个平台时创建队列与 worker（必须在事件循环中调用）"""
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.max_concurrent)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queues[platform] = queue
+        workers = self.platform_concurrency.get(platform, self.platform_concurrency.get("default", 1))
+        for i in range(max(workers, 1)):
+            self._workers.append(asyncio.create_task(self._worker(platform, queue), name=f"publish-{platform}-{i}"))
+        return queue
+
+    async def _worker(self, platform: str, queue: asyncio.Queue):
+        while True:
+            article_id, lease_owner = await queue.get()
+            self._queued -= 1
+            try:
+                async with self._global:
+                    self._running += 1
+                    try:
+                        ok = await self._run(article_id, lease_owner)
+                        self._stats["completed" if ok else "failed"] += 1
+                    finally:
+                        self._running -= 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["failed"] += 1
+                log.error(f"发布任务 {article_id} ({platform}) 异常: {e}")
+            finally:
+                self._inflight.discard(article_id)
+                queue.task_done()
+
+    async def _run(self, article_id: int, lease_owner: Optional[str]) -> bool:
+        """每个发布任务使用独立的数据库会话"""
+        from backend.services.geo_article_service import GeoArticleService
+
+        if not self.db_factory:
+            return False
+        db = self.db_factory()
+        try:
+            return await GeoArticleService(db).execute_publish(article_id, lease_owner)
+        finally:
+            await run_db(db.close)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "queued": self._queued, "running": self._running}
+
+    async def stop(self):
+        """取消所有 worker"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+        self._inflight.clear()
+        self._queued = 0
@@ -21,6 +21,10 @@ from ..config import (
     RETRY_INTERVAL,
 )
 from .crypto import CryptoService
+from .playwright.publishers.content_injector import inject_content
+from .playwright.publishers.publish_response import submit_and_capture
+from .playwright.resource_blocker import resource_blocker
+from .playwright.selector_resolver import selector_resolver
 from ..database.models import Account, Article, PublishRecord
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -87,10 +91,9 @@ class BasePlatformPublisher:
             )
 
             if is_contenteditable:
-                # contenteditable 元素使用 click + type
-                await page.click(selector)
-                await page.keyboard.press("Control+A")
-                await page.type(selector, content, delay=10)
+                # contenteditable 元素：预渲染 HTML 一次性粘贴/插入，不再逐字模拟键盘
+                if not await inject_content(page, selector, content):
+                    return False
             else:
                 # 普通 textarea/input 使用 fill
                 await page.fill(selector, content)
@@ -111,10 +114,25 @@ class BasePlatformPublisher:
             logger.error(f"点击发布按钮失败: {e}")
             return False
 
-    async def _wait_publish_result(self, page: Page, timeout: int = 15000) -> tuple[bool, str]:
-        """等待发布结果"""
+    async def _submit(self, page: Page, click, timeout: int = 30000) -> tuple[bool, Optional[Dict[str, Any]]]:
+        """点击发布并截获平台发布接口的响应，返回 (是否已点击, 接口结果)"""
+        return await submit_and_capture(page, self.platform_id, click, timeout)
+
+    async def _wait_publish_result(self, page: Page, timeout: int = 15000,
+                                   outcome: Optional[Dict[str, Any]] = None) -> tuple[bool, str]:
+        """等待发布结果：优先采用发布接口的响应，没截获到或没带文章链接时再看页面"""
+        if outcome and not outcome["success"]:
+            return False, f"[{outcome['error_code']}] {outcome['error_msg']}"
+        if outcome and outcome["platform_url"]:
+            return True, outcome["platform_url"]
+        # 接口只说成功却没带文章链接时同样以页面为准
+
         try:
-            await page.wait_for_timeout(3000)  # 至少等待3秒
+            # 截获发布响应时已经等过了，这里只等页面跳转落定
+            try:
+                await page.wait_for_url(lambda url: url != self.publish_url, timeout=3000, wait_until="commit")
+            except Exception:
+                pass
 
             # 检查是否有错误提示
             error_selectors = [".error", ".error-message", ".fail", "[class*='error']"]
@@ -177,12 +195,13 @@ class ZhihuPublisher(BasePlatformPublisher):
             await asyncio.sleep(2)
 
             # 5. 点击发布按钮
-            publish_success = await self._click_publish(page, self.selectors["publish_button"])
+            publish_success, outcome = await self._submit(
+                page, lambda: self._click_publish(page, self.selectors["publish_button"]))
             if not publish_success:
                 return PublishResult(False, error_msg="发布按钮未找到")
 
             # 6. 等待发布结果
-            success, result = await self._wait_publish_result(page)
+            success, result = await self._wait_publish_result(page, outcome=outcome)
             if success:
                 logger.info(f"知乎发布成功: {article.title}")
                 return PublishResult(True, platform_url=result)
@@ -243,38 +262,36 @@ class BaijiahaoPublisher(BasePlatformPublisher):
         """
         尝试用多个选择器点击元素
 
-        用这个方法来应对页面结构变化！
+        用这个方法来应对页面结构变化！所有候选同时等待，只等一次超时
         """
-        for selector in selectors:
-            try:
-                logger.info(f"尝试点击 {description}，选择器: {selector}")
-                await page.wait_for_selector(selector, timeout=timeout)
-                await page.click(selector)
-                logger.info(f"成功点击 {description}")
-                return True
-            except Exception as e:
-                logger.debug(f"选择器 {selector} 失败: {e}")
-                continue
-        return False
+        selector = await selector_resolver.resolve(page, self.platform_id, description, selectors, timeout)
+        if not selector:
+            return False
+        try:
+            await page.locator(selector).locator("visible=true").first.click()
+            logger.info(f"成功点击 {description}，选择器: {selector}")
+            return True
+        except Exception as e:
+            logger.debug(f"选择器 {selector} 点击失败: {e}")
+            return False
 
     async def _fill_element_by_selectors(self, page: Page, selectors: List[str], value: str, description: str = "元素", timeout: int = 10000) -> bool:
         """
         尝试用多个选择器填充元素
 
-        用这个方法来应对页面结构变化！
+        用这个方法来应对页面结构变化！所有候选同时等待，只等一次超时
         """
-        for selector in selectors:
-            try:
-                logger.info(f"尝试填充 {description}，选择器: {selector}")
-                await page.wait_for_selector(selector, timeout=timeout)
-                await page.fill(selector, value)
-                await asyncio.sleep(0.5)
-                logger.info(f"成功填充 {description}")
-                return True
-            except Exception as e:
-                logger.debug(f"选择器 {selector} 失败: {e}")
-                continue
-        return False
+        selector = await selector_resolver.resolve(page, self.platform_id, description, selectors, timeout)
+        if not selector:
+            return False
+        try:
+            await page.locator(selector).locator("visible=true").first.fill(value)
+            await asyncio.sleep(0.5)
+            logger.info(f"成功填充 {description}，选择器: {selector}")
+            return True
+        except Exception as e:
+            logger.debug(f"选择器 {selector} 填充失败: {e}")
+            return False
 
     async def publish(self, page: Page, article: Article, account: Account) -> PublishResult:
         """发布到百家号 - 重写的发布流程！"""
@@ -341,17 +358,17 @@ class BaijiahaoPublisher(BasePlatformPublisher):
 
             # ========== 步骤6: 点击发布按钮 ==========
             logger.info("点击发布按钮...")
-            publish_success = await self._click_element_by_selectors(
+            publish_success, outcome = await self._submit(page, lambda: self._click_element_by_selectors(
                 page,
                 self.selectors["publish_button"],
                 "发布按钮",
                 timeout=10000
-            )
+            ))
             if not publish_success:
                 return PublishResult(False, error_msg="发布按钮未找到")
 
             # ========== 步骤7: 等待发布结果 ==========
-            success, result = await self._wait_publish_result(page, timeout=20000)
+            success, result = await self._wait_publish_result(page, timeout=20000, outcome=outcome)
             if success:
                 logger.info(f"百家号发布成功: {article.title}")
                 return PublishResult(True, platform_url=result)
@@ -412,12 +429,13 @@ class SohuPublisher(BasePlatformPublisher):
             await asyncio.sleep(1)
 
             # 4. 点击发布按钮
-            publish_success = await self._click_publish(page, self.selectors["publish_button"])
+            publish_success, outcome = await self._submit(
+                page, lambda: self._click_publish(page, self.selectors["publish_button"]))
             if not publish_success:
                 return PublishResult(False, error_msg="发布按钮未找到")
 
             # 5. 等待发布结果
-            success, result = await self._wait_publish_result(page)
+            success, result = await self._wait_publish_result(page, outcome=outcome)
             if success:
                 logger.info(f"搜狐号发布成功: {article.title}")
                 return PublishResult(True, platform_url=result)
@@ -463,12 +481,13 @@ class ToutiaoPublisher(BasePlatformPublisher):
             await asyncio.sleep(2)
 
             # 5. 点击发布按钮
-            publish_success = await self._click_publish(page, self.selectors["publish_button"])
+            publish_success, outcome = await self._submit(
+                page, lambda: self._click_publish(page, self.selectors["publish_button"]))
             if not publish_success:
                 return PublishResult(False, error_msg="发布按钮未找到")
 
             # 6. 等待发布结果
-            success, result = await self._wait_publish_result(page, timeout=20000)
+            success, result = await self._wait_publish_result(page, timeout=20000, outcome=outcome)
             if success:
                 logger.info(f"头条号发布成功: {article.title}")
                 return PublishResult(True, platform_url=result)
@@ -541,6 +560,7 @@ class PublishTask:
                 viewport={"width": 1920, "height": 1080},
                 user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
             )
+            await resource_blocker.apply(context, self.account.platform)
 
             # 3. 加载已保存的 cookies
             if self.account.cookies:
@@ -5,12 +5,12 @@
 """
 
 import asyncio
-import random
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Collection, List, Tuple
 from datetime import datetime
 from loguru import logger
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy import func, or_, update
 from sqlalchemy.orm import Session
 
 # 尝试导入时区，防止环境缺失报错
@@ -19,12 +19,51 @@ try:
 except ImportError:
     timezone = None
 
-from backend.services.geo_article_service import GeoArticleService
+from backend.services.geo_article_service import GeoArticleService, WORKER_ID, publish_claimable, renew_publish_lease
+from backend.services.publish_dispatcher import PublishDispatcher
+from backend.services.index_check_service import IndexCheckService, keyword_check_due
+from backend.database import run_db
+from backend.database.writer import get_db_writer
 from backend.database.models import ScheduledTask, GeoArticle, Project, Keyword
 
 # 🌟 统一日志绑定
 log = logger.bind(module="调度中心")
 
+
+def pending_publish_query(db: Session, now: datetime, limit: int, exclude: Collection[int] = ()):
+    """
+    发布扫描查询：可领取的文章，按计划时间排序（走 ix_geo_articles_publish_queue）
+
+    Args:
+        exclude: 调度器里排队中 / 执行中的文章 ID，不占本轮名额
+    """
+    query = db.query(GeoArticle.id, GeoArticle.platform).filter(publish_claimable(now))
+    if exclude:
+        query = query.filter(GeoArticle.id.notin_(list(exclude)))
+    return query.order_by(GeoArticle.publish_time).limit(limit)
+
+
+# 需要复查的收录状态；用 IN 列举而不是 != "indexed"，复合索引的前两列都能用上
+PENDING_INDEX_STATUSES = ("uncheck", "not_indexed")
+
+
+def pending_index_query(db: Session, now: datetime):
+    """
+    收录扫描查询：已发布、未收录且已到下次检测时间的文章按关键词聚合（走 ix_geo_articles_index_queue）
+
+    每行：(关键词ID, 关键词上次检测时间, 关键词检测间隔, 待检测文章数)
+    """
+    return db.query(
+        Keyword.id, Keyword.last_check_time, Keyword.check_interval_minutes,
+        func.count(GeoArticle.id)
+    ).join(GeoArticle, GeoArticle.keyword_id == Keyword.id).filter(
+        GeoArticle.publish_status == "published",
+        GeoArticle.index_status.in_(PENDING_INDEX_STATUSES),
+        # 🌟 退避：只取已到下次检测时间的文章
+        or_(GeoArticle.next_check_time.is_(None), GeoArticle.next_check_time <= now)
+    ).group_by(Keyword.id)
+
+
 class SchedulerService:
     def __init__(self):
         tz = timezone('Asia/Shanghai') if timezone else None
@@ -38,6 +77,8 @@ class SchedulerService:
             }
         )
         self.db_factory = None
+        # 🌟 有界发布调度器：全局/单平台限流 + 背压
+        self.dispatcher = PublishDispatcher()
 
         # 🌟 任务映射表
         self.task_registry = {
@@ -47,6 +88,7 @@ class SchedulerService:
 
     def set_db_factory(self, db_factory):
         self.db_factory = db_factory
+        self.dispatcher.set_db_factory(db_factory)
 
     def init_default_tasks(self):
         """初始化默认定时扫描任务"""
@@ -144,52 +186,109 @@ class SchedulerService:
     async def check_and_publish_scheduled_articles(self):
         """
         [Job] 自动扫描并发布
+        只按调度器剩余容量取数，交给 PublishDispatcher 限流执行
         """
         if not self.db_factory: return
-        db = self.db_factory()
+
+        # 排队 / 执行中的文章续租：积压排队期间租约不会过期，不会被其他进程当成崩溃接管
+        inflight = self.dispatcher.inflight_ids()
+        if inflight:
+            try:
+                await get_db_writer().write(renew_publish_lease, list(inflight), WORKER_ID)
+            except Exception as e:
+                log.error(f"发布租约续期失败: {e}")
+
+        capacity = self.dispatcher.capacity
+        if capacity <= 0:
+            log.warning(f"⏸️ [发布扫描] 发布队列已满，本轮暂停投递 ({self.dispatcher.stats()})")
+            return
+
         try:
-            now = datetime.now()
-            # 搜索：待发布(scheduled) 或 失败重试(failed 且 次数<3) 且 时间已到
-            pending = db.query(GeoArticle).filter(
-                ((GeoArticle.publish_status == "scheduled") |
-                 ((GeoArticle.publish_status == "failed") & (GeoArticle.retry_count < 3))),
-                GeoArticle.publish_time <= now
-            ).all()
-
-            if pending:
-                log.info(f"🔍 [发布扫描] 发现 {len(pending)} 篇待发布文章，准备触发脚本...")
-                service = GeoArticleService(db)
-                for article in pending:
-                    # 🌟 关键：使用 create_task 异步处理，防止多篇文章发布时互相阻塞
-                    asyncio.create_task(service.execute_publish(article.id))
+            # 🌟 扫描 + 领取放到数据库线程池，不阻塞驱动浏览器的事件循环
+            claimed = await run_db(self._claim_pending, capacity, self.dispatcher.inflight_ids())
+
+            submitted = 0
+            rejected = []
+            for article_id, platform in claimed:
+                if self.dispatcher.submit(article_id, platform, WORKER_ID):
+                    submitted += 1
+                else:
+                    rejected.append(article_id)
+            if rejected:
+                await get_db_writer().write(self._release_claims, rejected)
+
+            if submitted:
+                log.info(f"🔍 [发布扫描] 已领取并投递 {submitted} 篇待发布文章 ({self.dispatcher.stats()})")
         except Exception as e:
             log.error(f"发布 Job 运行异常: {e}")
+
+    def _claim_pending(self, capacity: int, inflight: Collection[int] = ()) -> List[Tuple[int, str]]:
+        """
+        搜索并原子领取待发布文章（同步，在数据库线程池中执行）
+        先领取再投递：随机延迟期间文章已是 claimed，下一轮扫描不会重复领取；
+        调度器里已在排队 / 执行的文章（如租约过期的）不参与查询，避免占满名额饿死新文章
+        """
+        db = self.db_factory()
+        try:
+            # 搜索：待发布 / 失败重试 / 租约过期 且 时间已到
+            pending = pending_publish_query(db, datetime.now(), capacity, inflight).all()
+            service = GeoArticleService(db)
+            return [(a.id, a.platform) for a in pending if service.claim_for_publish(a.id, WORKER_ID)]
         finally:
             db.close()
 
+    @staticmethod
+    def _release_claims(db: Session, article_ids: List[int]):
+        """调度器拒收的文章退回待发布状态（单写者队列中执行，一个事务退回整批）"""
+        db.execute(
+            update(GeoArticle)
+            .where(GeoArticle.id.in_(article_ids),
+                   GeoArticle.publish_status == "claimed",
+                   GeoArticle.lease_owner == WORKER_ID)
+            .values(publish_status="scheduled", lease_owner=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+
     async def auto_check_indexing_job(self):
         """
         [Job] 自动监测收录
+        待检测文章按关键词归并，每个关键词（各 AI 平台）只检测一次，结论扇出到所有文章；
+        文章的下次检测时间由 BackoffPolicy 按连续未命中次数递增
         """
         if not self.db_factory: return
-        db = self.db_factory()
+        now = datetime.now()
         try:
-            # 搜索：已发布 但 未被确认收录的文章
-            pending = db.query(GeoArticle).filter(
-                GeoArticle.publish_status == "published",
-                GeoArticle.index_status != "indexed"
-            ).all()
-
-            if pending:
-                log.info(f"📡 [收录扫描] 发现 {len(pending)} 篇已发布文章需要检测效果...")
-                service = GeoArticleService(db)
-                for article in pending:
-                    asyncio.create_task(service.check_article_index(article.id))
+            # 搜索：已发布 但 未被确认收录的文章，按关键词聚合
+            rows = await run_db(self._pending_index_rows, now)
         except Exception as e:
             log.error(f"监测 Job 运行异常: {e}")
+            return
+
+        due = [r for r in rows if keyword_check_due(r[1], r[2], now)]
+        if not due:
+            return
+
+        log.info(f"📡 [收录扫描] {sum(r[3] for r in due)} 篇已发布文章归并为 {len(due)} 个关键词待检测"
+                 f"（{len(rows) - len(due)} 个关键词未到检测间隔）")
+        await asyncio.gather(*[self._check_keyword(r[0]) for r in due])
+
+    def _pending_index_rows(self, now: datetime) -> List[Tuple]:
+        db = self.db_factory()
+        try:
+            return [tuple(r) for r in pending_index_query(db, now).all()]
         finally:
             db.close()
 
+    async def _check_keyword(self, keyword_id: int):
+        """单个关键词检测，使用独立数据库会话"""
+        db = self.db_factory()
+        try:
+            await IndexCheckService(db).check_keyword(keyword_id)
+        except Exception as e:
+            log.error(f"关键词 {keyword_id} 收录检测异常: {e}")
+        finally:
+            await run_db(db.close)
+
 # 单例模式
 _instance = SchedulerService()
 
@@ -1,41 +1,261 @@
 # backend/services/websocket_manager.py
-from typing import Dict
+import asyncio
+import json
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 from fastapi import WebSocket
 from loguru import logger
 
+from backend.config import WS_LOG_BUFFER_SIZE, WS_LOG_FLUSH_INTERVAL_MS, WS_CLIENT_QUEUE_SIZE, WS_SEND_TIMEOUT
+
+
+def topic_of(message: dict) -> Optional[str]:
+    """
+    推断消息所属主题，None 表示发给所有客户端
+
+    主题格式：log:<模块>、publish:<任务ID>、auth:<任务ID>、generate:<任务ID>、alert
+    """
+    msg_type = message.get("type") or ""
+    if msg_type.startswith("publish_"):
+        task_id = message.get("task_id")
+        return f"publish:{task_id}" if task_id else "publish"
+    if msg_type.startswith("auth_"):
+        task_id = message.get("task_id")
+        return f"auth:{task_id}" if task_id else "auth"
+    if msg_type.startswith("generate_"):
+        task_id = message.get("task_id")
+        return f"generate:{task_id}" if task_id else "generate"
+    if msg_type == "seo_alert":
+        return "alert"
+    return None
+
+
+class ClientConnection:
+    """
+    单个客户端连接：自带有界发送队列、发送协程和订阅主题
+
+    广播只负责入队，不等待网络；队列满时丢弃最旧的消息，慢客户端不会拖慢其他人。
+    订阅 "publish" 这类不带 ID 的主题表示订阅该类的全部消息；未订阅过的客户端默认接收全部（"*"）。
+    """
+
+    def __init__(self, websocket: WebSocket, client_id: str, queue_size: int = WS_CLIENT_QUEUE_SIZE,
+                 topics: Optional[Iterable[str]] = None):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.sender: Optional[asyncio.Task] = None
+        self.topics: Set[str] = set(topics) if topics else {"*"}
+
+    def watches(self, topic: Optional[str]) -> bool:
+        if topic is None or "*" in self.topics or topic in self.topics:
+            return True
+        return topic.split(":", 1)[0] in self.topics
+
+    def subscribe(self, topics: Iterable[str]):
+        # 第一次显式订阅时取消默认的全量接收
+        self.topics.discard("*")
+        self.topics.update(t for t in topics if t)
+
+    def unsubscribe(self, topics: Iterable[str]):
+        self.topics.difference_update(topics)
+
+    def enqueue(self, message: str) -> bool:
+        """入队一条已序列化的消息，返回是否因积压丢弃了旧消息"""
+        dropped = False
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            dropped = True
+        self.queue.put_nowait(message)
+        return dropped
+
+
 class ConnectionManager:
     def __init__(self):
-        # 存储活跃的连接 {client_id: WebSocket}
-        self.active_connections: Dict[str, WebSocket] = {}
+        # 存储活跃的连接 {client_id: ClientConnection}
+        self.active_connections: Dict[str, ClientConnection] = {}
+        # 🌟 日志环形缓冲区：sink 只往这里追加，由定时任务批量推送
+        self._log_buffer: deque = deque(maxlen=WS_LOG_BUFFER_SIZE)
+        self._log_flusher: Optional[asyncio.Task] = None
+        self._stats = {"dropped": 0, "log_dropped": 0, "disconnected_slow": 0}
 
-    async def connect(self, websocket: WebSocket, client_id: str):
-        """接受连接"""
+    async def connect(self, websocket: WebSocket, client_id: str, topics: Optional[Iterable[str]] = None):
+        """接受连接，可在连接时带上初始订阅主题"""
         await websocket.accept()
-        self.active_connections[client_id] = websocket
+        old = self.active_connections.pop(client_id, None)
+        if old and old.sender:
+            old.sender.cancel()
+        client = ClientConnection(websocket, client_id, topics=topics)
+        client.sender = asyncio.create_task(self._send_loop(client), name=f"ws-send-{client_id}")
+        self.active_connections[client_id] = client
         logger.info(f"WebSocket连接建立: {client_id}")
 
     def disconnect(self, client_id: str):
         """断开连接"""
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
+        client = self.active_connections.pop(client_id, None)
+        if client:
+            if client.sender and client.sender is not asyncio.current_task():
+                client.sender.cancel()
             logger.info(f"WebSocket连接断开: {client_id}")
 
+    def subscribe(self, client_id: str, topics: Iterable[str]):
+        client = self.active_connections.get(client_id)
+        if client:
+            client.subscribe(topics)
+
+    def unsubscribe(self, client_id: str, topics: Iterable[str]):
+        client = self.active_connections.get(client_id)
+        if client:
+            client.unsubscribe(topics)
+
+    def handle_client_message(self, client_id: str, text: str):
+        """
+        处理客户端发来的控制消息：
+        {"action": "subscribe" | "unsubscribe", "topics": [...]}，其他内容（心跳等）忽略
+        """
+        try:
+            data = json.loads(text)
+        except (TypeError, ValueError):
+            return
+        if not isinstance(data, dict):
+            return
+        topics = [str(t) for t in data.get("topics") or []]
+        if data.get("action") == "subscribe":
+            self.subscribe(client_id, topics)
+        elif data.get("action") == "unsubscribe":
+            self.unsubscribe(client_id, topics)
+
     async def send_personal(self, message: dict, client_id: str):
         """🌟 补全此方法：发送消息给指定客户端"""
-        if client_id in self.active_connections:
-            try:
-                await self.active_connections[client_id].send_json(message)
-            except Exception as e:
-                logger.error(f"发送个人消息失败: {e}")
+        client = self.active_connections.get(client_id)
+        if client:
+            self._enqueue(client, self._dumps(message))
+
+    async def broadcast(self, message: dict, topic: Optional[str] = None):
+        """
+        广播消息给订阅了该主题的客户端（只入队，立即返回）
+        不传 topic 时按消息类型推断；消息只序列化一次
+        """
+        topic = topic if topic is not None else topic_of(message)
+        targets = [c for c in self.active_connections.values() if c.watches(topic)]
+        if not targets:
+            return
+        text = self._dumps(message)
+        for client in targets:
+            self._enqueue(client, text)
+
+    def _enqueue(self, client: ClientConnection, text: str):
+        if client.enqueue(text):
+            self._stats["dropped"] += 1
+
+    @staticmethod
+    def _dumps(message: dict) -> str:
+        return json.dumps(message, ensure_ascii=False, default=str)
 
-    async def broadcast(self, message: dict):
-        """广播消息给所有客户端"""
-        for connection in list(self.active_connections.values()):
+    async def _send_loop(self, client: ClientConnection):
+        """逐条发送某个客户端队列里的消息；发送超时或失败则断开该客户端"""
+        while True:
+            message = await client.queue.get()
             try:
-                await connection.send_json(message)
+                await asyncio.wait_for(client.websocket.send_text(message), timeout=WS_SEND_TIMEOUT)
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                self._stats["disconnected_slow"] += 1
+                logger.warning(f"WebSocket客户端发送超时，已断开: {client.client_id}")
+                # 1013 Try Again Later：让前端感知断开并重连，而不是挂着一个不再收消息的连接
+                await self._close_client(client, 1013, "send timeout")
+                return
             except Exception:
-                # 忽略已经失效的连接
-                pass
+                # 连接已经失效
+                await self._close_client(client, 1011, "send failed")
+                return
+
+    async def _close_client(self, client: ClientConnection, code: int, reason: str):
+        """服务端主动断开：移出连接表（已被同 ID 新连接替换的不动）并关闭底层连接"""
+        if self.active_connections.get(client.client_id) is client:
+            self.disconnect(client.client_id)
+        try:
+            await asyncio.wait_for(client.websocket.close(code=code, reason=reason), timeout=WS_SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
+
+    # ==================== 实时日志 ====================
+
+    def push_log(self, payload: Dict[str, Any]):
+        """
+        日志入环形缓冲区（可在任意线程调用，不创建任何协程）
+        缓冲区满时最旧的日志被覆盖
+        """
+        if len(self._log_buffer) == self._log_buffer.maxlen:
+            self._stats["log_dropped"] += 1
+        self._log_buffer.append(payload)
+
+    def _drain_logs(self) -> List[Dict[str, Any]]:
+        logs = []
+        while self._log_buffer:
+            try:
+                logs.append(self._log_buffer.popleft())
+            except IndexError:
+                break
+        return logs
+
+    async def _flush_logs_loop(self):
+        interval = WS_LOG_FLUSH_INTERVAL_MS / 1000
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush_logs()
+
+    async def flush_logs(self):
+        """
+        把缓冲区里的日志合并成一帧推送
+        每个客户端只收到它订阅的模块；订阅范围相同的客户端共用同一份序列化结果
+        """
+        if not self._log_buffer:
+            return
+        logs = self._drain_logs()
+        if not self.active_connections:
+            return
+
+        modules = list(dict.fromkeys(log.get("module") or "系统" for log in logs))
+        frames: Dict[Tuple[str, ...], str] = {}
+        for client in list(self.active_connections.values()):
+            watched = tuple(m for m in modules if client.watches(f"log:{m}"))
+            if not watched:
+                continue
+            if watched not in frames:
+                selected = set(watched)
+                frames[watched] = self._dumps({
+                    "type": "log_batch",
+                    "logs": [log for log in logs if (log.get("module") or "系统") in selected],
+                })
+            self._enqueue(client, frames[watched])
+
+    def start_log_flusher(self):
+        """启动日志批量推送任务（必须在事件循环中调用）"""
+        if self._log_flusher is None or self._log_flusher.done():
+            self._log_flusher = asyncio.create_task(self._flush_logs_loop(), name="ws-log-flusher")
+
+    async def stop(self):
+        """停止日志推送与所有发送协程"""
+        tasks = [c.sender for c in self.active_connections.values() if c.sender]
+        if self._log_flusher:
+            tasks.append(self._log_flusher)
+            self._log_flusher = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "clients": len(self.active_connections),
+            "log_buffered": len(self._log_buffer),
+            "dropped_by_client": {cid: c.dropped for cid, c in self.active_connections.items()},
+        }
 
 # 创建全局单例
-ws_manager = ConnectionManager()
\ No newline at end of file
+ws_manager = ConnectionManager()
@@ -40,7 +40,7 @@ export function useWebSocket(url?: string) {
     }
     handlers.get(type)!.add(handler)
 
-    // 同时在服务层订阅
+    // 同时在服务层订阅（服务层会一并订阅该消息类型对应的服务端主题）
     const unsubscribe = wsService.on(type, handler)
 
     // 返回取消订阅函数
@@ -84,6 +84,8 @@ export function useWebSocket(url?: string) {
     disconnect,
     send,
     on,
+    subscribe: wsService.subscribe,
+    unsubscribe: wsService.unsubscribe,
     onPublishProgress,
     onPublishComplete,
     onAuthComplete,
@@ -113,6 +113,12 @@ export const geoArticleApi = {
   // 生成文章 (5分钟超时)
   generate: (data: { keyword_id: number; platform: string; company_name?: string }) => 
     post('/geo/generate', data, { timeout: 300000 }),
+
+  // 批量生成：按项目或关键词列表，进度通过 WebSocket 主题 generate:<task_id> 推送
+  generateBulk: (data: { project_id?: number; keyword_ids?: number[]; platform?: string; company_name?: string; concurrency?: number }) =>
+    post('/geo/generate/bulk', data),
+
+  getBulkProgress: (taskId: string) => get(`/geo/generate/bulk/${taskId}`),
     
   // 质检
   checkQuality: (id: number) => post(`/geo/articles/${id}/check-quality`),
@@ -9,6 +9,19 @@ import { ElMessage } from 'element-plus'
 type MessageHandler = (data: any) => void
 type ConnectionStatus = 'connecting' | 'connected' | 'disconnected' | 'error'
 
+/**
+ * 消息类型对应的服务端主题（与后端 websocket_manager.topic_of 一致）
+ * 返回 null 的消息服务端会发给所有客户端，不需要订阅；'*' 表示全部消息（含日志）
+ */
+function topicOf(type: string): string | null {
+  if (type === '*') return '*'
+  if (type.startsWith('publish_')) return 'publish'
+  if (type.startsWith('auth_')) return 'auth'
+  if (type.startsWith('generate_')) return 'generate'
+  if (type === 'seo_alert') return 'alert'
+  return null
+}
+
 class WebSocketService {
   private ws: WebSocket | null = null
   private url: string = ''
@@ -17,6 +30,8 @@ class WebSocketService {
   private maxReconnectAttempts: number = 5
   private reconnectDelay: number = 3000
   private handlers: Map<string, Set<MessageHandler>> = new Map()
+  // 订阅的主题（log / log:<模块>、publish / publish:<任务ID>、auth / auth:<任务ID>、generate / generate:<任务ID>、alert），重连后自动补发
+  private topics: Set<string> = new Set()
 
   // 连接状态
   public status = ref<ConnectionStatus>('disconnected')
@@ -44,12 +59,20 @@ class WebSocketService {
         this.status.value = 'connected'
         this.reconnectAttempts = 0
         console.log('WebSocket 连接成功')
+        if (this.topics.size) {
+          this.send({ action: 'subscribe', topics: [...this.topics] })
+        }
       }
 
       this.ws.onmessage = (event) => {
         try {
           const data = JSON.parse(event.data)
-          this.handleMessage(data)
+          // 后端每 100ms 把日志合并成一帧 log_batch，这里拆回单条日志分发
+          if (data.type === 'log_batch') {
+            (data.logs || []).forEach((log: any) => this.handleMessage(log))
+          } else {
+            this.handleMessage(data)
+          }
         } catch (e) {
           console.error('解析 WebSocket 消息失败:', e)
         }
@@ -103,6 +126,26 @@ class WebSocketService {
     }
   }
 
+  /**
+   * 订阅服务端主题，后端只推送已订阅的消息
+   */
+  subscribe(topics: string[]) {
+    topics.forEach(t => this.topics.add(t))
+    if (this.ws?.readyState === WebSocket.OPEN) {
+      this.send({ action: 'subscribe', topics })
+    }
+  }
+
+  /**
+   * 取消订阅服务端主题
+   */
+  unsubscribe(topics: string[]) {
+    topics.forEach(t => this.topics.delete(t))
+    if (this.ws?.readyState === WebSocket.OPEN) {
+      this.send({ action: 'unsubscribe', topics })
+    }
+  }
+
   /**
    * 订阅消息
    */
@@ -112,6 +155,13 @@ class WebSocketService {
     }
     this.handlers.get(type)!.add(handler)
 
+    // 服务端在第一次显式订阅后不再全量推送，所以每个监听的消息类型都要订阅对应主题，
+    // 否则某个页面订阅了 publish 之后，其他页面监听的 auth / alert 等消息就收不到了
+    const topic = topicOf(type)
+    if (topic && !this.topics.has(topic)) {
+      this.subscribe([topic])
+    }
+
     // 返回取消订阅函数
     return () => this.off(type, handler)
   }
@@ -183,6 +233,14 @@ export function useWebSocket(url?: string) {
     return wsService.on(type, handler)
   }
 
+  const subscribe = (topics: string[]) => {
+    wsService.subscribe(topics)
+  }
+
+  const unsubscribe = (topics: string[]) => {
+    wsService.unsubscribe(topics)
+  }
+
   const status = wsService.status
 
   // 组件卸载时断开连接
@@ -196,6 +254,8 @@ export function useWebSocket(url?: string) {
     disconnect,
     send,
     on,
+    subscribe,
+    unsubscribe,
   }
 }
 
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+GEO文章列表测试
+验证摘要视图不加载大字段、键集分页、筛选和 ETag 协商
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.api.geo import list_articles
+from backend.database import Base
+from backend.database.models import Project, Keyword, GeoArticle
+
+
+@pytest.fixture()
+def memory_db():
+    """独立的内存数据库，记录执行过的 SQL"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    session = sessionmaker(bind=engine)()
+    project = Project(name="列表测试", company_name="测试公司")
+    session.add(project)
+    session.flush()
+    keyword = Keyword(project_id=project.id, keyword="测试词")
+    session.add(keyword)
+    session.flush()
+    base = datetime(2024, 1, 1)
+    for i in range(12):
+        session.add(GeoArticle(
+            keyword_id=keyword.id, title=f"文章{i}", content="正文" * 2000,
+            publish_logs="日志" * 500, index_details="{}",
+            platform="zhihu" if i % 2 else "toutiao",
+            publish_status="published" if i % 3 == 0 else "draft",
+            created_at=base + timedelta(minutes=i // 2),  # 两两同一时间，靠 id 区分
+        ))
+    session.commit()
+    try:
+        yield session, statements
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _list(db, **kwargs):
+    params = dict(limit=100, view="full", status=None, platform=None, keyword_id=None,
+                  cursor=None, if_none_match=None)
+    params.update(kwargs)
+    return list_articles(db=db, **params)
+
+
+@pytest.mark.geo
+class TestArticleList:
+    """文章列表测试类"""
+
+    def test_summary_skips_large_columns(self, memory_db):
+        """摘要视图的 SQL 不查询正文/日志/收录详情，返回体也不含这些字段"""
+        db, statements = memory_db
+        statements.clear()
+
+        response = _list(db, view="summary")
+        rows = json.loads(response.body)
+
+        assert len(rows) == 12
+        assert len(statements) == 2  # ETag 版本查询 + 摘要行查询
+        assert all("content" not in sql and "publish_logs" not in sql for sql in statements)
+        assert "content" not in rows[0] and "index_details" not in rows[0]
+
+    def test_cursor_pagination_and_filters(self, memory_db):
+        """按游标翻页不重不漏，筛选条件在翻页时保持"""
+        db, _ = memory_db
+        seen, cursor = [], None
+        while True:
+            response = _list(db, view="summary", limit=2, platform="zhihu", cursor=cursor)
+            seen.extend(row["id"] for row in json.loads(response.body))
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        expected = [a.id for a in db.query(GeoArticle).filter(GeoArticle.platform == "zhihu").order_by(
+            GeoArticle.created_at.desc(), GeoArticle.id.desc())]
+        assert seen == expected
+        assert len(json.loads(_list(db, status="published").body)) == 4
+
+    def test_etag_not_modified(self, memory_db):
+        """内容未变时 If-None-Match 命中返回 304，变化后 ETag 随之改变"""
+        db, _ = memory_db
+        etag = _list(db, view="summary").headers["ETag"]
+
+        assert _list(db, view="summary", if_none_match=etag).status_code == 304
+
+        article = db.query(GeoArticle).first()
+        article.publish_status = "scheduled"
+        db.commit()
+
+        response = _list(db, view="summary", if_none_match=etag)
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_not_modified_skips_row_load(self, memory_db):
+        """304 只执行一次窄列版本查询，不加载正文等字段"""
+        db, statements = memory_db
+        etag = _list(db, view="full", limit=5).headers["ETag"]
+        statements.clear()
+
+        response = _list(db, view="full", limit=5, if_none_match=etag)
+
+        assert response.status_code == 304
+        assert response.headers["X-Next-Cursor"]
+        assert len(statements) == 1
+        assert "content" not in statements[0] and "title" not in statements[0]
+        assert _list(db, view="summary", limit=5, if_none_match=etag).status_code == 200
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+批量生成测试
+确保占位文章一次插入、超限或未知关键词直接拒绝、n8n 调用受并发上限约束、结果逐篇回填并汇报进度
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import backend.database.writer as writer_module
+from backend.api import geo as geo_api
+from backend.api.geo import BulkGenerateRequest, _create_placeholders
+from backend.database import Base
+from backend.database.models import Project, Keyword, GeoArticle
+from backend.database.writer import DBWriter
+from backend.services import geo_article_service
+from backend.services.geo_article_service import generate_bulk
+from backend.services.n8n_service import N8nResponse
+
+
+class FakeN8n:
+    """替代 n8n：记录同时在途的请求数，指定关键词返回失败"""
+
+    def __init__(self, fail_keywords=()):
+        self.fail_keywords = set(fail_keywords)
+        self.active = 0
+        self.peak = 0
+
+    async def generate_geo_article(self, keyword, platform="zhihu", requirements="", word_count=1200):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            self.active -= 1
+        if keyword in self.fail_keywords:
+            return N8nResponse(status="error", error="生成失败")
+        return N8nResponse(status="success", data={"title": f"{keyword}标题", "content": "正文"})
+
+
+@pytest.fixture()
+def memory_db(monkeypatch):
+    """独立的内存数据库，单写者队列也写入这里"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    session = factory()
+    project = Project(name="批量测试", company_name="测试公司")
+    session.add(project)
+    session.flush()
+    for i in range(10):
+        session.add(Keyword(project_id=project.id, keyword=f"词{i}"))
+    session.commit()
+
+    writer = DBWriter(factory, batch_window_ms=0)
+    monkeypatch.setattr(writer_module, "get_db_writer", lambda: writer)
+    try:
+        yield session, project
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.mark.geo
+class TestBulkGenerate:
+    """批量生成测试类"""
+
+    def test_placeholders_created_for_project(self, memory_db):
+        """按项目取全部关键词，每个关键词一篇 generating 占位文章"""
+        db, project = memory_db
+        items = _create_placeholders(db, BulkGenerateRequest(project_id=project.id))
+        assert len(items) == 10
+        assert items[0]["company_name"] == "测试公司"
+        assert db.query(GeoArticle).filter(GeoArticle.publish_status == "generating").count() == 10
+
+    def test_rejects_oversized_or_unknown_requests(self, memory_db, monkeypatch):
+        """超过单次上限、或指定了不存在的关键词时返回 400，不插入任何占位文章"""
+        db, project = memory_db
+        monkeypatch.setattr(geo_api, "GENERATE_BULK_MAX", 5)
+        with pytest.raises(HTTPException, match="5") as oversized:
+            _create_placeholders(db, BulkGenerateRequest(project_id=project.id))
+
+        ids = [kw.id for kw in db.query(Keyword).limit(2)]
+        with pytest.raises(HTTPException, match=r"\[9998, 9999\]") as unknown:
+            _create_placeholders(db, BulkGenerateRequest(keyword_ids=ids + [9999, 9998]))
+
+        assert oversized.value.status_code == unknown.value.status_code == 400
+        assert db.query(GeoArticle).count() == 0
+
+    def test_progress_callback_error_does_not_abort(self, memory_db, monkeypatch):
+        """进度回调抛异常时其余文章照常生成并回填"""
+        db, project = memory_db
+        fake = FakeN8n()
+
+        async def fake_get_n8n_service():
+            return fake
+
+        async def broken_progress(progress):
+            raise ConnectionError("websocket closed")
+
+        monkeypatch.setattr(geo_article_service, "get_n8n_service", fake_get_n8n_service)
+        items = _create_placeholders(db, BulkGenerateRequest(project_id=project.id))
+
+        result = asyncio.run(generate_bulk(items, "zhihu", concurrency=3, on_progress=broken_progress))
+
+        assert result == {"total": 10, "completed": 10, "succeeded": 10, "failed": 0}
+        db.expire_all()
+        assert db.query(GeoArticle).filter(GeoArticle.publish_status == "scheduled").count() == 10
+
+    def test_bounded_concurrency_and_progress(self, memory_db, monkeypatch):
+        """并发不超过上限，成功/失败逐篇回填，进度回调覆盖每一篇"""
+        db, project = memory_db
+        fake = FakeN8n(fail_keywords={"词3"})
+
+        async def fake_get_n8n_service():
+            return fake
+
+        monkeypatch.setattr(geo_article_service, "get_n8n_service", fake_get_n8n_service)
+        items = _create_placeholders(db, BulkGenerateRequest(project_id=project.id, company_name="指定公司"))
+        assert items[0]["company_name"] == "指定公司"
+
+        updates = []
+
+        async def on_progress(progress):
+            updates.append(progress)
+
+        result = asyncio.run(generate_bulk(items, "zhihu", concurrency=3, on_progress=on_progress))
+
+        assert fake.peak == 3
+        assert result == {"total": 10, "completed": 10, "succeeded": 9, "failed": 1}
+        assert [u["completed"] for u in updates] == list(range(1, 11))
+        db.expire_all()
+        assert db.query(GeoArticle).filter(GeoArticle.publish_status == "scheduled").count() == 9
+        failed = db.query(GeoArticle).filter(GeoArticle.publish_status == "failed").one()
+        assert failed.error_msg == "生成失败"
+
+    def test_concurrency_clamped_to_config(self, memory_db, monkeypatch):
+        """请求的并发数超过配置上限时按上限执行"""
+        db, project = memory_db
+        fake = FakeN8n()
+
+        async def fake_get_n8n_service():
+            return fake
+
+        monkeypatch.setattr(geo_article_service, "get_n8n_service", fake_get_n8n_service)
+        monkeypatch.setattr(geo_article_service, "GENERATE_BULK_CONCURRENCY", 2)
+        items = _create_placeholders(db, BulkGenerateRequest(project_id=project.id))
+
+        asyncio.run(generate_bulk(items, "zhihu", concurrency=100))
+        assert fake.peak == 2
+
+    def test_failed_write_marks_article_failed(self, memory_db, monkeypatch):
+        """回填写入失败时占位文章改为 failed，不会停留在 generating"""
+        db, project = memory_db
+        fake = FakeN8n()
+
+        async def fake_get_n8n_service():
+            return fake
+
+        items = _create_placeholders(db, BulkGenerateRequest(project_id=project.id))
+        broken_id = items[0]["article_id"]
+        apply_generated = geo_article_service._apply_generated
+
+        def flaky_apply(session, article_id, fields):
+            if article_id == broken_id and fields["publish_status"] == "scheduled":
+                raise RuntimeError("database is locked")
+            apply_generated(session, article_id, fields)
+
+        monkeypatch.setattr(geo_article_service, "get_n8n_service", fake_get_n8n_service)
+        monkeypatch.setattr(geo_article_service, "_apply_generated", flaky_apply)
+
+        result = asyncio.run(generate_bulk(items, "zhihu"))
+
+        assert result["failed"] == 1 and result["succeeded"] == 9
+        db.expire_all()
+        broken = db.get(GeoArticle, broken_id)
+        assert broken.publish_status == "failed"
+        assert "回填失败" in broken.error_msg
+        assert db.query(GeoArticle).filter(GeoArticle.publish_status == "generating").count() == 0
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+知识库全文检索测试
+验证 FTS5 索引随增删改同步、bm25 排序、片段高亮和短词 LIKE 回退
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import backend.database as database
+from backend.api.knowledge import search_knowledge
+from backend.database import Base
+from backend.database.fts import KNOWLEDGE_FTS_SQL, KNOWLEDGE_FTS_VERSION, rebuild_knowledge_fts, trigram_supported
+from backend.database.models import KnowledgeCategory, Knowledge
+
+
+@pytest.fixture()
+def memory_db():
+    """独立的内存数据库，建好全文索引"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for sql in KNOWLEDGE_FTS_SQL:
+            conn.execute(text(sql))
+    session = sessionmaker(bind=engine)()
+    category = KnowledgeCategory(name="产品资料")
+    session.add(category)
+    session.flush()
+    session.add_all([
+        Knowledge(category_id=category.id, title="售后服务政策", content="本公司提供三年质保，全国联保。"),
+        Knowledge(category_id=category.id, title="公司简介", content="专注工业机器人研发，售后服务网点覆盖全国。"),
+        Knowledge(category_id=category.id, title="价格说明", content="标准版与专业版的区别。"),
+    ])
+    session.commit()
+    try:
+        yield session, category
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _search(db, keyword, **kwargs):
+    params = dict(category_id=None, limit=50)
+    params.update(kwargs)
+    return search_knowledge(keyword=keyword, db=db, **params)
+
+
+@pytest.mark.geo
+class TestKnowledgeSearch:
+    """知识库检索测试类"""
+
+    def test_ranked_with_snippet(self, memory_db):
+        """标题命中排在正文命中之前，片段带高亮"""
+        db, _ = memory_db
+        results = _search(db, "售后服务")
+
+        assert [r.title for r in results] == ["售后服务政策", "公司简介"]
+        assert "<mark>" in results[1].snippet
+        assert results[0].rank <= results[1].rank
+
+    def test_index_follows_writes(self, memory_db):
+        """新增、修改、删除后索引同步"""
+        db, category = memory_db
+        item = Knowledge(category_id=category.id, title="交付周期", content="现货订单48小时内发货")
+        db.add(item)
+        db.commit()
+        assert [r.id for r in _search(db, "小时内发货")] == [item.id]
+
+        item.content = "定制订单需要两周"
+        db.commit()
+        assert _search(db, "小时内发货") == []
+        assert [r.id for r in _search(db, "定制订单")] == [item.id]
+
+        db.delete(item)
+        db.commit()
+        assert _search(db, "定制订单") == []
+
+    def test_short_terms_fall_back_to_like(self, memory_db):
+        """不足 3 个字的查询走 LIKE；与长词混用时作为附加过滤"""
+        db, _ = memory_db
+        assert {r.title for r in _search(db, "价格")} == {"价格说明"}
+        assert [r.title for r in _search(db, "售后服务 质保")] == ["售后服务政策"]
+
+    def test_rebuild_backfills_existing_rows(self, memory_db):
+        """索引被清空后重建可恢复检索"""
+        db, _ = memory_db
+        db.execute(text("INSERT INTO knowledge_fts(knowledge_fts) VALUES ('delete-all')"))
+        db.commit()
+        assert _search(db, "工业机器人") == []
+
+        assert rebuild_knowledge_fts(db.connection()) == 3
+        db.commit()
+        assert [r.title for r in _search(db, "工业机器人")] == ["公司简介"]
+        versions = [row[0] for row in db.execute(text("SELECT version FROM schema_migrations"))]
+        assert versions == [KNOWLEDGE_FTS_VERSION]  # 启动时不再重复执行建索引迁移
+
+    def test_rebuild_skipped_without_trigram(self, monkeypatch):
+        """SQLite 不支持 trigram 时手工重建同样跳过，不建表也不记录迁移"""
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        monkeypatch.setattr(database, "MIGRATION_REQUIREMENTS",
+                            {KNOWLEDGE_FTS_VERSION: (lambda conn: False, "测试：不支持 trigram")})
+        try:
+            with engine.begin() as conn:
+                assert rebuild_knowledge_fts(conn) is None
+                assert not conn.execute(text(
+                    "SELECT name FROM sqlite_master WHERE name IN ('knowledge_fts', 'schema_migrations')")).first()
+        finally:
+            engine.dispose()
+
+    def test_migration_skipped_without_trigram(self, monkeypatch):
+        """SQLite 不支持 trigram 时跳过全文索引迁移（不记录），其余迁移照常，检索退回 LIKE"""
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        monkeypatch.setattr(database, "engine", engine)
+        monkeypatch.setattr(database, "MIGRATION_REQUIREMENTS", {5: (lambda conn: False, "测试：不支持 trigram")})
+        try:
+            database._run_migrations()
+            with engine.connect() as conn:
+                versions = [row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))]
+                assert trigram_supported(conn)  # 探测本身不留下临时表
+                assert not conn.execute(text(
+                    "SELECT name FROM sqlite_master WHERE name = 'knowledge_fts'")).first()
+            assert versions == [v for v, _, _ in database.MIGRATIONS if v != 5]
+
+            db = sessionmaker(bind=engine)()
+            category = KnowledgeCategory(name="产品资料")
+            db.add(category)
+            db.flush()
+            db.add(Knowledge(category_id=category.id, title="售后服务政策", content="本公司提供三年质保。"))
+            db.commit()
+            assert [r.title for r in _search(db, "售后服务")] == ["售后服务政策"]
+            db.close()
+        finally:
+            engine.dispose()
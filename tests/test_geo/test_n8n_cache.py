@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+n8n 响应缓存测试
+确保相同请求命中缓存、文章生成不缓存、问题生成默认不缓存、可强制跳过缓存、超限按最近命中淘汰
+"""
+
+import asyncio
+
+import pytest
+
+from backend.services.n8n_service import N8nConfig, N8nResponse, N8nResponseCache, N8nService
+
+
+class CachedConfig(N8nConfig):
+    CACHE_ENABLED = True
+    CACHE_MAX_ENTRIES = 3
+    CACHE_TTL = {**N8nConfig.CACHE_TTL, **N8nConfig.GENERATION_CACHE_TTL}  # 相当于 N8N_CACHE_GENERATION=1
+
+
+def _service(config, tmp_path, monkeypatch):
+    config.CACHE_PATH = tmp_path / "n8n_cache.db"
+    svc = N8nService(config)
+    calls = []
+
+    async def fake_post(endpoint, payload, timeout=None):
+        calls.append(endpoint)
+        return N8nResponse(status="success", data={"n": len(calls)})
+
+    monkeypatch.setattr(svc, "_post_webhook", fake_post)
+    return svc, calls
+
+
+@pytest.fixture()
+def service(tmp_path, monkeypatch):
+    """缓存文件放在临时目录，底层请求替换为计数桩"""
+    svc, calls = _service(CachedConfig(), tmp_path, monkeypatch)
+    yield svc, calls
+    svc.cache.close()
+
+
+@pytest.mark.geo
+class TestN8nCache:
+    """n8n 响应缓存测试类"""
+
+    def test_identical_payload_hits_cache(self, service):
+        """语义相同的请求（键顺序、首尾空白不同）只请求一次"""
+        svc, calls = service
+
+        async def run():
+            first = await svc.generate_questions("  SEO优化 ", 5)
+            second = await svc.generate_questions("SEO优化", 5)
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert calls == ["generate-questions"]
+        assert second.data == first.data
+        assert N8nResponseCache.make_key("e", {"a": 1, "b": " x"}) == N8nResponseCache.make_key("e", {"b": "x", "a": 1})
+        stats = svc.cache_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+
+    def test_article_generation_not_cached(self, service):
+        """文章生成没有配置 TTL，每次都请求"""
+        svc, calls = service
+
+        async def run():
+            await svc.generate_geo_article("SEO优化")
+            await svc.generate_geo_article("SEO优化")
+
+        asyncio.run(run())
+        assert calls == ["geo-article-generate", "geo-article-generate"]
+        assert svc.cache.size() == 0
+
+    def test_generation_not_cached_by_default(self, tmp_path, monkeypatch):
+        """默认配置下再次生成问题 / 蒸馏关键词都会重新请求，拿到新的一批结果"""
+        config = N8nConfig()
+        config.CACHE_ENABLED = True
+        svc, calls = _service(config, tmp_path, monkeypatch)
+
+        async def run():
+            first = await svc.generate_questions("SEO优化", 5)
+            second = await svc.generate_questions("SEO优化", 5)
+            await svc.distill_keywords(["公司:A"])
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert calls == ["generate-questions", "generate-questions", "keyword-distill"]
+        assert first.data != second.data
+        assert svc.cache.size() == 0
+        assert svc.cache_stats() == {"enabled": True, "hits": 0, "misses": 0, "bypassed": 0,
+                                     "stores": 0, "evictions": 0}
+        svc.cache.close()
+
+    def test_bypass_refreshes_entry(self, service):
+        """use_cache=False 强制重新请求，并用新结果覆盖缓存"""
+        svc, calls = service
+
+        async def run():
+            await svc.distill_keywords(["公司:A"])
+            fresh = await svc.distill_keywords(["公司:A"], use_cache=False)
+            cached = await svc.distill_keywords(["公司:A"])
+            return fresh, cached
+
+        fresh, cached = asyncio.run(run())
+        assert len(calls) == 2
+        assert cached.data == fresh.data == {"n": 2}
+        assert svc.cache_stats()["bypassed"] == 1
+
+    def test_size_bounded_eviction(self, tmp_path):
+        """超过容量时淘汰最久未命中的条目"""
+        cache = N8nResponseCache(tmp_path / "cache.db", max_entries=2)
+        cache.put("a", "e", {"status": "success"}, ttl=60)
+        cache.put("b", "e", {"status": "success"}, ttl=60)
+        assert cache.get("a") is not None  # a 被命中，b 成为最久未用
+        cache.put("c", "e", {"status": "success"}, ttl=60)
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["evictions"] == 1
+        cache.close()
+
+    def test_expired_entry_misses(self, tmp_path):
+        """过期条目不再命中"""
+        cache = N8nResponseCache(tmp_path / "cache.db", max_entries=10)
+        cache.put("a", "e", {"status": "success"}, ttl=-1)
+        assert cache.get("a") is None
+        cache.close()
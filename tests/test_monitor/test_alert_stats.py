@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+预警聚合统计测试
+确保一次聚合查询算出的命中率与逐条统计一致
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.database.models import Project, Keyword, IndexCheckRecord
+from backend.services.notification_service import NotificationService
+
+
+@pytest.fixture()
+def memory_db():
+    """独立的内存数据库，不依赖后端服务"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session, engine
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _records(db, keyword, days_ago, count, keyword_found=False, company_found=False):
+    for _ in range(count):
+        db.add(IndexCheckRecord(keyword_id=keyword.id, platform="doubao", question="问题",
+                                keyword_found=keyword_found, company_found=company_found,
+                                check_time=datetime.now() - timedelta(days=days_ago)))
+
+
+@pytest.mark.monitor
+class TestAlertStats:
+    """预警聚合统计测试类"""
+
+    def test_rules_evaluated_from_single_query(self, memory_db):
+        """多个关键词的预警只发出一条统计查询"""
+        db, engine = memory_db
+        project = Project(name="预警测试", company_name="测试公司")
+        db.add(project)
+        db.flush()
+        healthy = Keyword(project_id=project.id, keyword="健康词")
+        zero = Keyword(project_id=project.id, keyword="零收录词")
+        silent = Keyword(project_id=project.id, keyword="无数据词")
+        db.add_all([healthy, zero, silent])
+        db.flush()
+        _records(db, healthy, 1, 4, keyword_found=True, company_found=True)
+        _records(db, zero, 2, 3)
+        # 30 天内的旧数据只影响持续低迷，60 天前的不计入
+        _records(db, zero, 20, 5)
+        _records(db, silent, 60, 5, keyword_found=True, company_found=True)
+        db.commit()
+
+        statements = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        service = NotificationService(db)
+        stats = {row["keyword"]: row for row in service._keyword_stats()}
+        assert len(statements) == 1
+        assert stats["健康词"]["total_7d"] == 4
+        assert stats["零收录词"]["total_7d"] == 3
+        assert stats["零收录词"]["total_30d"] == 8
+        assert stats["无数据词"]["total_30d"] == 0
+
+        alerts = service._evaluate_rules(list(stats.values()))
+        types = {(a["keyword"], a["type"]) for a in alerts}
+        assert types == {
+            ("零收录词", "hit_rate_low"),
+            ("零收录词", "no_index"),
+            ("零收录词", "consistently_low"),
+            ("无数据词", "no_data"),
+        }
+
+        summary = service.get_alert_summary()
+        assert summary["total_keywords"] == 3
+        assert summary["alert_keywords"] == 1
+        assert summary["critical_count"] == 1
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+AI 回答完成检测测试
+验证停止按钮选择器按平台配置且不会误命中常驻元素、页面监听结果的透传与中断后的兜底读取
+"""
+
+import asyncio
+import re
+
+import pytest
+
+from backend.config import AI_PLATFORMS
+from backend.services.playwright.ai_platforms import DoubaoChecker, QianwenChecker, DeepSeekChecker
+
+CHECKERS = [DoubaoChecker, QianwenChecker, DeepSeekChecker]
+# 页面上常驻、与生成状态无关的 class
+STATIC_CLASSES = ["desktop-layout", "stopwatch-icon", "nonstop-banner"]
+
+
+def _matches_static(selector: str) -> bool:
+    """粗略判断 [class*='x'] 形式的子串匹配是否会命中常驻 class"""
+    for part in re.findall(r"\[class\*='([^']+)'\]", selector):
+        if any(part in cls for cls in STATIC_CLASSES):
+            return True
+    return False
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+    async def inner_text(self):
+        return self.text
+
+
+class FakePage:
+    """evaluate 返回预设结果或抛出异常；query_selector_all 返回预设回答"""
+
+    def __init__(self, result=None, error=None, answers=None):
+        self.result = result
+        self.error = error
+        self.answers = answers or {}
+        self.args = None
+
+    async def evaluate(self, script, args):
+        self.args = args
+        if self.error:
+            raise self.error
+        return self.result
+
+    async def query_selector_all(self, selector):
+        return [FakeElement(t) for t in self.answers.get(selector, [])]
+
+
+@pytest.mark.monitor
+class TestAnswerComplete:
+    """回答完成检测测试类"""
+
+    @pytest.mark.parametrize("checker_cls", CHECKERS)
+    def test_stop_selectors_are_platform_specific(self, checker_cls):
+        """平台专属的停止按钮排在最前，且没有会命中 desktop 之类的宽泛匹配"""
+        platform_id = checker_cls.__name__.replace("Checker", "").lower()
+        checker = checker_cls(platform_id, AI_PLATFORMS.get(platform_id, {}))
+
+        assert checker.stop_selectors[0] == checker.SELECTORS["stop_button"]
+        assert not any(_matches_static(s) for s in checker.stop_selectors)
+
+    def test_passes_selectors_and_ignored_texts(self):
+        """页面监听拿到平台选择器，旧回答和提问本身不算新回答"""
+        checker = DoubaoChecker("doubao", AI_PLATFORMS.get("doubao", {}))
+        page = FakePage(result={"done": True, "text": "测试公司是一家……"})
+
+        result = asyncio.run(checker.wait_for_answer_complete(page, " 旧回答 ", "测试问题", timeout=100))
+
+        assert result["done"] is True
+        assert result["text"] == "测试公司是一家……"
+        answer_selectors, stop_selectors, ignored, stable_ms, timeout = page.args
+        assert answer_selectors == checker.answer_selectors
+        assert stop_selectors == checker.stop_selectors
+        assert ignored == ["旧回答", "测试问题"]
+        assert (stable_ms, timeout) == (checker.ANSWER_STABLE_MS, 100)
+
+    def test_interrupted_listener_falls_back_to_extract(self):
+        """页面跳转导致监听中断时直接读取当前最新回答"""
+        checker = QianwenChecker("qianwen", AI_PLATFORMS.get("qianwen", {}))
+        page = FakePage(error=RuntimeError("Execution context was destroyed"),
+                        answers={checker.SELECTORS["answer_area"]: ["第一条", "最新回答"]})
+
+        result = asyncio.run(checker.wait_for_answer_complete(page))
+
+        assert result == {"done": False, "text": "最新回答", "elapsed": result["elapsed"]}
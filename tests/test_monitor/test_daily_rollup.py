@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+收录检测日汇总测试
+确保写入检测记录时日汇总同步累加，绕过 ORM 的写入可以从记录表重建
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database import Base, rebuild_index_check_daily
+from backend.database.models import Project, Keyword, IndexCheckRecord, IndexCheckDaily
+
+
+@pytest.fixture()
+def memory_db():
+    """独立的内存数据库，不依赖后端服务"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    project = Project(name="汇总测试", company_name="测试公司")
+    session.add(project)
+    session.flush()
+    keyword = Keyword(project_id=project.id, keyword="测试词")
+    session.add(keyword)
+    session.commit()
+    try:
+        yield session, keyword
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.mark.monitor
+class TestDailyRollup:
+    """收录检测日汇总测试类"""
+
+    def test_insert_updates_rollup(self, memory_db):
+        """同一天同平台的记录累加到一行，不同天/平台各自一行"""
+        db, keyword = memory_db
+        today = datetime.now()
+        yesterday = today - timedelta(days=1)
+        rows = [
+            (today, "doubao", True, True),
+            (today, "doubao", True, False),
+            (today, "doubao", False, False),
+            (today, "deepseek", True, True),
+            (yesterday, "doubao", False, False),
+        ]
+        for check_time, platform, kw, co in rows:
+            db.add(IndexCheckRecord(keyword_id=keyword.id, platform=platform, question="问题",
+                                    keyword_found=kw, company_found=co, check_time=check_time))
+            db.commit()
+
+        daily = {(r.day, r.platform): r for r in db.query(IndexCheckDaily).all()}
+        assert len(daily) == 3
+        doubao_today = daily[(today.date(), "doubao")]
+        assert (doubao_today.checks, doubao_today.keyword_found, doubao_today.company_found) == (3, 2, 1)
+        assert daily[(today.date(), "deepseek")].company_found == 1
+        assert daily[(yesterday.date(), "doubao")].checks == 1
+
+    def test_rolled_back_insert_not_counted(self, memory_db):
+        """检测记录回滚时汇总一并回滚"""
+        db, keyword = memory_db
+        db.add(IndexCheckRecord(keyword_id=keyword.id, platform="doubao", question="问题",
+                                keyword_found=True, company_found=True, check_time=datetime.now()))
+        db.flush()
+        db.rollback()
+        assert db.query(IndexCheckDaily).count() == 0
+
+    def test_default_check_time_matches_rollup_day(self, memory_db):
+        """未指定检测时间时，记录与日汇总使用同一个时间"""
+        db, keyword = memory_db
+        record = IndexCheckRecord(keyword_id=keyword.id, platform="doubao", question="问题",
+                                  keyword_found=True, company_found=False)
+        db.add(record)
+        db.commit()
+
+        daily = db.query(IndexCheckDaily).one()
+        assert record.check_time is not None
+        assert daily.day == record.check_time.date()
+        assert abs(record.check_time - datetime.now()) < timedelta(minutes=1)
+
+    def test_rebuild_counts_core_writes(self, memory_db):
+        """Core 批量插入和删除不经过 ORM 事件，重建后汇总与记录表一致"""
+        db, keyword = memory_db
+        now = datetime.now()
+        db.add(IndexCheckRecord(keyword_id=keyword.id, platform="doubao", question="问题",
+                                keyword_found=True, company_found=True, check_time=now))
+        db.commit()
+        db.execute(IndexCheckRecord.__table__.insert(), [
+            {"keyword_id": keyword.id, "platform": "doubao", "question": "问题",
+             "keyword_found": True, "company_found": False, "check_time": now},
+            {"keyword_id": keyword.id, "platform": "qianwen", "question": "问题",
+             "keyword_found": False, "company_found": False, "check_time": now - timedelta(days=1)},
+        ])
+        db.query(IndexCheckRecord).filter(IndexCheckRecord.company_found == True).delete()
+        db.commit()
+        assert db.query(IndexCheckDaily).filter_by(platform="doubao").one().checks == 1  # 未同步
+
+        rebuild_index_check_daily(db.get_bind())
+        db.expire_all()
+
+        daily = {(r.day, r.platform): (r.checks, r.keyword_found) for r in db.query(IndexCheckDaily).all()}
+        assert daily == {(now.date(), "doubao"): (1, 1), ((now - timedelta(days=1)).date(), "qianwen"): (1, 0)}
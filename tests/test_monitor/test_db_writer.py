@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+单写者写入队列测试
+确保小写入合并成批量事务、出错的操作被隔离、调用方能等到提交完成
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database import Base
+from backend.database.models import Project, Keyword, IndexCheckRecord, IndexCheckDaily
+from backend.database.writer import DBWriter
+
+
+@pytest.fixture()
+def memory_db():
+    """独立的内存数据库，不依赖后端服务"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    session = factory()
+    project = Project(name="写入测试", company_name="测试公司")
+    session.add(project)
+    session.flush()
+    keyword = Keyword(project_id=project.id, keyword="测试词")
+    session.add(keyword)
+    session.commit()
+    try:
+        yield factory, session, keyword.id
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _insert_record(db, keyword_id, platform):
+    record = IndexCheckRecord(keyword_id=keyword_id, platform=platform, question="问题",
+                              keyword_found=True, company_found=False, check_time=datetime.now())
+    db.add(record)
+    db.flush()
+    return record.id
+
+
+def _broken(db):
+    raise ValueError("写入失败")
+
+
+@pytest.mark.monitor
+class TestDBWriter:
+    """单写者写入队列测试类"""
+
+    def test_writes_grouped_into_one_batch(self, memory_db):
+        """同一时刻投递的写入合并提交，且触发 ORM 事件（日汇总）"""
+        factory, db, keyword_id = memory_db
+        writer = DBWriter(factory, batch_window_ms=10)
+
+        async def run():
+            futures = [writer.submit(_insert_record, keyword_id, "doubao") for _ in range(20)]
+            ids = await asyncio.gather(*futures)
+            await writer.stop()
+            return ids
+
+        ids = asyncio.run(run())
+        assert len(set(ids)) == 20
+        assert writer.stats()["batches"] == 1
+        assert db.query(IndexCheckRecord).count() == 20
+        assert db.query(IndexCheckDaily).one().checks == 20
+
+    def test_failed_op_isolated(self, memory_db):
+        """批内某条失败时只有它报错，其余写入照常提交"""
+        factory, db, keyword_id = memory_db
+        writer = DBWriter(factory, batch_window_ms=10)
+
+        async def run():
+            ok1 = writer.submit(_insert_record, keyword_id, "doubao")
+            bad = writer.submit(_broken)
+            ok2 = writer.submit(_insert_record, keyword_id, "qianwen")
+            results = await asyncio.gather(ok1, bad, ok2, return_exceptions=True)
+            await writer.stop()
+            return results
+
+        results = asyncio.run(run())
+        assert isinstance(results[1], ValueError)
+        assert db.query(IndexCheckRecord).count() == 2
+        assert writer.stats()["failed"] == 1
+
+    def test_write_is_read_your_writes(self, memory_db):
+        """write() 返回时数据已提交，其他会话可以读到"""
+        factory, db, keyword_id = memory_db
+        writer = DBWriter(factory, batch_window_ms=0)
+
+        async def run():
+            record_id = await writer.write(_insert_record, keyword_id, "deepseek")
+            reader = factory()
+            try:
+                return reader.get(IndexCheckRecord, record_id) is not None
+            finally:
+                reader.close()
+
+        assert asyncio.run(run()) is True
+
+    def test_stop_releases_writer_thread(self, memory_db):
+        """stop() 后写线程退出；之后再投递会重新启动"""
+        factory, db, keyword_id = memory_db
+        writer = DBWriter(factory, batch_window_ms=0)
+
+        async def run(platform):
+            await writer.write(_insert_record, keyword_id, platform)
+            threads = set(writer._executor._threads)
+            await writer.stop()
+            return threads
+
+        for platform in ("doubao", "qianwen"):
+            threads = asyncio.run(run(platform))
+            assert threads and not any(t.is_alive() for t in threads)
+        assert db.query(IndexCheckRecord).count() == 2
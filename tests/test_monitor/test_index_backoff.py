@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+收录复查退避测试
+确保连续未收录的文章检测间隔指数增长、有上限，状态变化后清零
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.database.models import GeoArticle
+from backend.config import INDEX_RECHECK_MIN_INTERVAL
+from backend.services.backoff import BackoffPolicy
+
+
+@pytest.mark.monitor
+class TestIndexBackoff:
+    """收录复查退避测试类"""
+
+    def test_delay_grows_exponentially(self):
+        """无抖动时每次未命中间隔翻倍"""
+        policy = BackoffPolicy(base_minutes=5, max_minutes=1000, jitter=0)
+        assert policy.delay(0) == timedelta(0)
+        assert policy.delay(1) == timedelta(minutes=5)
+        assert policy.delay(2) == timedelta(minutes=10)
+        assert policy.delay(4) == timedelta(minutes=40)
+
+    def test_delay_capped_with_jitter(self):
+        """抖动在范围内，且永远不超过上限"""
+        policy = BackoffPolicy(base_minutes=5, max_minutes=60, jitter=0.2)
+        for _ in range(50):
+            assert timedelta(minutes=4) <= policy.delay(1) <= timedelta(minutes=6)
+            assert policy.delay(20) <= timedelta(minutes=60)
+
+    def test_record_miss_and_reset_on_status_change(self):
+        """连续未命中累加；命中后清零；再次未命中从 1 开始"""
+        policy = BackoffPolicy(base_minutes=5, max_minutes=1000, jitter=0)
+        now = datetime(2026, 1, 1, 12, 0)
+        article = GeoArticle(index_status="uncheck", index_miss_count=0)
+
+        policy.record(article, "not_indexed", now)
+        assert article.index_miss_count == 1
+        policy.record(article, "not_indexed", now)
+        assert article.index_miss_count == 2
+        assert article.next_check_time == now + timedelta(minutes=10)
+
+        policy.record(article, "indexed", now)
+        assert article.index_miss_count == 0
+        assert article.next_check_time is None
+
+        policy.record(article, "not_indexed", now)
+        assert article.index_miss_count == 1
+        assert article.next_check_time == now + timedelta(minutes=5)
+
+    def test_default_steps_not_below_keyword_interval(self):
+        """默认配置下退避的第一步不短于关键词最小检测间隔，之后逐步拉长"""
+        policy = BackoffPolicy(jitter=0)
+        assert policy.delay(1) == timedelta(minutes=INDEX_RECHECK_MIN_INTERVAL)
+        assert policy.delay(3) == timedelta(minutes=4 * INDEX_RECHECK_MIN_INTERVAL)
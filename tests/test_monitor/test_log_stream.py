@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+实时日志推送测试
+确保日志按批推送、慢客户端只丢自己的消息、不拖慢其他客户端、只推送订阅的主题
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from backend.services import websocket_manager
+from backend.services.websocket_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    """替代 WebSocket：记录收到的消息，可模拟卡住的客户端"""
+
+    def __init__(self, stuck: bool = False, broken: bool = False):
+        self.stuck = stuck
+        self.broken = broken
+        self.sent = []
+        self.closed = None
+        self._release = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.broken:
+            raise RuntimeError("connection reset")
+        if self.stuck:
+            await self._release.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000, reason=None):
+        self.closed = code
+
+
+@pytest.mark.monitor
+class TestLogStream:
+    """实时日志推送测试类"""
+
+    def test_logs_flushed_as_one_batch(self):
+        """多条日志合并成一个 log_batch 帧"""
+        async def run():
+            manager = ConnectionManager()
+            ws = FakeWebSocket()
+            await manager.connect(ws, "c1")
+            for i in range(30):
+                manager.push_log({"level": "INFO", "message": f"行{i}"})
+            await manager.flush_logs()
+            await asyncio.sleep(0.01)
+            await manager.stop()
+            return ws.sent
+
+        sent = asyncio.run(run())
+        assert len(sent) == 1
+        assert sent[0]["type"] == "log_batch"
+        assert [m["message"] for m in sent[0]["logs"]] == [f"行{i}" for i in range(30)]
+
+    def test_ring_buffer_overflow_counted(self):
+        """缓冲区满时覆盖最旧日志并计数"""
+        manager = ConnectionManager()
+        capacity = manager._log_buffer.maxlen
+        for i in range(capacity + 5):
+            manager.push_log({"message": str(i)})
+        assert manager.stats()["log_dropped"] == 5
+        assert manager._log_buffer[0]["message"] == "5"
+
+    def test_slow_client_drops_only_its_messages(self):
+        """卡住的客户端队列满后丢弃旧消息，正常客户端全部收到"""
+        async def run():
+            manager = ConnectionManager()
+            fast, slow = FakeWebSocket(), FakeWebSocket(stuck=True)
+            await manager.connect(fast, "fast")
+            await manager.connect(slow, "slow")
+            queue_size = manager.active_connections["slow"].queue.maxsize
+            total = queue_size + 50
+            for i in range(total):
+                await manager.broadcast({"type": "tick", "i": i})
+                await asyncio.sleep(0)
+            await asyncio.sleep(0.01)
+            stats = manager.stats()
+            await manager.stop()
+            return fast.sent, stats, total
+
+        fast_sent, stats, total = asyncio.run(run())
+        assert len(fast_sent) == total
+        assert stats["dropped_by_client"]["fast"] == 0
+        assert stats["dropped_by_client"]["slow"] > 0
+        assert stats["dropped"] == stats["dropped_by_client"]["slow"]
+
+    def test_topic_subscriptions(self):
+        """客户端只收到订阅的发布任务、授权任务和日志模块"""
+        async def run():
+            manager = ConnectionManager()
+            dashboard, publisher, legacy = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+            await manager.connect(dashboard, "dash", ["log:监测站", "alert"])
+            await manager.connect(publisher, "pub")
+            manager.handle_client_message("pub", json.dumps({"action": "subscribe", "topics": ["publish:t1"]}))
+            await manager.connect(legacy, "legacy")  # 未订阅：接收全部
+
+            await manager.broadcast({"type": "publish_progress", "task_id": "t1"})
+            await manager.broadcast({"type": "publish_progress", "task_id": "t2"})
+            await manager.broadcast({"type": "auth_complete", "task_id": "a1"})
+            await manager.broadcast({"type": "seo_alert", "data": {}})
+            manager.push_log({"module": "监测站", "message": "检测"})
+            manager.push_log({"module": "调度中心", "message": "调度"})
+            await manager.flush_logs()
+            await asyncio.sleep(0.01)
+            await manager.stop()
+            return dashboard.sent, publisher.sent, legacy.sent
+
+        dashboard, publisher, legacy = asyncio.run(run())
+        assert [m["type"] for m in dashboard] == ["seo_alert", "log_batch"]
+        assert [log["message"] for log in dashboard[1]["logs"]] == ["检测"]
+        assert publisher == [{"type": "publish_progress", "task_id": "t1"}]
+        assert len(legacy) == 5
+        assert len(legacy[-1]["logs"]) == 2
+
+    def test_failed_send_closes_socket(self, monkeypatch):
+        """发送超时的客户端以 1013 关闭、发送出错的以 1011 关闭，并移出连接表"""
+        monkeypatch.setattr(websocket_manager, "WS_SEND_TIMEOUT", 0.05)
+
+        async def run():
+            manager = ConnectionManager()
+            slow, broken = FakeWebSocket(stuck=True), FakeWebSocket(broken=True)
+            await manager.connect(slow, "slow")
+            await manager.connect(broken, "broken")
+            await manager.broadcast({"type": "tick"})
+            await asyncio.sleep(0.2)
+            remaining = set(manager.active_connections)
+            stats = manager.stats()
+            await manager.stop()
+            return slow.closed, broken.closed, remaining, stats
+
+        slow_code, broken_code, remaining, stats = asyncio.run(run())
+        assert (slow_code, broken_code) == (1013, 1011)
+        assert remaining == set()
+        assert stats["disconnected_slow"] == 1
+
+    def test_wildcard_kept_when_subscribed_explicitly(self):
+        """前端同时订阅 "*" 与具体主题时仍接收全部消息（含日志）"""
+        async def run():
+            manager = ConnectionManager()
+            ws = FakeWebSocket()
+            await manager.connect(ws, "app")
+            manager.handle_client_message("app", json.dumps({"action": "subscribe", "topics": ["*", "publish"]}))
+            await manager.broadcast({"type": "auth_complete", "task_id": "a1"})
+            manager.push_log({"module": "调度中心", "message": "调度"})
+            await manager.flush_logs()
+            await asyncio.sleep(0.01)
+            await manager.stop()
+            return ws.sent
+
+        assert [m["type"] for m in asyncio.run(run())] == ["auth_complete", "log_batch"]
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+并行收录检测测试
+确保各平台并发检测、结果逐条落库、结论按关键词扇出
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database import Base
+from backend.database.writer import DBWriter
+from backend.database.models import Project, Keyword, QuestionVariant, IndexCheckRecord, GeoArticle
+from backend.services import index_check_service
+from backend.services.index_check_service import IndexCheckService, RateLimiter, keyword_check_due
+
+
+class FakePage:
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    async def new_page(self):
+        return FakePage()
+
+
+class FakePool:
+    """替代检测池：记录同时租出的上下文数"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    @asynccontextmanager
+    async def lease(self, key=None, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            yield FakeContext()
+        finally:
+            self.active -= 1
+
+
+class FakeChecker:
+    """假检测插件：记录同时在途的检测数（跨平台共享计数器）"""
+
+    def __init__(self, hit: bool, counter: dict = None, fail: bool = False):
+        self.hit = hit
+        self.fail = fail
+        self.counter = counter if counter is not None else {"active": 0, "peak": 0}
+
+    async def check(self, page, question, keyword, company):
+        self.counter["active"] += 1
+        self.counter["peak"] = max(self.counter["peak"], self.counter["active"])
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            self.counter["active"] -= 1
+        if self.fail:
+            return {"success": False, "answer": None, "keyword_found": False, "company_found": False,
+                    "error_msg": "输入框未找到"}
+        return {"success": True, "answer": question, "keyword_found": True, "company_found": self.hit}
+
+
+@pytest.fixture()
+def memory_db():
+    """独立的内存数据库，不依赖后端服务"""
+    # 数据库操作在线程池中执行，内存库需要跨线程共享同一连接
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    project = Project(name="检测测试", company_name="测试公司")
+    session.add(project)
+    session.flush()
+    keyword = Keyword(project_id=project.id, keyword="测试词")
+    session.add(keyword)
+    session.flush()
+    for i in range(4):
+        session.add(QuestionVariant(keyword_id=keyword.id, question=f"问题{i}"))
+    session.commit()
+    try:
+        yield session, keyword
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture()
+def writer(memory_db):
+    """写入内存库的单写者队列"""
+    db, _ = memory_db
+    return DBWriter(sessionmaker(bind=db.get_bind()), batch_window_ms=0)
+
+
+@pytest.fixture()
+def fake_browser(monkeypatch):
+    """替换检测池并关闭限流"""
+    pool = FakePool()
+    monkeypatch.setattr(index_check_service.playwright_mgr, "check_pool", pool)
+    monkeypatch.setattr(index_check_service, "INDEX_CHECK_MIN_INTERVAL", {"default": 0})
+    monkeypatch.setattr(index_check_service, "INDEX_CHECK_PLATFORM_CONCURRENCY", {"default": 2})
+    monkeypatch.setattr(index_check_service, "_rate_limiters", {})
+    return pool
+
+
+@pytest.mark.monitor
+class TestParallelCheck:
+    """并行收录检测测试类"""
+
+    def test_platforms_run_concurrently(self, memory_db, writer, fake_browser):
+        """三个平台 × 4 个问题并发执行，且每条结果都落库"""
+        db, keyword = memory_db
+        pool = fake_browser
+
+        counter = {"active": 0, "peak": 0}
+        service = IndexCheckService(db, writer)
+        service.checkers = {"doubao": FakeChecker(True, counter), "qianwen": FakeChecker(False, counter),
+                            "deepseek": FakeChecker(False, counter)}
+
+        verdicts = asyncio.run(service.run_ai_search_check(keyword.id, "测试公司"))
+
+        # 3 个平台 × 每平台 2 个槽位同时在检测
+        assert counter["peak"] == 6
+        assert pool.peak == 6
+        assert db.query(IndexCheckRecord).count() == 12
+        assert verdicts["doubao"]["company_found"] is True
+        assert verdicts["doubao"]["hits"] == 4
+        assert verdicts["qianwen"]["company_found"] is False
+        assert verdicts["deepseek"]["checked"] == 4
+
+    def test_failed_checks_are_recorded(self, memory_db, writer, fake_browser):
+        """平台检测失败也写入检测记录，但不计入收录结论"""
+        db, keyword = memory_db
+
+        service = IndexCheckService(db, writer)
+        service.checkers = {"doubao": FakeChecker(True), "qianwen": FakeChecker(False, fail=True)}
+        verdicts = asyncio.run(service.run_ai_search_check(keyword.id, "测试公司", ["doubao", "qianwen"]))
+
+        failed = db.query(IndexCheckRecord).filter(IndexCheckRecord.platform == "qianwen").all()
+        assert len(failed) == 4
+        assert all(r.answer is None and not r.company_found for r in failed)
+        assert verdicts["qianwen"]["errors"] == 4
+        assert verdicts["qianwen"]["checked"] == 0
+
+    def test_rate_limiter_spacing(self):
+        """限流器保证相邻两次调用的最小间隔"""
+        limiter = RateLimiter(0.05)
+
+        async def run():
+            stamps = []
+            for _ in range(3):
+                await limiter.wait()
+                stamps.append(time.monotonic())
+            return stamps
+
+        stamps = asyncio.run(run())
+        assert stamps[1] - stamps[0] >= 0.045
+        assert stamps[2] - stamps[1] >= 0.045
+
+    def test_verdict_fans_out_to_keyword_articles(self, memory_db, writer, fake_browser):
+        """一次关键词检测的结论回填到同关键词的所有已发布文章"""
+        db, keyword = memory_db
+        published = [GeoArticle(keyword_id=keyword.id, title=f"文章{i}", content="正文",
+                                publish_status="published", index_status="uncheck") for i in range(3)]
+        draft = GeoArticle(keyword_id=keyword.id, title="草稿", content="正文", publish_status="draft")
+        db.add_all(published + [draft])
+        db.commit()
+
+        service = IndexCheckService(db, writer)
+        service.checkers = {"doubao": FakeChecker(False), "qianwen": FakeChecker(True),
+                            "deepseek": FakeChecker(False)}
+        asyncio.run(service.check_keyword(keyword.id))
+
+        for article in published:
+            db.refresh(article)
+            assert article.index_status == "indexed"
+            assert article.last_check_time is not None
+            assert "qianwen" in article.index_details
+        db.refresh(draft)
+        assert draft.last_check_time is None
+        db.refresh(keyword)
+        assert keyword.last_check_time is not None
+
+    def test_keyword_check_interval(self):
+        """未到最小检测间隔的关键词不会被重复检测"""
+        now = datetime.now()
+        assert keyword_check_due(None, None, now)
+        assert not keyword_check_due(now - timedelta(minutes=10), 30, now)
+        assert keyword_check_due(now - timedelta(minutes=31), 30, now)
+        assert keyword_check_due(now - timedelta(minutes=1), 0, now)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+调度查询执行计划测试
+确保每分钟执行的扫描查询命中复合索引，而不是全表扫描
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+import backend.database as database
+from backend.database import Base
+from backend.database.models import IndexCheckRecord, Project, Keyword, GeoArticle
+from backend.services.scheduler_service import pending_publish_query, pending_index_query
+
+
+@pytest.fixture()
+def memory_engine():
+    """独立的内存数据库，不依赖后端服务"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+def _plan(db, query) -> str:
+    sql = str(query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    return "\n".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+@pytest.mark.monitor
+class TestQueryPlans:
+    """调度查询执行计划测试类"""
+
+    def test_publish_scan_uses_index(self, memory_engine):
+        """发布扫描走 ix_geo_articles_publish_queue"""
+        db = sessionmaker(bind=memory_engine)()
+        plan = _plan(db, pending_publish_query(db, datetime.now(), 10))
+        assert "ix_geo_articles_publish_queue" in plan
+        assert "SCAN geo_articles" not in plan
+
+    def test_index_scan_uses_index(self, memory_engine):
+        """收录扫描走 ix_geo_articles_index_queue"""
+        db = sessionmaker(bind=memory_engine)()
+        plan = _plan(db, pending_index_query(db, datetime.now()))
+        assert "ix_geo_articles_index_queue" in plan
+        assert "SCAN geo_articles" not in plan
+
+    def test_index_scan_statuses(self, memory_engine):
+        """未检测和未收录的已发布文章参与扫描，已收录的不参与"""
+        db = sessionmaker(bind=memory_engine)()
+        project = Project(name="扫描测试", company_name="测试公司")
+        db.add(project)
+        db.flush()
+        keyword = Keyword(project_id=project.id, keyword="测试词")
+        db.add(keyword)
+        db.flush()
+        for status in ("uncheck", "not_indexed", "indexed"):
+            db.add(GeoArticle(keyword_id=keyword.id, title=status, content="正文",
+                              publish_status="published", index_status=status))
+        db.commit()
+
+        rows = pending_index_query(db, datetime.now()).all()
+        assert [(r[0], r[3]) for r in rows] == [(keyword.id, 2)]
+
+    def test_check_records_window_uses_index(self, memory_engine):
+        """按关键词 + 时间窗口查检测记录走 ix_index_check_records_keyword_time"""
+        db = sessionmaker(bind=memory_engine)()
+        query = db.query(IndexCheckRecord).filter(
+            IndexCheckRecord.keyword_id == 1,
+            IndexCheckRecord.check_time >= datetime.now()
+        )
+        assert "ix_index_check_records_keyword_time" in _plan(db, query)
+
+    def test_migrations_add_indexes_to_old_db(self, memory_engine, monkeypatch):
+        """旧库缺少索引时由迁移补上，且迁移只执行一次"""
+        with memory_engine.begin() as conn:
+            for name in ("ix_geo_articles_publish_queue", "ix_geo_articles_index_queue",
+                         "ix_index_check_records_keyword_time"):
+                conn.execute(text(f"DROP INDEX {name}"))
+        monkeypatch.setattr(database, "engine", memory_engine)
+
+        database._run_migrations()
+        database._run_migrations()
+
+        indexes = {i["name"] for i in inspect(memory_engine).get_indexes("geo_articles")}
+        assert {"ix_geo_articles_publish_queue", "ix_geo_articles_index_queue"} <= indexes
+        with memory_engine.connect() as conn:
+            versions = [row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))]
+        assert versions == [v for v, _, _ in database.MIGRATIONS]
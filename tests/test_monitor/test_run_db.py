@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+数据库线程池测试
+确保 run_db 在专用线程中执行并原样返回结果/异常，快照在会话提交后读取也不会回到事件循环线程查库
+"""
+
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database import Base, run_db, snapshot
+from backend.database.models import Project
+
+
+@pytest.fixture()
+def memory_db():
+    """独立的内存数据库，记录每条 SQL 在哪个线程执行"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    threads = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record_thread(*args):
+        threads.append(threading.current_thread().name)
+
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session, threads
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.mark.monitor
+class TestRunDb:
+    """数据库线程池测试类"""
+
+    def test_runs_in_db_thread(self):
+        """函数在 db 线程池中执行，参数和返回值原样传递"""
+
+        def work(a, b=0):
+            return threading.current_thread().name, a + b
+
+        name, value = asyncio.run(run_db(work, 1, b=2))
+        assert name.startswith("db")
+        assert value == 3
+
+    def test_exception_propagates(self):
+        """线程中的异常在 await 处重新抛出"""
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            asyncio.run(run_db(fail))
+
+    def test_snapshot_survives_commit(self, memory_db):
+        """提交使实例过期后，快照仍可直接读取，不会在事件循环线程上触发查询"""
+        db, threads = memory_db
+        db.add(Project(name="快照测试", company_name="测试公司"))
+        db.commit()
+
+        async def run():
+            project = await run_db(lambda: snapshot(db.query(Project).first()))
+            await run_db(db.commit)
+            threads.clear()
+            return project
+
+        project = asyncio.run(run())
+        assert (project.name, project.company_name) == ("快照测试", "测试公司")
+        assert threads == []
+        assert snapshot(None) is None
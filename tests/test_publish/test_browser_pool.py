@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+常驻浏览器池测试
+验证上下文复用、登录态变化后重建、断开的浏览器被替换，以及浏览器 I/O 不持有全局锁
+"""
+
+import asyncio
+
+import pytest
+
+from backend.services.playwright_mgr import BrowserPool
+
+
+class FakeContext:
+    def __init__(self, browser, options):
+        self.browser = browser
+        self.options = options
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, pool_stats, delay=0.0):
+        self.stats = pool_stats
+        self.delay = delay
+        self.connected = True
+        self.closed = False
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        self.stats["inflight"] += 1
+        self.stats["peak"] = max(self.stats["peak"], self.stats["inflight"])
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.stats["inflight"] -= 1
+        context = FakeContext(self, options)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+def make_pool(delay=0.0, **kwargs):
+    stats = {"inflight": 0, "peak": 0}
+    browsers = []
+
+    async def launcher():
+        browser = FakeBrowser(stats, delay)
+        browsers.append(browser)
+        return browser
+
+    params = dict(size=1, max_contexts=4, max_uses=100, context_max_uses=10, idle_ttl=600)
+    params.update(kwargs)
+    return BrowserPool(launcher, **params), browsers, stats
+
+
+async def use(pool, key, **kwargs):
+    async with pool.lease(key, **kwargs) as context:
+        return context
+
+
+@pytest.mark.publish
+class TestBrowserPool:
+    """浏览器池测试类"""
+
+    def test_reuses_context_for_same_key(self):
+        """同一账号归还后再次租用拿到同一个上下文，且不残留按账号的锁"""
+        pool, browsers, _ = make_pool()
+
+        async def run():
+            first = await use(pool, 1, storage_state={"cookies": []})
+            second = await use(pool, 1, storage_state={"cookies": []})
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first is second and not first.closed
+        assert len(browsers) == 1
+        assert pool.stats()["contexts_reused"] == 1
+        assert pool._key_locks == {}
+
+    def test_fingerprint_mismatch_rebuilds_context(self):
+        """账号重新授权（登录态变化）后旧上下文被关闭并重建"""
+        pool, _, _ = make_pool()
+
+        async def run():
+            first = await use(pool, 1, storage_state={"cookies": [{"name": "a"}]})
+            second = await use(pool, 1, storage_state={"cookies": [{"name": "b"}]})
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first is not second
+        assert first.closed
+        assert second.options["storage_state"] == {"cookies": [{"name": "b"}]}
+
+    def test_disconnected_browser_is_replaced(self):
+        """浏览器进程断开后不再复用其上下文，重新启动进程"""
+        pool, browsers, _ = make_pool()
+
+        async def run():
+            first = await use(pool, 1)
+            browsers[0].connected = False
+            second = await use(pool, 1)
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first is not second
+        assert len(browsers) == 2 and second.browser is browsers[1]
+        assert pool.stats()["browsers"] == 1
+
+    def test_browser_io_runs_outside_pool_lock(self):
+        """不同账号并发租用时建上下文互不阻塞，只启动一个浏览器进程"""
+        pool, browsers, stats = make_pool(delay=0.05)
+
+        async def run():
+            await asyncio.gather(*(use(pool, key) for key in range(4)))
+
+        asyncio.run(run())
+        assert len(browsers) == 1
+        assert stats["peak"] == 4
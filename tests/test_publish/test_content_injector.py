@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+正文注入测试
+验证 Markdown 预渲染成编辑器 HTML、纯文本兜底内容，以及注入策略的顺序与写入校验
+"""
+
+import asyncio
+import re
+
+import pytest
+
+from backend.services.playwright.publishers import get_publisher
+from backend.services.playwright.publishers.content_injector import markdown_to_html, html_to_text, inject_content
+
+
+class FakeEditor:
+    """
+    假编辑器 locator：按脚本内容识别注入方式
+    accepts 为各策略实际写入的文字比例（缺省为不生效）
+    """
+
+    def __init__(self, page, visible=True, accepts=None):
+        self.page = page
+        self.visible = visible
+        self.accepts = accepts or {}
+        self.text = ""
+
+    @property
+    def first(self):
+        return self
+
+    async def wait_for(self, state="visible", timeout=10000):
+        if not self.visible:
+            raise TimeoutError("editor not visible")
+
+    async def click(self):
+        pass
+
+    def _write(self, strategy, text):
+        self.page.attempts.append(strategy)
+        ratio = self.accepts.get(strategy, 0)
+        self.text = text[:int(len(text) * ratio)]
+
+    async def evaluate(self, script, payload=None):
+        if "DataTransfer" in script:
+            self._write("paste", payload["text"])
+        elif "insertHTML" in script:
+            self._write("insert_html", payload["text"])
+        elif "replace(/" in script:
+            return len(re.sub(r"\s+", "", self.text))
+        return None
+
+
+class FakeKeyboard:
+    def __init__(self, page):
+        self.page = page
+
+    async def insert_text(self, text):
+        self.page.editor._write("type", text)
+
+
+class FakePage:
+    def __init__(self, **editor_kwargs):
+        self.attempts = []
+        self.editor = FakeEditor(self, **editor_kwargs)
+        self.keyboard = FakeKeyboard(self)
+
+    def locator(self, selector):
+        return self.editor
+
+    async def evaluate(self, script, payload=None):
+        self.attempts.append("editor_api")
+        return None
+
+
+CONTENT = "## 小标题\n\n第一段正文，介绍产品特点。\n\n- 要点一\n- 要点二"
+
+
+@pytest.mark.publish
+class TestContentInjector:
+    """正文渲染测试类"""
+
+    def test_block_structure(self):
+        """标题、段落、列表、引用、代码块各自成块"""
+        rendered = markdown_to_html(
+            "# 大标题\n\n第一行\n第二行\n\n- 甲\n- 乙\n\n1. 一\n2. 二\n\n> 引用\n\n```\nx < 1\n```\n\n---"
+        )
+
+        assert rendered == (
+            "<h1>大标题</h1>"
+            "<p>第一行<br>第二行</p>"
+            "<ul><li>甲</li><li>乙</li></ul>"
+            "<ol><li>一</li><li>二</li></ol>"
+            "<blockquote>引用</blockquote>"
+            "<pre><code>x &lt; 1</code></pre>"
+            "<hr>"
+        )
+
+    def test_inline_and_escaping(self):
+        """行内语法转换，正文里的尖括号被转义而不是当成标签"""
+        rendered = markdown_to_html("**重点** 和 *强调*，见 [官网](https://a.com)，`a<b>`")
+
+        assert "<strong>重点</strong>" in rendered
+        assert "<em>强调</em>" in rendered
+        assert '<a href="https://a.com">官网</a>' in rendered
+        assert "<code>a&lt;b&gt;</code>" in rendered
+
+    def test_quotes_in_urls_stay_inside_attribute(self):
+        """链接 / 图片地址里的引号被转义，不能跑出属性注入事件处理器"""
+        image = markdown_to_html('![i"x](http://a"onerror=x)')
+        link = markdown_to_html("[官网](http://a'onclick=x)")
+
+        assert image == '<p><img src="http://a&quot;onerror=x" alt="i&quot;x"></p>'
+        assert link == '<p><a href="http://a&#x27;onclick=x">官网</a></p>'
+
+    def test_plain_text_fallback(self):
+        """纯文本去掉标记，块之间换行，实体还原"""
+        text = html_to_text(markdown_to_html("## 小标题\n\n正文 **加粗** & 结尾\n\n- 项目"))
+
+        assert text == "小标题\n正文 加粗 & 结尾\n项目"
+
+    def test_strategies_tried_in_order(self):
+        """前面的策略不生效时按顺序尝试下一个，返回生效的策略"""
+        page = FakePage(accepts={"insert_html": 1.0, "type": 1.0})
+
+        assert asyncio.run(inject_content(page, ".editor", CONTENT)) == "insert_html"
+        assert page.attempts == ["paste", "insert_html"]
+
+    def test_partial_write_not_accepted(self):
+        """写入的文字量不足八成视为失败，继续尝试后面的策略"""
+        page = FakePage(accepts={"paste": 0.5, "type": 0.9})
+
+        strategy = asyncio.run(inject_content(page, ".editor", CONTENT, ("editor_api", "paste", "type")))
+        assert strategy == "type"
+        assert page.attempts == ["editor_api", "paste", "type"]
+
+    def test_all_strategies_fail(self):
+        """全部失败或编辑器不出现时返回 None"""
+        assert asyncio.run(inject_content(FakePage(), ".editor", CONTENT)) is None
+        hidden = FakePage(visible=False, accepts={"paste": 1.0})
+        assert asyncio.run(inject_content(hidden, ".editor", CONTENT, timeout=10)) is None
+        assert hidden.attempts == []
+
+    def test_zhihu_aborts_when_injection_fails(self):
+        """知乎正文注入失败时返回 False，由发布流程中止"""
+        zhihu = get_publisher("zhihu")
+
+        assert asyncio.run(zhihu._fill_content_and_clean_ui(FakePage(), CONTENT)) is False
+        assert asyncio.run(zhihu._fill_content_and_clean_ui(FakePage(accepts={"paste": 1.0}), CONTENT)) is True
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+发布租约测试
+确保同一篇文章在一次尝试中只会被领取一次
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import backend.database.writer as writer_module
+from backend.database import Base
+from backend.database.models import Project, Keyword, GeoArticle, Account
+from backend.database.writer import DBWriter
+from backend.services import geo_article_service
+from backend.services.geo_article_service import GeoArticleService, finish_publish, renew_publish_lease
+
+
+@pytest.fixture()
+def memory_db(monkeypatch):
+    """独立的内存数据库，不依赖后端服务；单写者队列也写入这里"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    session = factory()
+    monkeypatch.setattr(writer_module, "get_db_writer", lambda: DBWriter(factory, batch_window_ms=0))
+    project = Project(name="租约测试", company_name="测试公司")
+    session.add(project)
+    session.flush()
+    keyword = Keyword(project_id=project.id, keyword="测试词")
+    session.add(keyword)
+    session.commit()
+    try:
+        yield session, keyword
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _article(db, keyword, **kwargs):
+    values = dict(keyword_id=keyword.id, title="标题", content="正文", platform="zhihu",
+                  publish_status="scheduled", publish_time=datetime.now() - timedelta(minutes=1))
+    values.update(kwargs)
+    article = GeoArticle(**values)
+    db.add(article)
+    db.commit()
+    return article
+
+
+class SlowPublisher:
+    """替代平台适配器：按指定耗时“发布”"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    async def publish(self, page, article, account):
+        await asyncio.sleep(self.seconds)
+        return {"success": True, "platform_url": "https://example.com/p/1"}
+
+
+class CrashingPublisher:
+    """替代平台适配器：每次都抛异常"""
+
+    async def publish(self, page, article, account):
+        raise RuntimeError("浏览器崩溃")
+
+
+class FakePool:
+    class Page:
+        async def close(self):
+            pass
+
+    class Context:
+        async def new_page(self):
+            return FakePool.Page()
+
+    @asynccontextmanager
+    async def lease(self, *args, **kwargs):
+        yield FakePool.Context()
+
+
+@pytest.fixture()
+def fake_browser(memory_db, monkeypatch):
+    """跳过真实浏览器与随机延迟，准备一个已授权账号"""
+    db, _ = memory_db
+    db.add(Account(platform="zhihu", account_name="测试号", storage_state="{}", status=1))
+    db.commit()
+    monkeypatch.setattr(geo_article_service.random, "randint", lambda a, b: 0)
+    monkeypatch.setattr(geo_article_service, "load_storage_state", lambda *args: {"cookies": []})
+    monkeypatch.setattr(geo_article_service.playwright_mgr, "publish_pool", FakePool())
+
+    def use_publisher(publisher):
+        monkeypatch.setattr(geo_article_service, "get_publisher", lambda platform: publisher)
+
+    return use_publisher
+
+
+@pytest.mark.publish
+class TestPublishClaim:
+    """发布租约测试类"""
+
+    def test_claim_only_once(self, memory_db):
+        """两个 worker 抢同一篇文章，只有一个成功"""
+        db, keyword = memory_db
+        article = _article(db, keyword)
+        service = GeoArticleService(db)
+
+        assert service.claim_for_publish(article.id, "worker-a") is True
+        assert service.claim_for_publish(article.id, "worker-b") is False
+
+        db.refresh(article)
+        assert article.publish_status == "claimed"
+        assert article.lease_owner == "worker-a"
+
+    def test_future_article_not_claimed(self, memory_db):
+        """发布时间未到的文章不能被领取"""
+        db, keyword = memory_db
+        article = _article(db, keyword, publish_time=datetime.now() + timedelta(hours=1))
+        assert GeoArticleService(db).claim_for_publish(article.id, "worker-a") is False
+
+    def test_expired_lease_reclaimed(self, memory_db):
+        """租约过期后可被重新领取，并计入一次重试"""
+        db, keyword = memory_db
+        article = _article(db, keyword, publish_status="publishing", lease_owner="dead-worker",
+                           lease_expires_at=datetime.now() - timedelta(seconds=1))
+
+        assert GeoArticleService(db).claim_for_publish(article.id, "worker-b") is True
+        db.refresh(article)
+        assert article.lease_owner == "worker-b"
+        assert article.retry_count == 1
+
+    def test_release_claim(self, memory_db):
+        """放弃租约后文章回到待发布"""
+        db, keyword = memory_db
+        article = _article(db, keyword)
+        service = GeoArticleService(db)
+        service.claim_for_publish(article.id, "worker-a")
+        service.release_claim(article.id, "worker-a")
+
+        db.refresh(article)
+        assert article.publish_status == "scheduled"
+        assert article.lease_owner is None
+
+    def test_renew_only_own_lease(self, memory_db):
+        """只能续自己持有的租约，续租同时可切换状态"""
+        db, keyword = memory_db
+        article = _article(db, keyword)
+        GeoArticleService(db).claim_for_publish(article.id, "worker-a")
+
+        assert renew_publish_lease(db, [article.id], "worker-b") == 0
+        assert renew_publish_lease(db, [article.id], "worker-a", "publishing") == 1
+        db.commit()
+        db.refresh(article)
+        assert article.publish_status == "publishing"
+        assert article.lease_expires_at > datetime.now() + timedelta(minutes=5)
+
+    def test_finish_requires_lease(self, memory_db):
+        """租约被接管后，原任务的结论不会覆盖新任务"""
+        db, keyword = memory_db
+        article = _article(db, keyword, publish_status="publishing", lease_owner="worker-b",
+                           lease_expires_at=datetime.now() + timedelta(minutes=5))
+
+        assert finish_publish(db, article.id, "worker-a", {"publish_status": "published"}) is False
+        db.commit()
+        db.refresh(article)
+        assert article.publish_status == "publishing"
+        assert article.lease_owner == "worker-b"
+
+    def test_execute_skips_taken_over_lease(self, memory_db, fake_browser):
+        """排队期间租约被其他进程接管时不再执行"""
+        db, keyword = memory_db
+        article = _article(db, keyword, publish_status="claimed", lease_owner="worker-b",
+                           lease_expires_at=datetime.now() + timedelta(minutes=5))
+        publisher = SlowPublisher(0)
+        fake_browser(publisher)
+
+        assert asyncio.run(GeoArticleService(db).execute_publish(article.id, "worker-a")) is False
+        db.refresh(article)
+        assert article.publish_status == "claimed"
+        assert article.lease_owner == "worker-b"
+
+    def test_execute_enforces_timeout(self, memory_db, fake_browser, monkeypatch):
+        """发布超过 PUBLISH_TIMEOUT 记为失败并释放租约"""
+        db, keyword = memory_db
+        article = _article(db, keyword)
+        fake_browser(SlowPublisher(5))
+        monkeypatch.setattr(geo_article_service, "PUBLISH_TIMEOUT", 0.05)
+
+        assert asyncio.run(GeoArticleService(db).execute_publish(article.id)) is False
+        db.refresh(article)
+        assert article.publish_status == "failed"
+        assert "超时" in article.error_msg
+        assert article.retry_count == 1
+        assert article.lease_owner is None
+
+    def test_crash_counts_retry_and_backs_off(self, memory_db, fake_browser):
+        """执行崩溃计入重试次数并推迟下次领取，不会被调度器每轮重新领取"""
+        db, keyword = memory_db
+        article = _article(db, keyword)
+        fake_browser(CrashingPublisher())
+        service = GeoArticleService(db)
+
+        assert asyncio.run(service.execute_publish(article.id)) is False
+        db.refresh(article)
+        assert article.publish_status == "failed"
+        assert "浏览器崩溃" in article.error_msg
+        assert article.retry_count == 1
+        assert article.publish_time > datetime.now() + timedelta(minutes=3)
+        assert service.claim_for_publish(article.id) is False
+
+    def test_missing_account_counts_retry(self, memory_db):
+        """没有授权账号同样计入重试次数并退避，超过上限后不再领取"""
+        db, keyword = memory_db
+        article = _article(db, keyword, publish_status="failed", retry_count=geo_article_service.MAX_RETRY_COUNT)
+        service = GeoArticleService(db)
+
+        assert asyncio.run(service.execute_publish(article.id)) is False
+        db.refresh(article)
+        assert article.publish_status == "failed"
+        assert article.retry_count == geo_article_service.MAX_RETRY_COUNT + 1
+        assert article.publish_time > datetime.now()
+        article.publish_time = datetime.now() - timedelta(minutes=1)
+        db.commit()
+        assert service.claim_for_publish(article.id) is False
+
+    def test_execute_heartbeat_and_publish(self, memory_db, fake_browser, monkeypatch):
+        """发布期间持续续租，成功后写入结论并释放租约"""
+        db, keyword = memory_db
+        article = _article(db, keyword)
+        fake_browser(SlowPublisher(0.1))
+        renewals = []
+        original = geo_article_service.renew_publish_lease
+
+        def counting_renew(session, ids, owner, status=None):
+            renewals.append(status)
+            return original(session, ids, owner, status)
+
+        monkeypatch.setattr(geo_article_service, "renew_publish_lease", counting_renew)
+        monkeypatch.setattr(geo_article_service, "PUBLISH_LEASE_HEARTBEAT", 0.02)
+
+        assert asyncio.run(GeoArticleService(db).execute_publish(article.id)) is True
+        db.refresh(article)
+        assert article.publish_status == "published"
+        assert article.platform_url == "https://example.com/p/1"
+        assert article.lease_owner is None
+        # 开始时确认 + 切换 publishing + 至少一次心跳
+        assert renewals[:2] == [None, "publishing"] and len(renewals) >= 3
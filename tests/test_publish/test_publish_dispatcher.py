@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+发布调度器测试
+验证单平台 / 全局并发上限、队列满时拒收、在途去重，以及扫描时排除在途文章
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database import Base
+from backend.database.models import Project, Keyword, GeoArticle
+from backend.services.publish_dispatcher import PublishDispatcher
+from backend.services.scheduler_service import pending_publish_query
+
+
+class RecordingDispatcher(PublishDispatcher):
+    """不真正发布，只记录各平台同时执行的数量"""
+
+    def __init__(self, *args, delay: float = 0.02, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+        self.current = {"total": 0}
+        self.peak = {"total": 0}
+        self.done = []
+
+    async def _run(self, article_id, lease_owner):
+        platform = "zhihu" if article_id < 100 else "toutiao"
+        for key in ("total", platform):
+            self.current[key] = self.current.get(key, 0) + 1
+            self.peak[key] = max(self.peak.get(key, 0), self.current[key])
+        await asyncio.sleep(self.delay)
+        for key in ("total", platform):
+            self.current[key] -= 1
+        self.done.append(article_id)
+        return True
+
+
+async def _drain(dispatcher, count):
+    while len(dispatcher.done) < count:
+        await asyncio.sleep(0.005)
+    await dispatcher.stop()
+
+
+@pytest.mark.publish
+class TestPublishDispatcher:
+    """发布调度器测试类"""
+
+    def test_platform_and_global_bounds(self):
+        """单平台不超过配置的 worker 数，所有平台合计不超过全局上限"""
+        dispatcher = RecordingDispatcher(max_concurrent=2, platform_concurrency={"zhihu": 1, "default": 2},
+                                         queue_size=20)
+
+        async def run():
+            for i in range(4):
+                assert dispatcher.submit(i, "zhihu")
+                assert dispatcher.submit(100 + i, "toutiao")
+            await _drain(dispatcher, 8)
+
+        asyncio.run(run())
+        assert dispatcher.peak["zhihu"] == 1
+        assert dispatcher.peak["total"] == 2
+        assert dispatcher.stats()["completed"] == 8
+
+    def test_queue_full_rejects(self):
+        """排队数达到上限后拒收，容量随之归零"""
+        dispatcher = RecordingDispatcher(queue_size=2)
+
+        async def run():
+            assert dispatcher.submit(1, "zhihu")
+            assert dispatcher.submit(2, "zhihu")
+            assert dispatcher.capacity == 0
+            assert dispatcher.submit(3, "zhihu") is False
+            await dispatcher.stop()
+
+        asyncio.run(run())
+        assert dispatcher.stats()["rejected"] == 1
+
+    def test_inflight_dedupe(self):
+        """排队或执行中的文章不能重复投递，完成后可以再次投递"""
+        dispatcher = RecordingDispatcher()
+
+        async def run():
+            assert dispatcher.submit(1, "zhihu")
+            assert dispatcher.submit(1, "zhihu") is False
+            assert dispatcher.inflight_ids() == {1}
+            while dispatcher.is_inflight(1):
+                await asyncio.sleep(0.005)
+            assert dispatcher.submit(1, "zhihu")
+            await _drain(dispatcher, 2)
+
+        asyncio.run(run())
+        assert dispatcher.done == [1, 1]
+
+    def test_scan_excludes_inflight(self):
+        """扫描名额不会被已在调度器里的文章占满"""
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            project = Project(name="调度测试", company_name="测试公司")
+            db.add(project)
+            db.flush()
+            keyword = Keyword(project_id=project.id, keyword="测试词")
+            db.add(keyword)
+            db.flush()
+            base = datetime.now() - timedelta(hours=1)
+            articles = [
+                GeoArticle(keyword_id=keyword.id, title=f"标题{i}", content="正文", platform="zhihu",
+                           publish_status="scheduled", publish_time=base + timedelta(minutes=i))
+                for i in range(4)
+            ]
+            db.add_all(articles)
+            db.commit()
+
+            inflight = {articles[0].id, articles[1].id}
+            rows = pending_publish_query(db, datetime.now(), 2, inflight).all()
+            assert [r.id for r in rows] == [articles[2].id, articles[3].id]
+        finally:
+            db.close()
+            engine.dispose()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+发布记录查询测试
+确保列表/进度/创建接口的查询次数不随记录数增长，并验证键集分页
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.api.publish import (
+    _create_publish_records, get_publish_records, get_publish_progress, publish_task_manager,
+)
+from backend.database import Base
+from backend.database.models import Account, Article, PublishRecord
+from backend.schemas import PublishTaskCreate
+
+
+@pytest.fixture()
+def memory_db():
+    """独立的内存数据库，记录执行过的 SQL 条数"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session, statements
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _seed(db, articles=5, accounts=4):
+    article_rows = [Article(title=f"文章{i}", content="正文") for i in range(articles)]
+    account_rows = [Account(platform="zhihu", account_name=f"账号{i}", status=1) for i in range(accounts)]
+    db.add_all(article_rows + account_rows)
+    db.flush()
+    base = datetime(2024, 1, 1)
+    for i, (article, account) in enumerate((a, b) for a in article_rows for b in account_rows):
+        # 每两条共用一个时间戳，覆盖 created_at 相同、靠 id 区分的情况
+        db.add(PublishRecord(article_id=article.id, account_id=account.id,
+                             created_at=base + timedelta(minutes=i // 2)))
+    db.commit()
+    return article_rows, account_rows
+
+
+@pytest.mark.publish
+class TestPublishRecords:
+    """发布记录查询测试类"""
+
+    def test_records_single_query(self, memory_db):
+        """列表接口只发一条 SQL，文章标题和账号名随记录带出"""
+        db, statements = memory_db
+        _seed(db)
+        statements.clear()
+
+        result = get_publish_records(Response(), article_id=None, account_id=None, limit=200, cursor=None, db=db)
+
+        assert len(result) == 20
+        assert len(statements) == 1
+        assert all(r["article_title"] and r["account_name"] for r in result)
+
+    def test_records_keyset_pagination(self, memory_db):
+        """按游标翻页不重不漏，最后一页不带游标"""
+        db, _ = memory_db
+        _seed(db)
+
+        seen, cursor = [], None
+        while True:
+            response = Response()
+            page = get_publish_records(response, article_id=None, account_id=None, limit=6, cursor=cursor, db=db)
+            seen.extend(r["id"] for r in page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        expected = [r.id for r in db.query(PublishRecord).order_by(
+            PublishRecord.created_at.desc(), PublishRecord.id.desc())]
+        assert seen == expected
+
+    def test_create_skips_existing_in_bulk(self, memory_db):
+        """创建任务时批量查重：已有组合不重复插入，查询次数与组合数无关"""
+        db, statements = memory_db
+        articles, accounts = _seed(db, articles=2, accounts=2)
+        extra = Article(title="新文章", content="正文")
+        db.add(extra)
+        db.commit()
+        request = PublishTaskCreate(article_ids=[a.id for a in articles] + [extra.id],
+                                    account_ids=[a.id for a in accounts])
+        statements.clear()
+
+        _, _, task_id = _create_publish_records(db, request)
+
+        selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 3
+        assert db.query(PublishRecord).count() == 6
+        publish_task_manager._tasks.pop(task_id, None)
+
+    def test_progress_bulk_loads(self, memory_db):
+        """进度接口对文章、账号各查一次"""
+        db, statements = memory_db
+        articles, accounts = _seed(db)
+        task_id = publish_task_manager.create_task([a.id for a in articles], [a.id for a in accounts])
+        statements.clear()
+
+        try:
+            result = get_publish_progress(task_id, db=db)
+        finally:
+            publish_task_manager._tasks.pop(task_id, None)
+
+        assert len(result.data["items"]) == 20
+        assert len(statements) == 2
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+发布接口响应捕获测试
+验证各平台响应解析出文章 ID / 链接 / 错误码、点击后立即采用截获的响应，
+以及接口结果不足以确认时退回页面跳转检查
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.services.playwright.publishers.publish_response import parse_publish_response, submit_and_capture
+from backend.services.playwright.publishers.zhihu import ZhihuPublisher, ZHIHU_CONFIG
+
+
+class FakeResponse:
+    def __init__(self, url, data, method="POST", status=200):
+        self.url = url
+        self.status = status
+        self.request = type("FakeRequest", (), {"method": method})()
+        self._data = data
+
+    async def json(self):
+        return self._data
+
+
+class FakeEventInfo:
+    def __init__(self, future):
+        self._future = future
+
+    @property
+    async def value(self):
+        return await self._future
+
+
+class FakeExpectResponse:
+    """模拟 page.expect_response：退出时正常则等待响应，异常则取消"""
+
+    def __init__(self, page, predicate, timeout):
+        self.page = page
+        self.predicate = predicate
+        self.timeout = timeout
+
+    async def __aenter__(self):
+        self.page.future = asyncio.get_running_loop().create_future()
+        self.page.predicate = self.predicate
+        return FakeEventInfo(self.page.future)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc:
+            self.page.future.cancel()
+        else:
+            await asyncio.wait_for(asyncio.shield(self.page.future), self.timeout / 1000)
+
+
+class FakePage:
+    def __init__(self):
+        self.future = None
+        self.predicate = None
+
+    def expect_response(self, predicate, timeout=30000):
+        return FakeExpectResponse(self, predicate, timeout)
+
+    def emit(self, response):
+        if self.predicate(response) and not self.future.done():
+            self.future.set_result(response)
+
+
+class NavPage:
+    """发布后的页面：next_url 为发布成功后跳转到的地址，None 表示停在编辑页"""
+
+    def __init__(self, url, next_url=None):
+        self.url = url
+        self.next_url = next_url
+        self.waits = []
+
+    async def wait_for_url(self, matcher, timeout=30000, wait_until="load"):
+        self.waits.append(timeout)
+        if self.next_url and matcher(self.next_url):
+            self.url = self.next_url
+            return
+        raise TimeoutError(f"Timeout {timeout}ms exceeded")
+
+
+def _outcome(success=True, article_id=None, platform_url=None, error_code=None, error_msg=None):
+    return {"success": success, "article_id": article_id, "platform_url": platform_url,
+            "error_code": error_code, "error_msg": error_msg}
+
+
+@pytest.mark.publish
+class TestPublishResponse:
+    """发布响应测试类"""
+
+    def test_platform_parsers(self):
+        """成功时给出真实文章链接，失败时带平台错误码"""
+        zhihu = parse_publish_response("zhihu", {"code": 0, "data": {"result": '{"publish": {"id": "6901"}}'}})
+        assert zhihu["success"] and zhihu["platform_url"] == "https://zhuanlan.zhihu.com/p/6901"
+
+        toutiao = parse_publish_response("toutiao", {"code": 0, "data": {"pgc_id": 7301}})
+        assert toutiao["article_id"] == "7301" and toutiao["platform_url"].endswith("/article/7301/")
+
+        baijiahao = parse_publish_response("baijiahao", {"errno": 20040, "errmsg": "标题含敏感词"})
+        assert baijiahao == {"success": False, "article_id": None, "platform_url": None,
+                             "error_code": 20040, "error_msg": "标题含敏感词"}
+
+        sohu = parse_publish_response("sohu", {"success": True, "data": 812})
+        assert sohu["platform_url"] == "https://www.sohu.com/a/812"
+
+        assert parse_publish_response("unknown", {"code": 0}) is None
+
+    def test_captures_publish_response_after_click(self):
+        """点击后一拿到发布接口响应就返回，其它请求不干扰"""
+        page = FakePage()
+
+        async def click():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, page.emit, FakeResponse("https://mp.toutiao.com/mp/agw/article/publish", {}, "GET"))
+            loop.call_later(0.1, page.emit, FakeResponse(
+                "https://mp.toutiao.com/mp/agw/article/publish?source=mp", {"code": 0, "data": {"pgc_id": "9"}}))
+            return True
+
+        async def run():
+            start = time.monotonic()
+            result = await submit_and_capture(page, "toutiao", click, timeout=5000)
+            return result, time.monotonic() - start
+
+        (submitted, outcome), elapsed = asyncio.run(run())
+        assert submitted and outcome["success"] and outcome["article_id"] == "9"
+        assert elapsed < 1.0
+
+    def test_click_failure_does_not_wait(self):
+        """发布按钮没点下去时不等待响应"""
+        page = FakePage()
+
+        async def click():
+            return False
+
+        async def run():
+            start = time.monotonic()
+            result = await submit_and_capture(page, "zhihu", click, timeout=5000)
+            return result, time.monotonic() - start
+
+        (submitted, outcome), elapsed = asyncio.run(run())
+        assert (submitted, outcome) == (False, None)
+        assert elapsed < 0.5
+
+    def test_confirmed_outcome_skips_page_check(self):
+        """接口明确失败或成功且带链接时直接采用，不再等页面"""
+        publisher = ZhihuPublisher("zhihu", ZHIHU_CONFIG)
+        page = NavPage(ZHIHU_CONFIG["publish_url"])
+
+        for outcome in (_outcome(False, error_code=10001, error_msg="标题重复"),
+                        _outcome(article_id="6901", platform_url="https://zhuanlan.zhihu.com/p/6901")):
+            assert asyncio.run(publisher.wait_for_publish_result(page, outcome=outcome)) is outcome
+        assert page.waits == []
+
+    def test_success_without_url_falls_back_to_page(self):
+        """接口只说成功却没带链接时以页面跳转为准，接口给的文章 ID 保留"""
+        publisher = ZhihuPublisher("zhihu", ZHIHU_CONFIG)
+        page = NavPage(ZHIHU_CONFIG["publish_url"], "https://zhuanlan.zhihu.com/p/6901")
+
+        result = asyncio.run(publisher.settle_publish_result(
+            page, _outcome(article_id="6901"), lambda: publisher._wait_for_publish_result(page)))
+
+        assert result["success"] and result["article_id"] == "6901"
+        assert result["platform_url"] == "https://zhuanlan.zhihu.com/p/6901"
+
+    def test_success_without_url_unconfirmed_by_page(self):
+        """接口结果为空壳、页面也没离开编辑页时不算发布成功"""
+        publisher = ZhihuPublisher("zhihu", ZHIHU_CONFIG)
+        page = NavPage(ZHIHU_CONFIG["publish_url"])
+
+        result = asyncio.run(publisher.settle_publish_result(
+            page, _outcome(), lambda: publisher._wait_for_publish_result(page)))
+
+        assert result["success"] is False
+        assert len(page.waits) == 1
+
+    def test_default_fallback_waits_for_leaving_editor(self):
+        """没截获到响应时等页面离开编辑页，且等待有上限，不再等网络空闲"""
+        publisher = ZhihuPublisher("zhihu", ZHIHU_CONFIG)
+        left = NavPage(ZHIHU_CONFIG["publish_url"], "https://zhuanlan.zhihu.com/p/7001")
+        stuck = NavPage(ZHIHU_CONFIG["publish_url"])
+
+        assert asyncio.run(publisher.wait_for_publish_result(left)) == {
+            "success": True, "platform_url": "https://zhuanlan.zhihu.com/p/7001", "error_msg": None}
+        assert asyncio.run(publisher.wait_for_publish_result(stuck))["success"] is False
+        assert stuck.waits == [10000]
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+发布器条件等待测试
+验证 wait_until / network_quiet 在条件满足时立即返回、超时时返回 False，以及分步计时
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.services.playwright.publishers.base import BasePublisher, StepTimer
+
+
+class DummyPublisher(BasePublisher):
+    async def publish(self, page, article, account):
+        return {"success": True}
+
+
+class FakeRequest:
+    def __init__(self, url):
+        self.url = url
+
+
+class FakePage:
+    """只实现事件订阅的假页面"""
+
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event, handler):
+        self.handlers[event].remove(handler)
+
+    def emit(self, event, request):
+        for handler in list(self.handlers.get(event, [])):
+            handler(request)
+
+
+@pytest.fixture()
+def publisher():
+    return DummyPublisher("dummy", {"name": "测试平台"})
+
+
+@pytest.mark.publish
+class TestPublisherWaits:
+    """条件等待测试类"""
+
+    def test_wait_until_returns_as_soon_as_true(self, publisher):
+        """条件满足立即返回，不满足时到超时返回 False"""
+        calls = []
+
+        async def ready():
+            calls.append(1)
+            return len(calls) >= 3
+
+        async def never():
+            return False
+
+        async def run():
+            start = time.monotonic()
+            assert await publisher.wait_until(ready, timeout=5000, interval=10) is True
+            fast = time.monotonic() - start
+            assert await publisher.wait_until(never, timeout=100, interval=10) is False
+            return fast
+
+        assert asyncio.run(run()) < 0.5
+        assert len(calls) == 3
+
+    def test_network_quiet_waits_for_matching_requests(self, publisher):
+        """只等匹配的请求结束，结束后静默期一过就返回，并解除监听"""
+        page = FakePage()
+        upload = FakeRequest("https://example.com/api/upload/image")
+        other = FakeRequest("https://example.com/track")
+
+        async def finish_later():
+            await asyncio.sleep(0.2)
+            page.emit("requestfinished", upload)
+
+        async def run():
+            start = time.monotonic()
+            async with publisher.network_quiet(page, r"upload", idle_ms=50, timeout=2000):
+                page.emit("request", upload)
+                page.emit("request", other)  # 不匹配，永不结束也不影响
+                asyncio.get_running_loop().create_task(finish_later())
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+        assert 0.2 <= elapsed < 1.0
+        assert all(not handlers for handlers in page.handlers.values())
+
+    def test_step_timer_records_each_step(self):
+        """每个步骤都记录耗时，出错的步骤也计入"""
+        timer = StepTimer("测试平台")
+
+        async def run():
+            async with timer.step("填充标题"):
+                await asyncio.sleep(0.01)
+            with pytest.raises(RuntimeError):
+                async with timer.step("提交发布"):
+                    raise RuntimeError("boom")
+
+        asyncio.run(run())
+        assert list(timer.as_dict()) == ["填充标题", "提交发布"]
+        assert "填充标题" in timer.summary() and "总计" in timer.summary()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+浏览器资源拦截测试
+验证按平台规则拦截图片 / 字体 / 统计脚本、放行编辑器图床，以及拦截统计
+"""
+
+import asyncio
+
+import pytest
+
+from backend.config import RESOURCE_BLOCK_PROFILES
+from backend.services.playwright.resource_blocker import ResourceBlocker
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url):
+        self.resource_type = resource_type
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = FakeRequest(resource_type, url)
+        self.outcome = None
+
+    async def abort(self, error_code=None):
+        self.outcome = "abort"
+
+    async def fallback(self):
+        self.outcome = "continue"
+
+
+class FakeContext:
+    def __init__(self):
+        self.routes = []
+
+    async def route(self, url, handler):
+        self.routes.append((url, handler))
+
+    async def visit(self, resource_type, url):
+        route = FakeRoute(resource_type, url)
+        for _, handler in self.routes:
+            await handler(route)
+        return route.outcome
+
+
+@pytest.mark.publish
+class TestResourceBlocker:
+    """资源拦截测试类"""
+
+    def test_platform_rules(self):
+        """拦截图片和统计脚本，放行平台图床和页面本身"""
+        rule = ResourceBlocker(RESOURCE_BLOCK_PROFILES).rule_for("zhihu")
+
+        assert rule.should_block("image", "https://example.com/banner.png")
+        assert rule.should_block("script", "https://hm.baidu.com/hm.js?abc")
+        assert not rule.should_block("image", "https://pic1.zhimg.com/v2-cover.jpg")
+        assert not rule.should_block("document", "https://zhuanlan.zhihu.com/write")
+        assert not rule.should_block("xhr", "https://zhuanlan.zhihu.com/api/articles/drafts")
+
+    def test_unknown_platform_uses_default(self):
+        """未配置的平台走 default：只拦视频字体和统计，不拦图片"""
+        rule = ResourceBlocker(RESOURCE_BLOCK_PROFILES).rule_for("kimi")
+
+        assert rule.should_block("font", "https://cdn.example.com/a.woff2")
+        assert not rule.should_block("image", "https://cdn.example.com/a.png")
+
+    def test_routes_and_counts_blocked_requests(self):
+        """挂到上下文后拦截请求并按平台、资源类型计数"""
+        blocker = ResourceBlocker(RESOURCE_BLOCK_PROFILES)
+        context = FakeContext()
+
+        async def run():
+            assert await blocker.apply(context, "doubao")
+            return [
+                await context.visit("image", "https://cdn.doubao.com/avatar.png"),
+                await context.visit("font", "https://cdn.doubao.com/a.woff2"),
+                await context.visit("fetch", "https://www.doubao.com/samantha/chat/completion"),
+            ]
+
+        assert asyncio.run(run()) == ["abort", "abort", "continue"]
+        stats = blocker.stats()
+        assert stats["blocked"] == 2
+        assert stats["platforms"]["doubao"]["by_type"] == {"image": 1, "font": 1}
+        assert stats["estimated_bytes"] > 0
+
+    def test_disabled_does_not_route(self):
+        """关闭开关后不挂路由"""
+        blocker = ResourceBlocker(RESOURCE_BLOCK_PROFILES, enabled=False)
+        context = FakeContext()
+
+        assert asyncio.run(blocker.apply(context, "zhihu")) is False
+        assert context.routes == []
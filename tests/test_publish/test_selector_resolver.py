@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+候选选择器解析测试
+验证多个候选同时等待只需一次超时、命中结果持久化并优先尝试、以及漂移统计
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from backend.services.playwright.selector_resolver import SelectorResolver
+
+
+class FakeLocator:
+    """只实现 locator / or_ / first / wait_for / count 的假 locator"""
+
+    def __init__(self, page, selectors):
+        self.page = page
+        self.selectors = selectors
+
+    def locator(self, selector):
+        return self  # visible=true 过滤：假页面里出现的元素都可见
+
+    def or_(self, other):
+        return FakeLocator(self.page, self.selectors + other.selectors)
+
+    @property
+    def first(self):
+        return self
+
+    async def count(self):
+        return sum(1 for s in self.selectors if s in self.page.present)
+
+    async def wait_for(self, state="visible", timeout=30000):
+        deadline = time.monotonic() + timeout / 1000
+        while not await self.count():
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{self.selectors} not found")
+            await asyncio.sleep(0.01)
+
+
+class FakePage:
+    def __init__(self, present):
+        self.present = set(present)
+
+    def locator(self, selector):
+        return FakeLocator(self, (selector,))
+
+
+CANDIDATES = [".publish-btn", "button:has-text('发布')", "[class*='publish']"]
+
+
+@pytest.mark.publish
+class TestSelectorResolver:
+    """选择器解析测试类"""
+
+    def test_races_candidates_and_persists_winner(self, tmp_path):
+        """后面的候选命中时不必等前面的候选超时；命中结果写入缓存，下次排在最前"""
+        cache = tmp_path / "selector_cache.json"
+        resolver = SelectorResolver(cache)
+        page = FakePage({"[class*='publish']"})
+
+        start = time.monotonic()
+        winner = asyncio.run(resolver.resolve(page, "sohu", "publish_button", CANDIDATES, timeout=5000))
+
+        assert winner == "[class*='publish']"
+        assert time.monotonic() - start < 0.5
+        assert json.loads(cache.read_text(encoding="utf-8")) == {"sohu.publish_button": "[class*='publish']"}
+        assert SelectorResolver(cache).ordered("sohu", "publish_button", CANDIDATES)[0] == "[class*='publish']"
+
+    def test_priority_when_several_match(self, tmp_path):
+        """多个候选同时存在时按优先级（上次命中的优先）决定"""
+        resolver = SelectorResolver(tmp_path / "selector_cache.json")
+        page = FakePage(CANDIDATES)
+
+        assert asyncio.run(resolver.resolve(page, "sohu", "publish_button", CANDIDATES)) == ".publish-btn"
+
+    def test_drift_statistics(self, tmp_path):
+        """命中的候选变化计为漂移，沿用上次命中计为缓存命中，全部未命中计为失败"""
+        resolver = SelectorResolver(tmp_path / "selector_cache.json")
+
+        async def run():
+            await resolver.resolve(FakePage({".publish-btn"}), "sohu", "publish_button", CANDIDATES)
+            await resolver.resolve(FakePage({".publish-btn"}), "sohu", "publish_button", CANDIDATES)
+            await resolver.resolve(FakePage({"button:has-text('发布')"}), "sohu", "publish_button", CANDIDATES)
+            return await resolver.resolve(FakePage(set()), "sohu", "publish_button", CANDIDATES, timeout=50)
+
+        assert asyncio.run(run()) is None
+        entry = resolver.stats()["entries"]["sohu.publish_button"]
+        assert entry == {"winner": "button:has-text('发布')", "resolved": 3, "cache_hits": 1,
+                         "drifts": 1, "failures": 1}
+        assert resolver.stats()["drifts"] == 1
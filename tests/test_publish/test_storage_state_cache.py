@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+storage_state 解密缓存测试
+确保同一密文只解密一次、密文变化或重新授权后缓存失效、密钥派生推迟到首次使用
+"""
+
+import pytest
+
+from backend.database.models import Account
+from backend.services import crypto
+from backend.services.crypto import CryptoService, StorageStateCache, encrypt_storage_state
+
+
+@pytest.fixture()
+def cache(monkeypatch):
+    """独立的缓存实例，并统计真实解密次数"""
+    calls = []
+    original = crypto.crypto_service.decrypt_dict
+
+    def counting_decrypt(encrypted):
+        calls.append(encrypted)
+        return original(encrypted)
+
+    monkeypatch.setattr(crypto.crypto_service, "decrypt_dict", counting_decrypt)
+    instance = StorageStateCache(max_size=2)
+    monkeypatch.setattr(crypto, "storage_state_cache", instance)
+    return instance, calls
+
+
+@pytest.mark.publish
+class TestStorageStateCache:
+    """storage_state 解密缓存测试类"""
+
+    def test_key_derived_lazily(self):
+        """构造服务时不派生密钥，首次加密时才派生"""
+        service = CryptoService("lazy-key")
+        assert service._fernet_obj is None
+        assert service.decrypt(service.encrypt("hello")) == "hello"
+        assert service._fernet_obj is not None
+
+    def test_same_ciphertext_decrypted_once(self, cache):
+        """同一账号同一密文重复读取只解密一次"""
+        instance, calls = cache
+        encrypted = encrypt_storage_state({"cookies": [{"name": "a"}], "origins": []})
+        first = instance.get(1, encrypted)
+        second = instance.get(1, encrypted)
+        assert first == {"cookies": [{"name": "a"}], "origins": []}
+        assert second is first
+        assert len(calls) == 1
+        assert instance.stats()["hits"] == 1
+
+    def test_new_ciphertext_and_lru_eviction(self, cache):
+        """密文变化视为新条目，超出容量淘汰最久未用的条目"""
+        instance, calls = cache
+        old = encrypt_storage_state({"v": 1})
+        new = encrypt_storage_state({"v": 2})
+        assert instance.get(1, old) == {"v": 1}
+        assert instance.get(1, new) == {"v": 2}
+        instance.get(2, old)
+        assert instance.stats()["size"] == 2
+        instance.get(1, old)  # 已被淘汰，需要重新解密
+        assert len(calls) == 4
+
+    def test_account_reassignment_invalidates(self, cache):
+        """Account.storage_state 重新赋值时清掉该账号的缓存"""
+        instance, calls = cache
+        encrypted = encrypt_storage_state({"v": 1})
+        account = Account(id=7, platform="zhihu", account_name="测试", storage_state=encrypted)
+        instance.get(7, encrypted)
+        assert instance.stats()["size"] == 1
+
+        account.storage_state = encrypt_storage_state({"v": 2})
+        assert instance.stats()["size"] == 0